@@ -6,6 +6,7 @@ from app.api.dependencies import require_admin
 from app.models import PaymentSettings, EmailSettings
 from app.schemas import PaymentSettingsResponse, PaymentSettingsUpdate
 from app.schemas.settings import EmailSettingsResponse, EmailSettingsUpdate, EmailTestRequest
+from app.services.settings_cache import EMAIL, PAYMENT, UPLOAD, settings_cache
 
 router = APIRouter(prefix="/admin/settings", tags=["Admin Settings"])
 
@@ -17,6 +18,7 @@ def ensure_payment_singleton(db: Session) -> PaymentSettings:
     if not settings:
         settings = PaymentSettings(active_mode="test")
         db.add(settings)
+        settings_cache.bump(db, PAYMENT)
         db.commit()
         db.refresh(settings)
     return settings
@@ -48,6 +50,7 @@ def update_payment_settings(payload: PaymentSettingsUpdate, db: Session = Depend
         s.test_secret_key = payload.test_secret_key.strip()
     if payload.live_secret_key is not None and payload.live_secret_key.strip():
         s.live_secret_key = payload.live_secret_key.strip()
+    settings_cache.bump(db, PAYMENT)
     db.commit()
     db.refresh(s)
     return PaymentSettingsResponse(
@@ -102,6 +105,7 @@ def ensure_email_singleton(db: Session) -> EmailSettings:
     if not settings:
         settings = EmailSettings()
         db.add(settings)
+        settings_cache.bump(db, EMAIL)
         db.commit()
         db.refresh(settings)
     return settings
@@ -143,6 +147,7 @@ def update_email_settings(payload: EmailSettingsUpdate, db: Session = Depends(ge
     if payload.emails_from_name is not None:
         s.emails_from_name = payload.emails_from_name.strip() if payload.emails_from_name else None
     
+    settings_cache.bump(db, EMAIL)
     db.commit()
     db.refresh(s)
     
@@ -183,6 +188,7 @@ def ensure_upload_singleton(db: Session) -> UploadSettings:
     if not settings_obj:
         settings_obj = UploadSettings()
         db.add(settings_obj)
+        settings_cache.bump(db, UPLOAD)
         db.commit()
         db.refresh(settings_obj)
     return settings_obj
@@ -226,6 +232,7 @@ def update_upload_settings(payload: UploadSettingsUpdate, db: Session = Depends(
     if "max_file_size_image" in updates:
         s.max_file_size_image = updates["max_file_size_image"]
     
+    settings_cache.bump(db, UPLOAD)
     db.commit()
     db.refresh(s)
     
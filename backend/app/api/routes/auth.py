@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 import secrets
 from datetime import datetime, timedelta
@@ -13,9 +13,11 @@ from app.services.auth import (
 )
 from app.api.dependencies import get_current_user_dependency
 from app.models import User
-from app.services.email import send_password_reset_email, send_welcome_email
+from app.services.email import password_reset_email_content, welcome_email_content
+from app.services.email_outbox import queue_email
 from app.core.security import create_access_token, verify_password, get_password_hash
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,26 +26,31 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+def register_user(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
     """
-    Register a new user and send welcome email.
+    Register a new user and queue a welcome email.
     """
+    rate_limiter.check(request, "register", user_data.email)
     user = create_user_service(db=db, user_data=user_data)
     
-    # Send welcome email (non-blocking, don't fail registration if email fails)
+    # Queue the welcome email in the user's transaction; the outbox sender delivers
+    # it in the background. Don't fail registration if the email can't be built.
     try:
-        send_welcome_email(email_to=user.email, user_name=user.full_name)
+        queue_email(db, user.email, welcome_email_content(user.full_name))
     except Exception as e:
-        logger.error(f"Failed to send welcome email: {e}")
+        logger.error(f"Failed to queue welcome email: {e}")
+    db.commit()
+    db.refresh(user)
     
     return user
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(login_data: UserLogin, db: Session = Depends(get_db)):
+def login_for_access_token(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """
     Login with email and password to get an access token.
     """
+    rate_limiter.check(request, "login", login_data.email)
     user, access_token = authenticate_user_service(db=db, login_data=login_data)
     return {
         "access_token": access_token,
@@ -53,10 +60,11 @@ def login_for_access_token(login_data: UserLogin, db: Session = Depends(get_db))
 
 
 @router.post("/cibn-login", response_model=Token)
-def cibn_login_for_access_token(login_data: CIBNMemberLogin, db: Session = Depends(get_db)):
+def cibn_login_for_access_token(login_data: CIBNMemberLogin, request: Request, db: Session = Depends(get_db)):
     """
     Login with CIBN employee ID and password to get an access token.
     """
+    rate_limiter.check(request, "cibn-login", login_data.cibn_employee_id)
     user, access_token = authenticate_cibn_member_service(db=db, login_data=login_data)
     return {
         "access_token": access_token,
@@ -152,11 +160,12 @@ def change_password(
 
 
 @router.post("/forgot-password")
-def forgot_password(email: str, db: Session = Depends(get_db)):
+def forgot_password(email: str, request: Request, db: Session = Depends(get_db)):
     """
     Request password reset. Sends email with reset token.
     Always returns success to prevent email enumeration.
     """
+    rate_limiter.check(request, "forgot-password", email)
     # Find user by email
     user = db.query(User).filter(User.email == email).first()
     
@@ -167,21 +176,15 @@ def forgot_password(email: str, db: Session = Depends(get_db)):
         # Set token expiration
         expires = datetime.now(datetime.timezone.utc) + timedelta(hours=settings.PASSWORD_RESET_TOKEN_EXPIRE_HOURS)
         
-        # Save token to database
+        # Save token to database and queue the reset email in the same transaction
         user.reset_token = reset_token
         user.reset_token_expires = expires
-        db.commit()
-        
-        # Send password reset email
         try:
-            send_password_reset_email(
-                email_to=user.email,
-                reset_token=reset_token,
-                user_name=user.full_name
-            )
+            queue_email(db, user.email, password_reset_email_content(reset_token, user.full_name))
         except Exception as e:
-            logger.error(f"Failed to send password reset email: {e}")
-            # Continue anyway to prevent email enumeration
+            # Same response either way, so a failure doesn't reveal the account exists
+            logger.error(f"Failed to queue password reset email: {e}")
+        db.commit()
     
     # Always return success to prevent email enumeration
     return {"message": "If your email exists in our system, you will receive password reset instructions."}
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.session import get_db
+from app.api.dependencies import require_admin
+from app.models import CampaignStatus, Content, EmailCampaign
+from app.schemas.campaign import EmailCampaignCreate, EmailCampaignResponse
+
+router = APIRouter(prefix="/admin/campaigns", tags=["Admin Campaigns"])
+
+
+def get_campaign_or_404(db: Session, campaign_id: int) -> EmailCampaign:
+    campaign = db.get(EmailCampaign, campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
+    return campaign
+
+
+@router.post("", response_model=EmailCampaignResponse, status_code=status.HTTP_201_CREATED)
+def create_campaign(payload: EmailCampaignCreate, db: Session = Depends(get_db), admin=Depends(require_admin)):
+    """Queue an announcement; the campaign runner sends it in the background."""
+    if payload.content_id is not None and db.get(Content, payload.content_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
+    campaign = EmailCampaign(**payload.model_dump(), status=CampaignStatus.QUEUED, created_by=admin.id)
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    return campaign
+
+
+@router.get("", response_model=List[EmailCampaignResponse])
+def list_campaigns(skip: int = 0, limit: int = 50, db: Session = Depends(get_db), admin=Depends(require_admin)):
+    return db.query(EmailCampaign).order_by(EmailCampaign.id.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/{campaign_id}", response_model=EmailCampaignResponse)
+def get_campaign(campaign_id: int, db: Session = Depends(get_db), admin=Depends(require_admin)):
+    """Campaign with its progress so far."""
+    return get_campaign_or_404(db, campaign_id)
+
+
+@router.post("/{campaign_id}/cancel", response_model=EmailCampaignResponse)
+def cancel_campaign(campaign_id: int, db: Session = Depends(get_db), admin=Depends(require_admin)):
+    """Stop a campaign; a run in progress stops after its current batch."""
+    campaign = get_campaign_or_404(db, campaign_id)
+    if campaign.status not in (CampaignStatus.QUEUED, CampaignStatus.SENDING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Campaign is already {campaign.status.value}")
+    campaign.status = CampaignStatus.CANCELLED
+    db.commit()
+    db.refresh(campaign)
+    return campaign
@@ -6,6 +6,7 @@ from app.db.session import get_db
 from app.schemas import ContentCreate, ContentUpdate, ContentResponse, ContentListResponse
 from app.models import Content, ContentType, ContentCategory, User, UserRole, Purchase, OrderItem
 from app.api.dependencies import get_current_user_dependency, require_admin
+from app.services.entitlements import entitlements
 import os
 import shutil
 from pathlib import Path
@@ -235,6 +236,8 @@ def delete_content(
         # Delete the content itself
         db.delete(content)
         db.commit()
+        if deleted_purchases:
+            entitlements.invalidate()
     except Exception as e:
         db.rollback()
         logger.exception("Delete content failed", exc_info=e)
@@ -2,15 +2,17 @@ import json
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas import OrderCreate, OrderResponse, PaystackInitializeResponse
 from app.models import Order, User
 from app.api.dependencies import get_current_user_dependency
 from app.services.orders import order_service
 from app.services.payment import paystack_service, resolve_active_secret_key
+from app.services.webhooks import record_webhook_event
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +22,19 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 @router.post("/webhook")
 async def paystack_webhook(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Paystack webhook endpoint.
 
-    Verifies the HMAC signature server-side and confirms the payment
-    independently of the client-driven verify flow. Always returns 200 to
-    acknowledge receipt once the signature is valid, so Paystack does not retry.
+    Verifies the HMAC signature server-side, stores the event in the webhook
+    inbox and acknowledges at once; the inbox consumer confirms the payment
+    in the background, independently of the client-driven verify flow.
+    Redeliveries of a stored event are acknowledged without being stored again.
     """
     raw_body = await request.body()
     signature = request.headers.get("x-paystack-signature", "")
 
-    secret_key = resolve_active_secret_key(db)
+    secret_key = await db.run_sync(resolve_active_secret_key)
     if not signature or not paystack_service.validate_webhook(
         signature, raw_body, secret_key_override=secret_key
     ):
@@ -43,38 +46,32 @@ async def paystack_webhook(
     try:
         event = json.loads(raw_body.decode("utf-8"))
     except (ValueError, UnicodeDecodeError):
+        event = None
+    if not isinstance(event, dict):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid webhook payload",
         )
 
-    if event.get("event") == "charge.success":
-        data = event.get("data") or {}
-        reference = data.get("reference")
-        amount = data.get("amount")
-        if reference:
-            try:
-                order_service.confirm_order_from_webhook(db, reference, amount)
-            except Exception:
-                logger.exception("Failed to process Paystack webhook for reference %s", reference)
-
+    if not await record_webhook_event(db, raw_body, event):
+        logger.info(f"Duplicate Paystack webhook {event.get('event')} acknowledged")
     return {"status": "ok"}
 
 
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """Create a new order."""
-    return order_service.create_order(db=db, user=current_user, order_data=order_data)
+    return await order_service.create_order(db=db, user=current_user, order_data=order_data)
 
 
 @router.post("/{order_id}/initialize-payment", response_model=PaystackInitializeResponse)
 async def initialize_payment(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """Initialize Paystack payment for an order."""
@@ -84,7 +81,7 @@ async def initialize_payment(
 @router.post("/verify-payment/{reference}")
 async def verify_payment(
     reference: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """Verify payment and complete order."""
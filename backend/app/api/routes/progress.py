@@ -1,14 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.session import get_db
 from app.models import ContentProgress, User, Content
-from app.schemas.content_progress import ContentProgressCreate, ContentProgressUpdate, ContentProgressResponse
+from app.schemas.content_progress import (
+    ContentProgressCreate,
+    ContentProgressUpdate,
+    ContentProgressResponse,
+    ContinueWatchingItem,
+    ProgressHeartbeatBatch,
+)
 from app.api.dependencies import get_current_user_dependency
+from app.services.progress import BufferedProgress, coalesce, content_ids, continue_watching, progress_buffer
 
 router = APIRouter(prefix="/progress", tags=["Progress"])
 
 
+def buffered_response(
+    user_id: int, content_id: int, state: BufferedProgress, row: Optional[ContentProgress] = None
+) -> ContentProgressResponse:
+    """A buffered state as a response, keeping the stored row's id and creation time."""
+    fields = state._asdict()
+    if row is not None:
+        fields["created_at"] = row.created_at
+    return ContentProgressResponse(
+        id=row.id if row is not None else None,
+        user_id=user_id,
+        content_id=content_id,
+        updated_at=state.last_watched,
+        **fields,
+    )
+
+
 @router.get("/", response_model=List[ContentProgressResponse])
 def get_my_progress(
     db: Session = Depends(get_db),
@@ -20,7 +43,27 @@ def get_my_progress(
     progress_list = db.query(ContentProgress).filter(
         ContentProgress.user_id == current_user.id
     ).all()
-    return progress_list
+    buffered = progress_buffer.for_user(current_user.id)
+    if not buffered:
+        return progress_list
+    merged = []
+    for progress in progress_list:
+        state = buffered.pop(progress.content_id, None)
+        merged.append(buffered_response(current_user.id, progress.content_id, state, progress) if state else progress)
+    merged.extend(buffered_response(current_user.id, content_id, state) for content_id, state in buffered.items())
+    return merged
+
+
+@router.get("/continue", response_model=List[ContinueWatchingItem])
+def get_continue_watching(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_dependency)
+):
+    """
+    Most recently watched unfinished items, with their content, newest first.
+    """
+    return continue_watching(db, current_user.id, limit)
 
 
 @router.get("/{content_id}", response_model=ContentProgressResponse)
@@ -31,7 +74,13 @@ def get_content_progress(
 ):
     """
     Get progress for a specific content item.
+
+    Served from this worker's progress buffer when it holds a newer state.
     """
+    state = progress_buffer.get(current_user.id, content_id)
+    if state is not None:
+        return buffered_response(current_user.id, content_id, state)
+
     progress = db.query(ContentProgress).filter(
         ContentProgress.user_id == current_user.id,
         ContentProgress.content_id == content_id
@@ -63,6 +112,9 @@ def create_or_update_progress(
             detail="Content not found"
         )
     
+    # This write replaces any buffered heartbeat state
+    progress_buffer.pop(current_user.id, progress_data.content_id)
+
     # Check if progress already exists
     existing_progress = db.query(ContentProgress).filter(
         ContentProgress.user_id == current_user.id,
@@ -94,6 +146,32 @@ def create_or_update_progress(
         return new_progress
 
 
+@router.post("/heartbeat", status_code=status.HTTP_204_NO_CONTENT)
+def record_progress_heartbeat(
+    payload: ProgressHeartbeatBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_dependency)
+):
+    """
+    Record the latest playback state of one or more items.
+
+    The high-frequency path for the media players: states go into the
+    write-behind buffer, and nothing touches ``content_progress`` until the
+    next flush.
+    """
+    updates = coalesce(payload.updates)
+    missing = content_ids.missing(db, updates)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Content not found: {', '.join(map(str, sorted(missing)))}"
+        )
+    progress_buffer.record(current_user.id, updates.values())
+    if progress_buffer.full:
+        progress_buffer.flush(db)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.patch("/{content_id}", response_model=ContentProgressResponse)
 def update_progress(
     content_id: int,
@@ -104,11 +182,22 @@ def update_progress(
     """
     Update progress for a specific content item.
     """
+    pending = progress_buffer.pop(current_user.id, content_id)
     progress = db.query(ContentProgress).filter(
         ContentProgress.user_id == current_user.id,
         ContentProgress.content_id == content_id
     ).first()
-    
+
+    if pending is not None:
+        # Apply the update on top of the newest buffered state
+        if not progress:
+            progress = ContentProgress(user_id=current_user.id, content_id=content_id, created_at=pending.created_at)
+            db.add(progress)
+        progress.playback_position = pending.playback_position
+        progress.total_duration = pending.total_duration
+        progress.progress_percentage = pending.progress_percentage
+        progress.is_completed = pending.is_completed
+
     if not progress:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -133,16 +222,18 @@ def delete_progress(
     """
     Delete progress for a specific content item.
     """
+    pending = progress_buffer.pop(current_user.id, content_id)
     progress = db.query(ContentProgress).filter(
         ContentProgress.user_id == current_user.id,
         ContentProgress.content_id == content_id
     ).first()
     
-    if not progress:
+    if not progress and pending is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No progress found for this content"
         )
     
-    db.delete(progress)
-    db.commit()
+    if progress:
+        db.delete(progress)
+        db.commit()
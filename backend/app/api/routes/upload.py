@@ -4,8 +4,9 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.api.dependencies import require_admin
-from app.models import User
+from app.models import User, UploadSettings
 from app.core.config import settings
+from app.services.settings_cache import UPLOAD, settings_cache
 import os
 import shutil
 from pathlib import Path
@@ -16,6 +17,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["Upload"])
 
+def load_upload_limits(db: Session) -> Optional[dict[str, Optional[int]]]:
+    """Max sizes per file type from Upload Settings; None (unlimited) is kept as-is."""
+    upload_settings = db.query(UploadSettings).first()
+    if not upload_settings:
+        return None
+    return {
+        "document": upload_settings.max_file_size_document,
+        "video": upload_settings.max_file_size_video,
+        "audio": upload_settings.max_file_size_audio,
+        "image": upload_settings.max_file_size_image,
+    }
+
+
 def get_file_type(filename: str, allowed_extensions: dict[str, list[str]]) -> Optional[str]:
     """Determine file type based on extension."""
     ext = Path(filename).suffix.lower()
@@ -76,24 +90,8 @@ async def upload_file(
         
         allowed_extensions = settings.UPLOAD_ALLOWED_EXTENSIONS
         
-        # Fetch max sizes from DB (Upload Settings)
-        from app.models.settings import UploadSettings
-        upload_settings = db.query(UploadSettings).first()
-        
-        if upload_settings:
-            # Use DB settings if available
-            # Note: DB stores None for unlimited, logic below handles None as unlimited if we adapt it.
-            # Existing logic: get(type, default). If we want None to match DB semantics?
-            # Config default has None for video/audio.
-            max_file_sizes = {
-                "document": upload_settings.max_file_size_document,
-                "video": upload_settings.max_file_size_video,
-                "audio": upload_settings.max_file_size_audio,
-                "image": upload_settings.max_file_size_image
-            }
-        else:
-            # Fallback to env/file config
-            max_file_sizes = settings.UPLOAD_MAX_FILE_SIZES
+        # Max sizes from Upload Settings (cached), falling back to env/file config
+        max_file_sizes = settings_cache.get(db, UPLOAD, load_upload_limits) or settings.UPLOAD_MAX_FILE_SIZES
 
         file_type = get_file_type(file.filename, allowed_extensions)
         if not file_type:
@@ -1,55 +1,45 @@
 import os
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from fastapi.responses import FileResponse, StreamingResponse
 import mimetypes
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pathlib import Path
-from app.db.session import get_db
-from app.models import Content, User, Purchase, UserRole
-from app.schemas import ContentResponse
+from app.db.session import get_async_db
+from app.models import Content, ContentCategory, ContentType, User, Purchase, UserRole
+from app.schemas import ContentResponse, ContentSummary, LibraryItem, LibraryPage
 from app.api.dependencies import get_current_user_dependency
 from app.core.config import settings
+from app.services.access_counts import access_counter
+from app.services.entitlements import entitlements
+from app.services.library import decode_cursor, encode_cursor, library_query
+from app.services.progress import progress_buffer
 
 router = APIRouter(prefix="/content/me", tags=["User Content"])
 
 @router.get("/purchased", response_model=List[ContentResponse])
 async def get_purchased_content(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """
     Get all content purchased by the current user.
     """
     try:
-        # Get all purchases for the current user
-        purchases = db.query(Purchase).filter(
-            Purchase.user_id == current_user.id
-        ).all()
-        
-        # Extract content IDs from purchases
-        content_ids = [purchase.content_id for purchase in purchases]
-        
-        if not content_ids:
-            return []
-        
-        # Get all content that the user has purchased
-        content_items = db.query(Content).filter(
-            Content.id.in_(content_ids)
-        ).all()
-        
-        # Patch missing attributes for Pydantic validation
-        for item in content_items:
-            # purchase_count is not on the Content model but required by schema (as optional)
-            # We set it to 0 as it's not relevant for this view or available on the model
-            if not hasattr(item, 'purchase_count'):
-                setattr(item, 'purchase_count', 0)
-        
+        content_items = (await db.scalars(
+            select(Content)
+            .join(Purchase, Purchase.content_id == Content.id)
+            .where(Purchase.user_id == current_user.id)
+            .order_by(Purchase.purchase_date.desc(), Purchase.id.desc())
+        )).all()
+        # purchase_count is not loaded here; the schema defaults it
         return content_items
     except Exception as e:
         logger.error(f"Error fetching purchased content for user {current_user.id}: {str(e)}", exc_info=True)
@@ -58,10 +48,51 @@ async def get_purchased_content(
             detail="Internal server error while fetching purchased content"
         )
 
+@router.get("/library", response_model=LibraryPage)
+async def get_library(
+    limit: int = Query(24, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    content_type: Optional[ContentType] = None,
+    category: Optional[ContentCategory] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_dependency)
+):
+    """
+    One page of the user's library, newest purchases first, with content,
+    purchase and progress details.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    rows = (await db.execute(
+        library_query(current_user.id, limit + 1, after, content_type, category)
+    )).all()
+    buffered = progress_buffer.for_user(current_user.id)
+
+    items = []
+    for row in rows[:limit]:
+        item = LibraryItem(content=ContentSummary.model_validate(row), **row._mapping)
+        state = buffered.get(row.id)
+        if state is not None:
+            item.progress_percentage = state.progress_percentage
+            item.is_completed = state.is_completed
+        items.append(item)
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.purchase_date, last.purchase_id)
+    return LibraryPage(items=items, next_cursor=next_cursor)
+
 @router.get("/{content_id}/download")
 async def download_purchased_content(
     content_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """
@@ -70,13 +101,8 @@ async def download_purchased_content(
     try:
         logger.info(f"Download request for content ID: {content_id} from user: {current_user.id}")
         
-        # Check if the user has purchased this content
-        purchase = db.query(Purchase).filter(
-            Purchase.user_id == current_user.id,
-            Purchase.content_id == content_id
-        ).first()
-        
-        if not purchase:
+        # Check if the user has purchased this content (answered from memory)
+        if not await entitlements.owns(db, current_user.id, content_id):
             logger.warning(f"User {current_user.id} attempted to download unpurchased content {content_id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -84,7 +110,7 @@ async def download_purchased_content(
             )
         
         # Get the content using SQLAlchemy model
-        content = db.query(Content).filter(Content.id == content_id).first()
+        content = await db.get(Content, content_id)
         if not content:
             logger.error(f"Content not found: {content_id}")
             raise HTTPException(
@@ -120,6 +146,9 @@ async def download_purchased_content(
                 detail="File not found on server"
             )
         
+        # Tallied in memory; written to the purchase by the next flush
+        access_counter.record(current_user.id, content_id)
+
         try:
             # Get file size for the Content-Length header
             file_size = file_path.stat().st_size
@@ -166,14 +195,14 @@ async def download_purchased_content(
 @router.post("/library/{content_id}", status_code=status.HTTP_201_CREATED)
 async def add_to_library(
     content_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """
     Directly add free or exclusive content to the user's library.
     """
     try:
-        content = db.query(Content).filter(Content.id == content_id).first()
+        content = await db.get(Content, content_id)
         if not content:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -211,12 +240,7 @@ async def add_to_library(
             )
 
         # Check if user already has it
-        existing = db.query(Purchase).filter(
-            Purchase.user_id == current_user.id,
-            Purchase.content_id == content_id
-        ).first()
-        
-        if existing:
+        if await entitlements.owns(db, current_user.id, content_id):
             return {"message": "Content is already in your library"}
 
         # Add to library by creating a purchase record with 0 amount
@@ -232,14 +256,19 @@ async def add_to_library(
         if content.content_type.value == "physical" and content.stock_quantity:
             content.stock_quantity = max(0, content.stock_quantity - 1)
             
-        db.commit()
+        await db.commit()
+        entitlements.invalidate(current_user.id)
         return {"message": "Content added to your library successfully"}
         
     except HTTPException:
         raise
+    except IntegrityError:
+        # A concurrent request added it first (unique user/content purchase).
+        await db.rollback()
+        return {"message": "Content is already in your library"}
     except Exception as e:
         logger.error(f"Error adding content to library for user {current_user.id}: {str(e)}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to add content to library"
@@ -1,3 +1,4 @@
+import asyncio
 import typer
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
@@ -35,5 +36,98 @@ def create_superuser(email: str, password: str):
     finally:
         db.close()
 
+
+@app.command()
+def reconcile_payments(
+    batch_size: int = typer.Option(None, help="Orders per checkpointed batch"),
+    concurrency: int = typer.Option(None, help="Paystack verify calls in flight"),
+):
+    """Verify pending Paystack orders now, resuming from the last checkpoint."""
+    from app.services.payment import paystack_service
+    from app.services.reconciliation import reconcile_pending_payments
+
+    async def run():
+        try:
+            return await reconcile_pending_payments(batch_size=batch_size, concurrency=concurrency)
+        finally:
+            await paystack_service.aclose()
+
+    stats = asyncio.run(run())
+    print(", ".join(f"{outcome}: {count}" for outcome, count in sorted(stats.items())) or "Nothing to reconcile.")
+
+
+@app.command()
+def requeue_webhooks():
+    """Move dead-lettered webhook events back to the inbox for another try."""
+    from app.services.webhooks import requeue_dead_events
+
+    db = SessionLocal()
+    try:
+        print(f"Requeued {requeue_dead_events(db)} webhook event(s).")
+    finally:
+        db.close()
+
+
+@app.command()
+def send_campaign(
+    campaign_id: int,
+    connections: int = typer.Option(None, help="Persistent SMTP sessions to send over"),
+    rate: float = typer.Option(None, help="Ceiling on emails per second (0 disables)"),
+):
+    """Send a queued email campaign now, resuming from its checkpoint."""
+    from app.services.campaigns import send_campaign as run_campaign
+
+    stats = run_campaign(campaign_id, connections=connections, rate=rate)
+    print(", ".join(f"{outcome}: {count}" for outcome, count in sorted(stats.items())) or "Nothing to send.")
+
+
+@app.command()
+def audit_indexes():
+    """List filtered columns and model indexes the database has no index for; exits 1 if any."""
+    from app.db.index_audit import audit_indexes as run_audit
+    from app.db.session import engine
+
+    with engine.connect() as connection:
+        findings = run_audit(connection)
+    for finding in findings:
+        print(f"{finding.table}: {finding.index} ({finding.reason})")
+    if findings:
+        raise typer.Exit(code=1)
+    print("All filtered columns are indexed.")
+
+
+@app.command()
+def migrate(
+    revision: str = typer.Argument("head", help="Revision to upgrade to"),
+    stamp_existing: bool = typer.Option(
+        False, "--stamp-existing", help="Adopt a database built by create_all once it is checked against the chain"
+    ),
+):
+    """Apply the schema migrations; run once per deploy, before the workers start."""
+    from app.db.migrations import (
+        STAMP_BASELINE, current_revision, missing_from_baseline, stamp, unversioned_tables, upgrade,
+    )
+    from app.db.session import engine
+
+    with engine.connect() as connection:
+        adopt = unversioned_tables(connection)
+        if adopt and not stamp_existing:
+            print(
+                "The database has tables but no migration history (it was built by create_all). "
+                "Run `python -m app.cli migrate --stamp-existing` to check it against the chain and adopt it."
+            )
+            raise typer.Exit(code=1)
+        missing = missing_from_baseline(connection) if adopt else []
+    if missing:
+        print(f"Cannot adopt the database, it lacks columns of revision {STAMP_BASELINE}: {', '.join(missing)}")
+        raise typer.Exit(code=1)
+    if adopt:
+        with engine.connect() as connection:
+            stamp(connection, STAMP_BASELINE)
+        print(f"Database stamped at revision {STAMP_BASELINE}.")
+    with engine.connect() as connection:
+        upgrade(connection, revision)
+        print(f"Database schema at revision {current_revision(connection)}.")
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
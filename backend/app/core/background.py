@@ -0,0 +1,66 @@
+"""
+In-process periodic jobs.
+
+Each uvicorn worker runs its own copy of every task, so jobs must be safe to
+run concurrently from several processes (idempotent deletes and updates,
+row locks, or SKIP LOCKED claims). Blocking work runs in the threadpool so
+the event loop keeps serving requests; coroutine functions are awaited on
+the loop itself, so they can share loop-bound clients such as the Paystack
+pool.
+"""
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs a blocking function (or coroutine function) every ``interval`` seconds until stopped."""
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Union[object, Awaitable[object]]],
+        jitter: float = 0.1,
+    ) -> None:
+        self.name = name
+        self.interval = interval
+        self.func = func
+        # Spread workers started together so they do not all run at once.
+        self.jitter = jitter
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Schedule the loop on the running event loop (call from a startup hook)."""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+        logger.info(f"Started periodic task '{self.name}' every {self.interval}s")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_once(self) -> None:
+        try:
+            if asyncio.iscoroutinefunction(self.func):
+                await self.func()
+            else:
+                await run_in_threadpool(self.func)
+        except Exception:
+            logger.exception(f"Periodic task '{self.name}' failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval * (1 + random.uniform(0, self.jitter)))
+            await self.run_once()
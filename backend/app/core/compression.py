@@ -0,0 +1,191 @@
+"""
+Response compression middleware.
+
+Negotiates zstd, brotli or gzip from the request's Accept-Encoding header and
+compresses responses whose media type is listed in the configured minimum-size
+map. Media that is already compressed (images, video, audio, PDFs, archives)
+is never listed and passes through untouched. Bodies that arrive in several
+chunks (streaming responses) are compressed incrementally instead of being
+buffered in memory.
+"""
+import zlib
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+
+# Server-side preference order; the first encoding the client accepts wins.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings supported by the codecs installed in this environment."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a {coding: q-value} mapping."""
+    accepted: Dict[str, float] = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def select_encoding(accept_encoding: str, supported: tuple[str, ...]) -> Optional[str]:
+    """Pick the preferred supported encoding the client accepts, if any."""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for coding in ENCODING_PREFERENCE:
+        if coding in supported and accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def make_compressor(encoding: str, gzip_level: int, brotli_quality: int, zstd_level: int):
+    """Return (compress, flush) callables for an incremental compressor."""
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        return compressor.compress, compressor.flush
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.finish
+    # wbits=31 produces a gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses by media type and size."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_sizes: Dict[str, int],
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_sizes = {k.lower(): int(v) for k, v in minimum_sizes.items()}
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.supported
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state: decides on the first body chunk, then streams."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.compress: Optional[Callable[[bytes], bytes]] = None
+        self.flush: Optional[Callable[[], bytes]] = None
+        self.passthrough = False
+
+    def _threshold(self, headers: MutableHeaders) -> Optional[int]:
+        if "content-encoding" in headers or "content-range" in headers:
+            return None
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return self.middleware.minimum_sizes.get(media_type)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            threshold = self._threshold(headers)
+            status_code = start.get("status", 200)
+            if (
+                threshold is None
+                or status_code in (204, 206, 304)
+                or (not more_body and len(body) < threshold)
+            ):
+                self.passthrough = True
+                await self.downstream(start)
+                await self.downstream(message)
+                return
+
+            m = self.middleware
+            self.compress, self.flush = make_compressor(
+                self.encoding, m.gzip_level, m.brotli_quality, m.zstd_level
+            )
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                payload = self.compress(body) + self.flush()
+                headers["Content-Length"] = str(len(payload))
+                await self.downstream(start)
+                await self.downstream({"type": "http.response.body", "body": payload})
+                return
+
+            # Streaming body: the final length is unknown up front.
+            del headers["Content-Length"]
+            await self.downstream(start)
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        payload = self.compress(body)
+        if not more_body:
+            payload += self.flush()
+        await self.downstream(
+            {"type": "http.response.body", "body": payload, "more_body": more_body}
+        )
@@ -4,7 +4,12 @@ import secrets
 from typing import List, Dict, Any
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-from app.core.config_defaults import DEFAULT_UPLOAD_ALLOWED_EXTENSIONS, DEFAULT_UPLOAD_MAX_FILE_SIZES
+from app.core.config_defaults import (
+    DEFAULT_COMPRESSION_MINIMUM_SIZES,
+    DEFAULT_RATE_LIMITS,
+    DEFAULT_UPLOAD_ALLOWED_EXTENSIONS,
+    DEFAULT_UPLOAD_MAX_FILE_SIZES,
+)
 
 load_dotenv()
 
@@ -15,6 +20,20 @@ class Settings(BaseSettings):
     APP_ENV: str = os.getenv("APP_ENV") or os.getenv("NODE_ENV") or "development"
 
     DATABASE_URL: str | None = os.getenv("DATABASE_URL")
+    # Optional; derived from DATABASE_URL (asyncpg / aiosqlite) when unset
+    ASYNC_DATABASE_URL: str | None = os.getenv("ASYNC_DATABASE_URL")
+
+    # Connection pool, per engine and per worker: budget
+    # (workers + running app.cli commands) x 2 engines x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # against max_connections (see app.db.pool).
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+    DB_POOL_PRE_PING: bool = (os.getenv("DB_POOL_PRE_PING", "true").lower() == "true")
+    DB_POOL_WAIT_WARN_SECONDS: float = float(os.getenv("DB_POOL_WAIT_WARN_SECONDS", "1.0"))
+    # Use NullPool and disable prepared statements when running behind PgBouncer
+    DB_PGBOUNCER_MODE: bool = (os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true")
 
     SECRET_KEY: str | None = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
@@ -31,6 +50,15 @@ class Settings(BaseSettings):
     VIEW_NAME: str | None = os.getenv("VIEW_NAME")
 
     PAYSTACK_SECRET_KEY: str | None = os.getenv("PAYSTACK_SECRET_KEY")
+    # How often each worker checks whether admin settings changed elsewhere
+    SETTINGS_CACHE_POLL_SECONDS: float = float(os.getenv("SETTINGS_CACHE_POLL_SECONDS", "5"))
+    # Shared Paystack client: deadlines (seconds), pool size and retries for safe requests
+    PAYSTACK_CONNECT_TIMEOUT: float = float(os.getenv("PAYSTACK_CONNECT_TIMEOUT", "3"))
+    PAYSTACK_READ_TIMEOUT: float = float(os.getenv("PAYSTACK_READ_TIMEOUT", "10"))
+    PAYSTACK_MAX_CONNECTIONS: int = int(os.getenv("PAYSTACK_MAX_CONNECTIONS", "20"))
+    PAYSTACK_MAX_KEEPALIVE: int = int(os.getenv("PAYSTACK_MAX_KEEPALIVE", "10"))
+    PAYSTACK_MAX_RETRIES: int = int(os.getenv("PAYSTACK_MAX_RETRIES", "2"))
+    PAYSTACK_RETRY_BACKOFF: float = float(os.getenv("PAYSTACK_RETRY_BACKOFF", "0.25"))
     FRONTEND_URL: str | None = os.getenv("FRONTEND_URL")
 
     SMTP_TLS: bool = (os.getenv("SMTP_TLS", "true").lower() == "true")
@@ -40,12 +68,87 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = os.getenv("SMTP_PASSWORD")
     EMAILS_FROM_EMAIL: str = os.getenv("EMAILS_FROM_EMAIL", "noreply@cibn.org")
     EMAILS_FROM_NAME: str = os.getenv("EMAILS_FROM_NAME", "CIBN Digital Library")
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "30"))
+    # Persistent sessions are reopened after this long unused (servers drop idle clients)
+    SMTP_IDLE_SECONDS: float = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+
+    # Transactional email outbox, drained by a background sender on each worker
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "2"))
+    EMAIL_BATCH_SIZE: int = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+    EMAIL_RATE_PER_SECOND: float = float(os.getenv("EMAIL_RATE_PER_SECOND", "5"))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+    EMAIL_RETRY_BACKOFF_SECONDS: float = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "60"))
+    # Locale used for email templates when the caller does not pass one
+    EMAIL_DEFAULT_LOCALE: str = os.getenv("EMAIL_DEFAULT_LOCALE", "en")
+    # Compiled template bytecode; Jinja2's per-user temp directory when unset
+    EMAIL_TEMPLATE_CACHE_DIR: str | None = os.getenv("EMAIL_TEMPLATE_CACHE_DIR")
+
+    # Bulk email campaigns (announcements to members)
+    CAMPAIGN_POLL_SECONDS: float = float(os.getenv("CAMPAIGN_POLL_SECONDS", "30"))
+    CAMPAIGN_BATCH_SIZE: int = int(os.getenv("CAMPAIGN_BATCH_SIZE", "500"))
+    CAMPAIGN_SMTP_CONNECTIONS: int = int(os.getenv("CAMPAIGN_SMTP_CONNECTIONS", "4"))
+    CAMPAIGN_RATE_PER_SECOND: float = float(os.getenv("CAMPAIGN_RATE_PER_SECOND", "50"))
+    CAMPAIGN_LEASE_SECONDS: float = float(os.getenv("CAMPAIGN_LEASE_SECONDS", "300"))
+
+    # Playback progress write-behind buffer (per worker)
+    PROGRESS_FLUSH_SECONDS: float = float(os.getenv("PROGRESS_FLUSH_SECONDS", "10"))
+    PROGRESS_BUFFER_MAX_ENTRIES: int = int(os.getenv("PROGRESS_BUFFER_MAX_ENTRIES", "50000"))
+    # How often each worker adds its tallied library accesses to purchases
+    ACCESS_COUNT_FLUSH_SECONDS: float = float(os.getenv("ACCESS_COUNT_FLUSH_SECONDS", "30"))
+
+    # Per-worker cache of the content ids each user owns
+    ENTITLEMENT_CACHE_USERS: int = int(os.getenv("ENTITLEMENT_CACHE_USERS", "10000"))
+    ENTITLEMENT_CACHE_TTL_SECONDS: float = float(os.getenv("ENTITLEMENT_CACHE_TTL_SECONDS", "300"))
 
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 24
 
+    # Physical stock is reserved for unpaid orders this long (the Paystack checkout window)
+    ORDER_STOCK_HOLD_MINUTES: int = int(os.getenv("ORDER_STOCK_HOLD_MINUTES", "30"))
+    STOCK_RESERVATION_SWEEP_SECONDS: float = float(os.getenv("STOCK_RESERVATION_SWEEP_SECONDS", "60"))
+
+    # Pending Paystack orders are re-verified in the background once this old
+    PAYMENT_RECONCILE_ENABLED: bool = (os.getenv("PAYMENT_RECONCILE_ENABLED", "true").lower() == "true")
+    PAYMENT_RECONCILE_INTERVAL_SECONDS: float = float(os.getenv("PAYMENT_RECONCILE_INTERVAL_SECONDS", "300"))
+    PAYMENT_RECONCILE_MIN_AGE_MINUTES: int = int(os.getenv("PAYMENT_RECONCILE_MIN_AGE_MINUTES", "15"))
+    PAYMENT_RECONCILE_BATCH_SIZE: int = int(os.getenv("PAYMENT_RECONCILE_BATCH_SIZE", "50"))
+    PAYMENT_RECONCILE_CONCURRENCY: int = int(os.getenv("PAYMENT_RECONCILE_CONCURRENCY", "5"))
+    # Unpaid orders are cancelled (and their stock holds released) after this long
+    PAYMENT_ORDER_EXPIRY_HOURS: int = int(os.getenv("PAYMENT_ORDER_EXPIRY_HOURS", "24"))
+
+    # Paystack webhooks are stored on receipt and processed by a background consumer
+    WEBHOOK_POLL_SECONDS: float = float(os.getenv("WEBHOOK_POLL_SECONDS", "2"))
+    WEBHOOK_BATCH_SIZE: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "100"))
+    WEBHOOK_MAX_ATTEMPTS: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+    WEBHOOK_RETRY_BACKOFF_SECONDS: float = float(os.getenv("WEBHOOK_RETRY_BACKOFF_SECONDS", "30"))
+
+    COMPRESSION_ENABLED: bool = (os.getenv("COMPRESSION_ENABLED", "true").lower() == "true")
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+    RATE_LIMIT_ENABLED: bool = (os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true")
+    # 'memory' (per worker) or 'database' (shared across workers)
+    RATE_LIMIT_STORE: str = os.getenv("RATE_LIMIT_STORE", "memory")
+    # How often idle rows are deleted from rate_limit_buckets (database store only)
+    RATE_LIMIT_PURGE_SECONDS: float = float(os.getenv("RATE_LIMIT_PURGE_SECONDS", "600"))
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = (os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true")
+
+    METRICS_ENABLED: bool = (os.getenv("METRICS_ENABLED", "true").lower() == "true")
+    # When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN: str | None = os.getenv("METRICS_TOKEN")
+
+    # Log requests with too many SQL statements or repeated statement shapes (N+1)
+    QUERY_INSPECTION_ENABLED: bool = (
+        os.getenv("QUERY_INSPECTION_ENABLED", "true" if APP_ENV == "development" else "false").lower() == "true"
+    )
+    QUERY_COUNT_WARN: int = int(os.getenv("QUERY_COUNT_WARN", "20"))
+    QUERY_REPEAT_WARN: int = int(os.getenv("QUERY_REPEAT_WARN", "5"))
+
     _cors_origins: List[str] = []
     _upload_allowed_extensions: Dict[str, List[str]] = {}
     _upload_max_file_sizes: Dict[str, int | None] = {}
+    _compression_minimum_sizes: Dict[str, int] = {}
+    _rate_limits: Dict[str, Dict[str, str]] = {}
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -58,6 +161,14 @@ class Settings(BaseSettings):
             os.getenv("UPLOAD_MAX_FILE_SIZES_JSON"),
             DEFAULT_UPLOAD_MAX_FILE_SIZES,
         )
+        self._compression_minimum_sizes = self._parse_dict(
+            os.getenv("COMPRESSION_MINIMUM_SIZES_JSON"),
+            DEFAULT_COMPRESSION_MINIMUM_SIZES,
+        )
+        self._rate_limits = self._parse_dict(
+            os.getenv("RATE_LIMITS_JSON"),
+            DEFAULT_RATE_LIMITS,
+        )
         self._validate_required()
 
     def _parse_list(self, value: str | None) -> List[str]:
@@ -113,4 +224,12 @@ class Settings(BaseSettings):
     def UPLOAD_MAX_FILE_SIZES(self) -> Dict[str, int | None]:
         return self._upload_max_file_sizes
 
+    @property
+    def COMPRESSION_MINIMUM_SIZES(self) -> Dict[str, int]:
+        return self._compression_minimum_sizes
+
+    @property
+    def RATE_LIMITS(self) -> Dict[str, Dict[str, str]]:
+        return self._rate_limits
+
 settings = Settings()
@@ -13,3 +13,26 @@ DEFAULT_UPLOAD_MAX_FILE_SIZES: Dict[str, int | None] = {
     "audio": None,
     "image": 10 * 1024 * 1024,
 }
+
+# Minimum response size (bytes) before compressing, keyed by media type.
+# Media types not listed here (images, video, audio, archives, PDFs) are
+# already compressed and are always sent as-is.
+DEFAULT_COMPRESSION_MINIMUM_SIZES: Dict[str, int] = {
+    "application/json": 512,
+    "application/javascript": 1024,
+    "application/xml": 1024,
+    "image/svg+xml": 1024,
+    "text/css": 1024,
+    "text/csv": 1024,
+    "text/html": 1024,
+    "text/plain": 1024,
+}
+
+# Auth throttling: "<count>/<second|minute|hour|day>" per client IP and per
+# submitted identifier (email or CIBN employee ID).
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, str]] = {
+    "login": {"ip": "30/minute", "identifier": "10/minute"},
+    "cibn-login": {"ip": "30/minute", "identifier": "10/minute"},
+    "register": {"ip": "10/minute", "identifier": "3/minute"},
+    "forgot-password": {"ip": "10/minute", "identifier": "3/hour"},
+}
@@ -0,0 +1,90 @@
+"""
+Long-lived outbound HTTP clients.
+
+Building an ``httpx.AsyncClient`` per call costs a DNS lookup, a TCP and TLS
+handshake and the loss of keep-alive on every request. Services instead hold
+one pooled client for the life of the process (opened at startup, closed at
+shutdown) with explicit timeouts and limits, and retry only requests that
+are safe to repeat.
+"""
+import asyncio
+import logging
+import random
+from typing import Collection, Optional, Tuple, Type
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    HTTP2_AVAILABLE = False
+
+# Failures where the request never reached the server: safe to retry any method.
+CONNECT_ERRORS: Tuple[Type[Exception], ...] = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Any transport failure: safe to retry idempotent requests only.
+TRANSPORT_ERRORS: Tuple[Type[Exception], ...] = (httpx.TransportError,)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def build_async_client(
+    base_url: str = "",
+    *,
+    connect_timeout: float,
+    read_timeout: float,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """A pooled client with explicit deadlines; ``transport`` lets tests inject a mock."""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=http2 and HTTP2_AVAILABLE and transport is None,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        transport=transport,
+    )
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 5.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def request_with_retries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    retries: int,
+    backoff: float,
+    retry_on: Tuple[Type[Exception], ...] = CONNECT_ERRORS,
+    retry_statuses: Collection[int] = (),
+    **kwargs,
+) -> httpx.Response:
+    """Send a request, retrying ``retry_on`` errors and ``retry_statuses`` responses.
+
+    The last response is returned (or the last error raised) once retries
+    are exhausted.
+    """
+    for attempt in range(retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except retry_on as exc:
+            if attempt == retries:
+                raise
+            logger.warning(f"{method} {url} failed ({exc.__class__.__name__}); retry {attempt + 1}/{retries}")
+        else:
+            if response.status_code not in retry_statuses or attempt == retries:
+                return response
+            logger.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1}/{retries}")
+        await asyncio.sleep(backoff_delay(attempt, backoff))
+    raise AssertionError("unreachable")
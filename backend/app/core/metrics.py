@@ -0,0 +1,345 @@
+"""
+Prometheus metrics for requests, database queries, connection pools,
+upload storage, the progress write-behind buffer and oversold orders.
+
+``MetricsMiddleware`` times every request and labels it by route template
+(``/api/v1/content/{content_id}``, never the raw path) so label cardinality
+stays bounded. SQLAlchemy cursor events count statements and their time,
+both globally and per request. Pool gauges follow the ``PoolStats`` hooks in
+``app.db.pool``; upload-disk usage is measured when ``/metrics`` is scraped.
+
+Under several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory: each worker then writes its samples there and
+``render_metrics`` aggregates all of them, whichever worker serves the scrape.
+"""
+import contextvars
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.pool import PoolStats, pool_snapshot, pool_stats
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed, in and outside of requests.",
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Execution time of single SQL statements.",
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route template.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request, by route template.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size (persistent connections) per engine.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Overflow connections open beyond the pool size.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_MAX_OVERFLOW = Gauge(
+    "db_pool_max_overflow",
+    "Configured overflow limit per engine.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up waiting for a connection.",
+    ["pool"],
+)
+
+PROGRESS_UPDATES = Counter(
+    "progress_updates_total",
+    "Playback progress states received from the players.",
+)
+PROGRESS_ROWS_WRITTEN = Counter(
+    "progress_rows_written_total",
+    "Progress rows written by buffer flushes.",
+)
+PROGRESS_BUFFER_ENTRIES = Gauge(
+    "progress_buffer_entries",
+    "Progress states waiting in the write-behind buffer.",
+    multiprocess_mode="livesum",
+)
+PROGRESS_FLUSH_DURATION = Histogram(
+    "progress_flush_seconds",
+    "Time taken to write the progress buffer to the database.",
+    buckets=LATENCY_BUCKETS,
+)
+PROGRESS_DROPPED = Counter(
+    "progress_dropped_total",
+    "Buffered progress states discarded because the buffer was full after a failed flush.",
+)
+
+ORDERS_OVERSOLD = Counter(
+    "orders_oversold_total",
+    "Paid orders held for staff because their stock hold lapsed and stock ran short.",
+)
+
+
+class _RequestQueries:
+    """Statement count and time for the request being served."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Copied into worker threads and greenlets, so sync routes and AsyncSession
+# queries both report to the request that issued them.
+_current_request: contextvars.ContextVar[Optional[_RequestQueries]] = contextvars.ContextVar(
+    "metrics_current_request", default=None
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Route template for a handled request; raw paths would explode cardinality."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # Mounted apps (StaticFiles) do not set scope["route"]; label by mount point.
+    root_path = scope.get("root_path") or ""
+    app_root = scope.get("app_root_path") or ""
+    mount = root_path[len(app_root):] if root_path.startswith(app_root) else root_path
+    return mount or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records request counts, latency and per-request query totals."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        queries = _RequestQueries()
+        token = _current_request.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _current_request.reset(token)
+            route = route_label(scope)
+            labels = (scope["method"], route, str(status_code))
+            HTTP_REQUESTS.labels(*labels).inc()
+            HTTP_REQUEST_DURATION.labels(*labels).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route).observe(queries.count)
+            REQUEST_DB_SECONDS.labels(route).observe(queries.seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(elapsed)
+    queries = _current_request.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+
+
+def _export_pool(snapshot: dict) -> None:
+    DB_POOL_SIZE.labels(snapshot["pool"]).set(snapshot["size"])
+    DB_POOL_OVERFLOW.labels(snapshot["pool"]).set(snapshot["overflow"])
+    DB_POOL_MAX_OVERFLOW.labels(snapshot["pool"]).set(snapshot["max_overflow"])
+
+
+def _observe_pool(stats: PoolStats, event_name: str, value: float) -> None:
+    if event_name == "checkout":
+        DB_POOL_CHECKED_OUT.labels(stats.name).inc()
+        _export_pool(stats.snapshot())
+    elif event_name == "returned":
+        _export_pool(stats.snapshot())
+    elif event_name == "checkin":
+        DB_POOL_CHECKED_OUT.labels(stats.name).dec()
+    elif event_name == "wait":
+        DB_POOL_CHECKOUT_WAIT.labels(stats.name).observe(value)
+    elif event_name == "timeout":
+        DB_POOL_TIMEOUTS.labels(stats.name).inc()
+
+
+_installed = False
+
+
+def install_db_metrics() -> None:
+    """Hook query counting into every engine and export the registered pools."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    # Listening on the Engine class covers the sync engine, the async engine's
+    # sync core and any engine created later.
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    for snapshot in pool_snapshot():
+        _export_pool(snapshot)
+        DB_POOL_CHECKED_OUT.labels(snapshot["pool"]).set(snapshot["checked_out"])
+        pool_stats[snapshot["pool"]].add_observer(_observe_pool)
+
+
+class UploadDiskCollector:
+    """Upload directory size and free space, measured at scrape time.
+
+    Walking the directory is cached for ``ttl`` seconds so frequent scrapes
+    do not stat every upload each time.
+    """
+
+    def __init__(self, upload_dir: str, ttl: float = 60.0) -> None:
+        self.upload_dir = Path(upload_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[float, int, int]] = None
+
+    def _walk(self) -> Tuple[int, int]:
+        total_bytes = files = 0
+        for root, _, names in os.walk(self.upload_dir):
+            for name in names:
+                try:
+                    total_bytes += os.stat(os.path.join(root, name)).st_size
+                    files += 1
+                except OSError:
+                    continue
+        return total_bytes, files
+
+    def usage(self) -> Tuple[int, int]:
+        now = time.monotonic()
+        with self._lock:
+            if self._cached is None or now - self._cached[0] >= self.ttl:
+                self._cached = (now, *self._walk())
+            return self._cached[1], self._cached[2]
+
+    def collect(self):
+        if not self.upload_dir.is_dir():
+            return
+        used_bytes, files = self.usage()
+        yield GaugeMetricFamily("upload_dir_bytes", "Total size of uploaded files.", value=used_bytes)
+        yield GaugeMetricFamily("upload_dir_files", "Number of uploaded files.", value=files)
+        try:
+            disk = shutil.disk_usage(self.upload_dir)
+        except OSError as e:
+            logger.warning(f"Could not read disk usage for {self.upload_dir}: {e}")
+            return
+        yield GaugeMetricFamily("upload_disk_total_bytes", "Size of the upload volume.", value=disk.total)
+        yield GaugeMetricFamily("upload_disk_free_bytes", "Free space on the upload volume.", value=disk.free)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics(upload_collector: Optional[UploadDiskCollector] = None) -> Tuple[bytes, str]:
+    """Exposition-format payload and content type for ``/metrics``."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = CollectorRegistry()
+        registry.register(_DefaultRegistryProxy())
+    if upload_collector is not None:
+        registry.register(upload_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class _DefaultRegistryProxy:
+    """Exposes the process-wide registry inside a per-scrape registry."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop this worker's live gauges from the shared multiprocess files."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
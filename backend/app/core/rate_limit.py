@@ -0,0 +1,250 @@
+"""
+Token-bucket rate limiting for the authentication endpoints.
+
+Every check runs against an in-process bucket first, so a burst is rejected
+without any I/O. When RATE_LIMIT_STORE=database, requests that pass locally
+are also charged against a bucket row in ``rate_limit_buckets`` so the limit
+holds across all uvicorn workers. Rejections raise HTTP 429 with a
+``Retry-After`` header.
+
+Every client IP and submitted identifier gets its own bucket row, so
+``rate_limit_purger`` deletes rows idle long enough to have refilled under
+the slowest configured limit; a refilled bucket carries no state.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    """Bucket capacity and refill rate (tokens per second)."""
+    capacity: float
+    refill_rate: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse a '<count>/<period>' string such as '10/minute'."""
+        count, _, period = value.partition("/")
+        seconds = _PERIODS.get(period.strip().lower())
+        if not seconds or int(count) <= 0:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        return cls(capacity=float(count), refill_rate=int(count) / seconds)
+
+
+def take_token(
+    tokens: float, updated_at: float, limit: RateLimit, now: float
+) -> Tuple[bool, float, float]:
+    """Refill a bucket up to ``now`` and try to take one token.
+
+    Returns (allowed, remaining_tokens, retry_after_seconds).
+    """
+    tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / limit.refill_rate
+
+
+class MemoryRateLimitStore:
+    """Per-process bucket store; also the fast path in front of a shared store.
+
+    Buckets are kept least recently used first, each with its own limit. Past
+    ``MAX_KEYS`` the store is pruned down to ``PRUNE_TO`` keys: buckets that
+    have refilled under their own limit go first, then the least recently used.
+    """
+
+    MAX_KEYS = 100_000
+    PRUNE_TO = 90_000
+
+    def __init__(self) -> None:
+        self._buckets: "OrderedDict[str, Tuple[float, float, RateLimit]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (limit.capacity, now, limit))
+            allowed, tokens, retry_after = take_token(tokens, updated_at, limit, now)
+            self._buckets[key] = (tokens, now, limit)
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping.
+        for key, (tokens, updated_at, limit) in list(self._buckets.items()):
+            if tokens + (now - updated_at) * limit.refill_rate >= limit.capacity:
+                del self._buckets[key]
+        while len(self._buckets) > self.PRUNE_TO:
+            self._buckets.popitem(last=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseRateLimitStore:
+    """Bucket store shared by all workers through the ``rate_limit_buckets`` table."""
+
+    def __init__(self, session_factory: Callable) -> None:
+        self.session_factory = session_factory
+
+    def consume(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        from app.models import RateLimitBucket
+
+        for attempt in range(2):
+            db = self.session_factory()
+            try:
+                bucket = (
+                    db.query(RateLimitBucket)
+                    .filter(RateLimitBucket.key == key)
+                    .with_for_update()
+                    .first()
+                )
+                if bucket is None:
+                    bucket = RateLimitBucket(key=key, tokens=limit.capacity, updated_at=now)
+                    db.add(bucket)
+                allowed, tokens, retry_after = take_token(
+                    bucket.tokens, bucket.updated_at, limit, now
+                )
+                bucket.tokens = tokens
+                bucket.updated_at = now
+                db.commit()
+                return allowed, retry_after
+            except IntegrityError:
+                # Another worker created the row first; retry against it.
+                db.rollback()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+                return True, 0.0
+            finally:
+                db.close()
+        return True, 0.0
+
+    def purge(self, older_than: float) -> int:
+        """Delete buckets untouched since ``older_than`` (unix time)."""
+        from app.models import RateLimitBucket
+
+        db = self.session_factory()
+        try:
+            deleted = db.query(RateLimitBucket).filter(
+                RateLimitBucket.updated_at < older_than
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def reset(self) -> None:
+        pass
+
+
+class RateLimiter:
+    """Checks a named scope per client IP and per submitted identifier."""
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, str]],
+        shared_store: Optional[DatabaseRateLimitStore] = None,
+        enabled: bool = True,
+        trust_forwarded_for: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.local_store = MemoryRateLimitStore()
+        self.shared_store = shared_store
+        self.enabled = enabled
+        self.trust_forwarded_for = trust_forwarded_for
+        self.clock = clock
+        self.configure(limits)
+
+    def configure(self, limits: Dict[str, Dict[str, str]]) -> None:
+        self.limits = {
+            scope: {kind: RateLimit.parse(value) for kind, value in rules.items()}
+            for scope, rules in limits.items()
+        }
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded_for:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def check(self, request: Request, scope: str, identifier: Optional[str] = None) -> None:
+        """Charge one request to the scope's buckets or raise HTTP 429."""
+        if not self.enabled or scope not in self.limits:
+            return
+        rules = self.limits[scope]
+        keys = []
+        if "ip" in rules:
+            keys.append((f"{scope}:ip:{self.client_ip(request)}", rules["ip"]))
+        if identifier and "identifier" in rules:
+            keys.append((f"{scope}:id:{identifier.strip().lower()}", rules["identifier"]))
+
+        now = self.clock()
+        for key, limit in keys:
+            allowed, retry_after = self.local_store.consume(key, limit, now)
+            if allowed and self.shared_store is not None:
+                allowed, retry_after = self.shared_store.consume(key, limit, now)
+            if not allowed:
+                logger.warning(f"Rate limit exceeded for {scope} ({key.split(':')[1]})")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests. Please try again later.",
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+
+    def purge_idle_buckets(self) -> int:
+        """Delete shared buckets idle long enough to be full under every limit."""
+        if self.shared_store is None:
+            return 0
+        refill_seconds = max(
+            (limit.capacity / limit.refill_rate for rules in self.limits.values() for limit in rules.values()),
+            default=0.0,
+        )
+        return self.shared_store.purge(older_than=self.clock() - refill_seconds)
+
+    def reset(self) -> None:
+        self.local_store.reset()
+        if self.shared_store is not None:
+            self.shared_store.reset()
+
+
+def _build_shared_store() -> Optional[DatabaseRateLimitStore]:
+    if settings.RATE_LIMIT_STORE == "database":
+        from app.db.session import SessionLocal
+        return DatabaseRateLimitStore(SessionLocal)
+    return None
+
+
+rate_limiter = RateLimiter(
+    limits=settings.RATE_LIMITS,
+    shared_store=_build_shared_store(),
+    enabled=settings.RATE_LIMIT_ENABLED,
+    trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR,
+)
+
+
+def _purge() -> None:
+    purged = rate_limiter.purge_idle_buckets()
+    if purged:
+        logger.info(f"Purged {purged} idle rate limit bucket(s)")
+
+
+rate_limit_purger = PeriodicTask(
+    "rate-limit-bucket-purger",
+    interval=settings.RATE_LIMIT_PURGE_SECONDS,
+    func=_purge,
+)
@@ -0,0 +1,60 @@
+"""
+Liveness and readiness.
+
+``/health`` is liveness. It answers as long as the worker serves requests
+and never touches the database, so a database outage does not get healthy
+workers restarted. ``/ready`` is readiness: 200 once the database answers
+and its schema is at the head of the migration chain, 503 until then.
+Workers start without waiting for the database, and whatever routes traffic
+(load balancer, compose healthcheck) holds it back until ``/ready`` passes.
+
+The schema revision is compared until it matches once; a schema does not
+move backwards under a running worker. After that a probe costs one
+``SELECT 1``. Alembic is only imported by that first comparison, not when
+the app is imported.
+"""
+import logging
+import threading
+from typing import Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Whether this worker can serve requests that need the database."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self._schema_current = False
+        self._lock = threading.Lock()
+
+    def check(self) -> Tuple[bool, str]:
+        """``(ready, reason)``; never raises."""
+        try:
+            if not self._schema_current:
+                self._check_schema()
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except RuntimeError as exc:
+            logger.error(str(exc))
+            return False, str(exc)
+        except Exception as exc:
+            logger.warning(f"Readiness check failed: {exc}")
+            return False, f"Database unavailable ({exc.__class__.__name__})"
+        return True, "ready"
+
+    def _check_schema(self) -> None:
+        from app.db.migrations import check_schema
+
+        with self._lock:
+            if not self._schema_current:
+                check_schema(self.engine)
+                self._schema_current = True
+
+
+readiness = Readiness(engine)
@@ -1 +1 @@
-from .session import SessionLocal, engine, get_db
\ No newline at end of file
+from .session import SessionLocal, engine, get_db, AsyncSessionLocal, async_engine, get_async_db
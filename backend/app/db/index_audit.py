@@ -0,0 +1,150 @@
+"""
+Index audit: columns the application filters on that no index serves.
+
+``audit_indexes`` compares what the queries need with what the database has:
+
+* every foreign key column (joins, and the scans ``ON DELETE`` does on the
+  referencing table), except the few in ``EXEMPT_FOREIGN_KEYS``;
+* the non-key lookups in ``HOT_FILTERS``. These come from reading the
+  queries, not from the models, so the list is maintained by hand: add an
+  entry with any new lookup on a column that is not a foreign key;
+* every index declared on the models, by name, including the partial ones.
+
+A requirement is met by any index whose leading columns are exactly the
+required ones, in any order, and that has no ``WHERE`` clause. On
+PostgreSQL the indexes are read from ``pg_indexes``. Other databases (the
+SQLite test database) are read through SQLAlchemy's inspector.
+
+Run it against a deployed database with ``python -m app.cli audit-indexes``.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+
+from app.db.session import Base
+
+
+class IndexInfo(NamedTuple):
+    table: str
+    name: str
+    columns: Tuple[str, ...]
+    predicate: Optional[str] = None
+
+
+class Requirement(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    reason: str
+
+
+class Finding(NamedTuple):
+    table: str
+    index: str  # required columns, or the declared index name
+    reason: str
+
+
+# Lookups on columns that are not foreign keys
+HOT_FILTERS: Sequence[Requirement] = (
+    Requirement("users", ("email",), "login and registration"),
+    Requirement("users", ("reset_token",), "password reset"),
+    Requirement("orders", ("payment_reference",), "payment verification and webhooks"),
+    Requirement("purchases", ("user_id", "content_id"), "entitlement checks"),
+    Requirement("content_progress", ("user_id", "content_id"), "progress reads and heartbeat upserts"),
+    Requirement("webhook_events", ("reference",), "webhook lookups by payment reference"),
+    Requirement("email_outbox", ("status", "next_attempt_at"), "outbox polling"),
+)
+
+# Foreign keys on small admin tables, where an index would cost more than the scan
+EXEMPT_FOREIGN_KEYS = {
+    ("email_campaigns", "content_id"),
+    ("email_campaigns", "created_by"),
+}
+
+_SORT_OPTIONS = re.compile(r"\s+(ASC|DESC|NULLS\s+FIRST|NULLS\s+LAST)\b.*$", re.IGNORECASE)
+
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += (char == "(") - (char == ")")
+        current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_indexdef(indexdef: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """Key columns and ``WHERE`` predicate of a ``pg_indexes.indexdef``."""
+    start = indexdef.index("(", indexdef.index(" USING "))
+    depth = 0
+    for end in range(start, len(indexdef)):
+        depth += (indexdef[end] == "(") - (indexdef[end] == ")")
+        if depth == 0:
+            break
+    columns = tuple(
+        _SORT_OPTIONS.sub("", column).strip('"')
+        for column in _split_top_level(indexdef[start + 1:end])
+    )
+    where = re.search(r"\bWHERE\s+(.*)$", indexdef[end + 1:], re.DOTALL)
+    return columns, where.group(1).strip() if where else None
+
+
+def existing_indexes(connection: Connection) -> List[IndexInfo]:
+    """Every index in the current schema, unique constraints and primary keys included."""
+    if connection.dialect.name == "postgresql":
+        rows = connection.execute(text(
+            "SELECT tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema()"
+        ))
+        return [IndexInfo(table, name, *parse_indexdef(indexdef)) for table, name, indexdef in rows]
+
+    inspector = inspect(connection)
+    where_option = f"{connection.dialect.name}_where"
+    indexes = []
+    for table in inspector.get_table_names():
+        primary_key = inspector.get_pk_constraint(table)
+        if primary_key["constrained_columns"]:
+            indexes.append(IndexInfo(table, primary_key.get("name") or f"{table}_pkey", tuple(primary_key["constrained_columns"])))
+        for unique in inspector.get_unique_constraints(table):
+            indexes.append(IndexInfo(table, unique["name"] or "", tuple(unique["column_names"])))
+        for index in inspector.get_indexes(table):
+            predicate = (index.get("dialect_options") or {}).get(where_option)
+            indexes.append(IndexInfo(table, index["name"], tuple(index["column_names"]), predicate))
+    return indexes
+
+
+def requirements(metadata: MetaData = Base.metadata) -> List[Requirement]:
+    required = [
+        Requirement(table.name, (fk.parent.name,), f"foreign key to {fk.column.table.name}")
+        for table in metadata.sorted_tables
+        for fk in table.foreign_keys
+        if (table.name, fk.parent.name) not in EXEMPT_FOREIGN_KEYS
+    ]
+    return required + list(HOT_FILTERS)
+
+
+def _serves(index: IndexInfo, columns: Tuple[str, ...]) -> bool:
+    return index.predicate is None and set(index.columns[:len(columns)]) == set(columns)
+
+
+def audit_indexes(connection: Connection, metadata: MetaData = Base.metadata) -> List[Finding]:
+    """What is missing from the database, in table order."""
+    by_table: Dict[str, List[IndexInfo]] = {}
+    for index in existing_indexes(connection):
+        by_table.setdefault(index.table, []).append(index)
+
+    findings = []
+    for required in requirements(metadata):
+        if not any(_serves(index, required.columns) for index in by_table.get(required.table, [])):
+            findings.append(Finding(required.table, ", ".join(required.columns), required.reason))
+
+    names = {index.name for indexes in by_table.values() for index in indexes}
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in names:
+                findings.append(Finding(table.name, index.name, "declared on the model but missing"))
+    return sorted(set(findings))
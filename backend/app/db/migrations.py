@@ -0,0 +1,107 @@
+"""
+Schema migrations.
+
+The schema has one owner: the Alembic chain in ``migrations/``. Apply it with
+``python -m app.cli migrate``, once per deploy and before any worker starts
+(the Docker image does this in its command). Workers never run DDL. They
+only compare the database's revision with the head of the chain
+(``check_schema``, a single read of ``alembic_version``), and report not
+ready until it matches (see ``app.core.readiness``).
+
+Databases built by ``create_all`` before the chain took over have tables but
+no ``alembic_version``. ``migrate --stamp-existing`` adopts them: it checks
+that every table and column of ``STAMP_BASELINE`` is present, stamps that
+revision, and upgrades from there. The revisions after the baseline create
+the tables and indexes added since; the few parts create_all also made
+(content_progress, upload_settings, the users profile columns) are only
+added when missing.
+"""
+import logging
+from pathlib import Path
+from typing import List, Optional, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Last revision the schema built by startup create_all (before the chain owned
+# the schema) covers; the later revisions create what that schema lacked
+STAMP_BASELINE = "20260210_add_settings_tables"
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def upgrade(connection: Optional[Connection] = None, revision: str = "head") -> None:
+    """Apply the chain up to ``revision``."""
+    command.upgrade(alembic_config(connection), revision)
+
+
+def stamp(connection: Connection, revision: str) -> None:
+    """Record ``revision`` as applied without running it."""
+    command.stamp(alembic_config(connection), revision)
+
+
+def unversioned_tables(connection: Connection) -> bool:
+    """Whether the database has tables but no ``alembic_version``: built by create_all, never migrated."""
+    tables = inspect(connection).get_table_names()
+    return "users" in tables and "alembic_version" not in tables
+
+
+def _columns(connection: Connection) -> Set[str]:
+    inspector = inspect(connection)
+    return {
+        f"{table}.{column['name']}"
+        for table in inspector.get_table_names()
+        if table != "alembic_version"
+        for column in inspector.get_columns(table)
+    }
+
+
+def missing_from_baseline(connection: Connection) -> List[str]:
+    """Columns (``table.column``) of the ``STAMP_BASELINE`` schema the database lacks.
+
+    The baseline schema is built by running the chain on a scratch in-memory
+    SQLite database, so only names are compared, not types.
+    """
+    scratch = create_engine("sqlite://")
+    try:
+        with scratch.connect() as scratch_connection:
+            upgrade(scratch_connection, STAMP_BASELINE)
+            expected = _columns(scratch_connection)
+    finally:
+        scratch.dispose()
+    return sorted(expected - _columns(connection))
+
+
+def check_schema(engine: Engine) -> None:
+    """Raise ``RuntimeError`` unless the database is at the head of the chain."""
+    head = head_revision()
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, the code expects {head}. "
+            "Run `python -m app.cli migrate` before starting the workers."
+        )
+    logger.info(f"Database schema at revision {head}")
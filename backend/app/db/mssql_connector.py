@@ -1,4 +1,3 @@
-import pyodbc
 import re
 from typing import Optional, Dict, Any
 import logging
@@ -60,6 +59,14 @@ class MSSQLConnector:
             WHERE MemberId = ?
         """
 
+        try:
+            # Imported on first use: loading the ODBC driver manager slows every
+            # worker start, and only CIBN member logins need it.
+            import pyodbc
+        except ImportError as e:
+            logger.error(f"pyodbc is unavailable, CIBN member login disabled: {e}")
+            return None
+
         try:
             with pyodbc.connect(conn_str, timeout=5) as conn:
                 cursor = conn.cursor()
@@ -0,0 +1,196 @@
+"""
+Connection pool configuration and instrumentation.
+
+Pool sizing comes from Settings so the total connection budget can be
+matched to the database's max_connections. Each uvicorn worker has two
+pooled engines (sync and async), and so does every ``app.cli`` process
+running alongside (migrate, reconcile-payments, send-campaign):
+
+    (workers + cli processes) x 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+The in-process background jobs borrow from their worker's sync pool, so they
+are inside that budget but compete with requests for it.
+
+Every pooled engine records how long checkouts wait, how many connections
+are checked out, overflow usage and checkout timeouts, so pool starvation
+is visible before requests start failing.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Counters for one engine's pool, updated from pool hooks."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.checked_out_max = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # Called as observer(stats, event, value) for "checkout", "checkin",
+        # "returned" (the pool has taken the connection back, so overflow is
+        # current), "wait" and "timeout"; used to export the counters as metrics.
+        self.observers: List[Callable[["PoolStats", str, float], None]] = []
+
+    def add_observer(self, observer: Callable[["PoolStats", str, float], None]) -> None:
+        self.observers.append(observer)
+
+    def notify(self, event_name: str, value: float = 1.0) -> None:
+        for observer in self.observers:
+            try:
+                observer(self, event_name, value)
+            except Exception as e:
+                logger.warning(f"Pool observer failed for '{self.name}': {e}")
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.notify("wait", seconds)
+        if seconds >= settings.DB_POOL_WAIT_WARN_SECONDS:
+            logger.warning(
+                f"Slow connection checkout on '{self.name}' pool: waited {seconds:.2f}s "
+                f"({self.checked_out} checked out)"
+            )
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        self.notify("timeout")
+        logger.error(f"Connection pool '{self.name}' exhausted: checkout timed out")
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "pool": self.name,
+            "size": pool.size() if isinstance(pool, QueuePool) else 0,
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+            "max_overflow": getattr(pool, "_max_overflow", 0),
+            "checked_out": self.checked_out,
+            "checked_out_max": self.checked_out_max,
+            "connections_opened": self.connections_opened,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class _TimedCheckoutMixin:
+    """Times how long a checkout waits for a free connection."""
+
+    stats: PoolStats | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_timeout()
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start)
+
+    def _do_return_conn(self, record):
+        # The checkin event fires before the pool closes an overflow connection.
+        super()._do_return_conn(record)
+        if self.stats is not None:
+            self.stats.notify("returned")
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same stats.
+        pool = super().recreate()
+        pool.stats = self.stats
+        if self.stats is not None:
+            self.stats.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments for the configured pooling strategy."""
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool per driver; sizing options do not apply.
+        return {}
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer (transaction pooling) owns the pool. Server-side prepared
+        # statements do not survive across its backend connections, so the
+        # asyncpg statement caches must be off.
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        return options
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+pool_stats: Dict[str, PoolStats] = {}
+
+
+def instrument_pool(engine: Engine, name: str) -> PoolStats:
+    """Attach pool event hooks to a (sync) engine and register its stats."""
+    stats = PoolStats(name)
+    stats.pool = engine.pool
+    if isinstance(engine.pool, _TimedCheckoutMixin):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.connections_opened += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with stats._lock:
+            stats.checkouts += 1
+            stats.checked_out += 1
+            stats.checked_out_max = max(stats.checked_out_max, stats.checked_out)
+        stats.notify("checkout")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.checked_out = max(stats.checked_out - 1, 0)
+        stats.notify("checkin")
+
+    pool_stats[name] = stats
+    return stats
+
+
+def pool_snapshot() -> list[Dict[str, Any]]:
+    """Current stats for every instrumented pool."""
+    return [stats.snapshot() for stats in pool_stats.values()]
@@ -0,0 +1,151 @@
+"""
+Query counting for tests and development: budgets and N+1 detection.
+
+``query_budget`` asserts how many SQL statements a block of code issues::
+
+    with query_budget(6, max_repeats=1):
+        client.post("/api/v1/orders", json=payload, headers=headers)
+
+Statements are grouped by *shape* (whitespace collapsed, literals and
+expanded ``IN (...)`` lists folded), so the same query run once per loop
+iteration is reported as one shape with a repeat count: the signature of an
+N+1. Recorders started with ``record_queries`` see statements from every
+thread, because the TestClient runs the app on its own event-loop thread.
+
+``QueryInspectionMiddleware`` applies the same check per request and logs a
+warning when a request exceeds QUERY_COUNT_WARN statements or repeats one
+shape QUERY_REPEAT_WARN times.
+"""
+import contextvars
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions differing only in values compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _IN_LIST.sub("IN (...)", shape)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more statements (or repeats) than budgeted."""
+
+
+class QueryRecorder:
+    """Statements executed while the recorder is active."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str) -> None:
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Shapes executed at least ``threshold`` times, most frequent first."""
+        counts = Counter(statement_shape(s) for s in self.statements)
+        return [(shape, n) for shape, n in counts.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.count} statement(s):"]
+        lines += [f"  {i}. {_WHITESPACE.sub(' ', s).strip()}" for i, s in enumerate(self.statements, 1)]
+        return "\n".join(lines)
+
+
+_active_recorders: List[QueryRecorder] = []
+_active_lock = threading.Lock()
+_request_recorders: contextvars.ContextVar[Tuple[QueryRecorder, ...]] = contextvars.ContextVar(
+    "query_budget_request_recorders", default=()
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if _active_recorders:
+        with _active_lock:
+            recorders = list(_active_recorders)
+        for recorder in recorders:
+            recorder.record(statement)
+    for request_recorder in _request_recorders.get():
+        request_recorder.record(statement)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Record every statement executed, in any thread, until the block exits."""
+    recorder = QueryRecorder()
+    with _active_lock:
+        _active_recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        with _active_lock:
+            _active_recorders.remove(recorder)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryRecorder]:
+    """Fail if the block executes more than ``max_queries`` statements.
+
+    With ``max_repeats`` set, also fail if any statement shape runs more than
+    that many times (an N+1 pattern).
+    """
+    with record_queries() as recorder:
+        yield recorder
+
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f"Query budget exceeded: {recorder.count} > {max_queries}.")
+    if max_repeats is not None:
+        for shape, n in recorder.repeated(max_repeats + 1):
+            problems.append(f"Statement repeated {n} times (max {max_repeats}): {shape}")
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems) + "\n" + recorder.report())
+
+
+class QueryInspectionMiddleware:
+    """Logs requests that issue too many statements or repeat one shape."""
+
+    def __init__(self, app: ASGIApp, max_queries: int = 20, max_repeats: int = 5) -> None:
+        self.app = app
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder()
+        token = _request_recorders.set(_request_recorders.get() + (recorder,))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_recorders.reset(token)
+            request = f"{scope['method']} {scope['path']}"
+            if recorder.count > self.max_queries:
+                logger.warning(f"{request} executed {recorder.count} SQL statements")
+            for shape, n in recorder.repeated(self.max_repeats):
+                logger.warning(f"Possible N+1 in {request}: statement ran {n} times: {shape}")
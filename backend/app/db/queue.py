@@ -0,0 +1,36 @@
+"""
+Claiming work from table-backed queues (webhook inbox, email outbox).
+
+Queue rows carry ``status``, ``attempts`` and ``next_attempt_at``. A worker
+claims due pending rows oldest first with ``FOR UPDATE SKIP LOCKED`` (a
+no-op on SQLite, which serializes writers anyway), counts the attempt and
+pushes ``next_attempt_at`` past a lease so no other worker picks them up
+while they are handled. If the worker dies, the rows become due again when
+the lease runs out.
+"""
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+
+def claim_due(db: Session, model, pending_status, batch_size: int, now: datetime, lease_seconds: float) -> List:
+    """Claim up to ``batch_size`` due rows of ``model`` and return them in id order (commits)."""
+    ids = list(db.scalars(
+        select(model.id)
+        .where(model.status == pending_status, model.next_attempt_at <= now)
+        .order_by(model.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ))
+    if ids:
+        db.execute(
+            update(model)
+            .where(model.id.in_(ids))
+            .values(attempts=model.attempts + 1, next_attempt_at=now + timedelta(seconds=lease_seconds))
+        )
+    db.commit()
+    if not ids:
+        return []
+    return list(db.scalars(select(model).where(model.id.in_(ids)).order_by(model.id)))
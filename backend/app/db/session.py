@@ -1,42 +1,44 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
-import time
+from app.db.pool import instrument_pool, pool_options
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pool settings
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=3600,
-)
+# Create engine with connection pool settings (see app.db.pool)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
+instrument_pool(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def wait_for_db(max_retries=30, retry_interval=2):
-    """Wait for database to be ready"""
-    for attempt in range(max_retries):
-        try:
-            # Try to connect
-            connection = engine.connect()
-            connection.close()
-            logger.info("Database connection established successfully")
-            return True
-        except Exception as e:
-            logger.warning(f"Database connection attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_interval)
-            else:
-                logger.error("Failed to connect to database after maximum retries")
-                raise
-    return False
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver."""
+    scheme, sep, rest = url.partition("://")
+    driver = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "postgres": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }.get(scheme, scheme)
+    if driver == "postgresql+asyncpg":
+        # asyncpg takes 'ssl' rather than libpq's 'sslmode'.
+        rest = rest.replace("sslmode=", "ssl=")
+    return f"{driver}{sep}{rest}"
+
+
+# Async engine for routes declared `async def`, so queries never block the event loop
+_async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **pool_options(_async_url, is_async=True))
+instrument_pool(async_engine.sync_engine, "async")
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 
 def get_db():
@@ -46,3 +48,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
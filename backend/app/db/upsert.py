@@ -0,0 +1,23 @@
+"""
+Dialect-specific INSERT for ``ON CONFLICT`` upserts.
+
+``sqlalchemy.insert`` has no conflict clause; PostgreSQL (production) and
+SQLite (tests, local development) each provide an insert construct with
+``on_conflict_do_nothing`` / ``on_conflict_do_update`` and the same
+signature, so callers pick one by the session's dialect.
+"""
+from typing import Union
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def upsert_insert(db: Union[Session, AsyncSession], model):
+    """An INSERT for ``model`` that supports ON CONFLICT on the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upserts are not implemented for {dialect}")
@@ -1,12 +1,15 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
 import os
 import traceback
 import logging
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core import metrics
+from app.core.readiness import readiness
 
 # Configure logging
 logging.basicConfig(
@@ -14,8 +17,18 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-from app.api.routes import auth, content, orders, admin_settings, user_content, upload, progress
-from app.db.session import engine, Base, wait_for_db
+from app.api.routes import auth, content, orders, admin_settings, user_content, upload, progress, campaigns
+from app.db.query_budget import QueryInspectionMiddleware
+from app.services.payment import paystack_service
+from app.services.reconciliation import payment_reconciler
+from app.services.webhooks import webhook_consumer
+from app.services.email_outbox import email_sender, outbox_sender
+from app.services.email_templates import email_templates
+from app.services.campaigns import campaign_runner
+from app.services.progress import progress_flusher
+from app.services.access_counts import access_count_flusher
+from app.services.stock import reservation_sweeper
+from app.core.rate_limit import rate_limit_purger
 
 # Only expose interactive API docs / OpenAPI schema in development.
 _is_dev = settings.APP_ENV == "development"
@@ -28,17 +41,46 @@ app = FastAPI(
     redoc_url="/redoc" if _is_dev else None,
 )
 
-# Create database tables on startup (skip in test environment)
+# Start background work (skipped in the test environment). Workers neither
+# wait for the database nor run DDL: `python -m app.cli migrate` applies
+# migrations once before they start, and /ready reports 503 until the
+# database is reachable at the expected schema revision.
 @app.on_event("startup")
 def startup_event():
     if os.getenv("TESTING") != "true":
-        logger.info("Waiting for database to be ready...")
-        wait_for_db()
-        logger.info("Database ready, creating tables...")
-        Base.metadata.create_all(bind=engine)
+        reservation_sweeper.start()
+        webhook_consumer.start()
+        email_sender.start()
+        campaign_runner.start()
+        progress_flusher.start()
+        access_count_flusher.start()
+        if settings.PAYMENT_RECONCILE_ENABLED:
+            payment_reconciler.start()
+        if settings.RATE_LIMIT_STORE == "database":
+            rate_limit_purger.start()
+    paystack_service.start()
+    email_templates.load()
     # Log CORS origins
     logger.info(f"CORS Origins: {settings.CORS_ORIGINS}")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    reservation_sweeper.stop()
+    webhook_consumer.stop()
+    email_sender.stop()
+    campaign_runner.stop()
+    progress_flusher.stop()
+    await progress_flusher.run_once()  # write what is still buffered
+    access_count_flusher.stop()
+    await access_count_flusher.run_once()
+    outbox_sender.close()
+    payment_reconciler.stop()
+    rate_limit_purger.stop()
+    await paystack_service.aclose()
+    if settings.METRICS_ENABLED:
+        metrics.mark_process_dead()
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -50,6 +92,29 @@ app.add_middleware(
     max_age=600,
 )
 
+# Compress JSON/text responses; media that is already compressed passes through.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_sizes=settings.COMPRESSION_MINIMUM_SIZES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
+# Development aid: warn about request handlers with N+1 query patterns.
+if settings.QUERY_INSPECTION_ENABLED:
+    app.add_middleware(
+        QueryInspectionMiddleware,
+        max_queries=settings.QUERY_COUNT_WARN,
+        max_repeats=settings.QUERY_REPEAT_WARN,
+    )
+
+# Added last so it is the outermost middleware and times the whole stack.
+if settings.METRICS_ENABLED:
+    metrics.install_db_metrics()
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Generic exception handler for unhandled errors
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
@@ -75,6 +140,7 @@ app.include_router(admin_settings.router, prefix=settings.API_V1_STR)
 app.include_router(user_content.router, prefix=settings.API_V1_STR)
 app.include_router(upload.router, prefix=settings.API_V1_STR)
 app.include_router(progress.router, prefix=settings.API_V1_STR)
+app.include_router(campaigns.router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
@@ -88,4 +154,27 @@ def root():
 
 @app.get("/health")
 def health_check():
+    """Liveness: the worker is serving requests. Never touches the database."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness: the database answers and its schema is current."""
+    ready, reason = readiness.check()
+    if not ready:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": reason})
+    return {"status": "ready"}
+
+
+_upload_disk_collector = metrics.UploadDiskCollector(settings.UPLOAD_DIR)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint(request: Request):
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+    payload, content_type = metrics.render_metrics(_upload_disk_collector)
+    return Response(content=payload, media_type=content_type)
@@ -1,8 +1,13 @@
 from app.models.user import User, UserRole
 from app.models.content import Content, ContentType, ContentCategory
-from app.models.order import Order, OrderItem, Purchase, OrderStatus
-from app.models.settings import PaymentSettings, EmailSettings
+from app.models.order import Order, OrderItem, Purchase, OrderStatus, StockReservation
+from app.models.settings import PaymentSettings, EmailSettings, UploadSettings, SettingsVersion
 from app.models.content_progress import ContentProgress
+from app.models.rate_limit import RateLimitBucket
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.models.email_campaign import EmailCampaign, CampaignStatus
 
 __all__ = [
     "User",
@@ -14,7 +19,18 @@ __all__ = [
     "OrderItem",
     "Purchase",
     "OrderStatus",
+    "StockReservation",
     "PaymentSettings",
     "EmailSettings",
+    "UploadSettings",
+    "SettingsVersion",
     "ContentProgress",
+    "RateLimitBucket",
+    "JobCheckpoint",
+    "WebhookEvent",
+    "WebhookEventStatus",
+    "EmailOutbox",
+    "EmailStatus",
+    "EmailCampaign",
+    "CampaignStatus",
 ]
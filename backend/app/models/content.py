@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Enum as SQLEnum, Index, Text, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,6 +23,16 @@ class ContentCategory(str, enum.Enum):
 
 class Content(Base):
     __tablename__ = "contents"
+    __table_args__ = (
+        # The public catalogue only ever lists active, non-exclusive items.
+        Index(
+            "ix_contents_public",
+            "content_type",
+            "category",
+            postgresql_where=text("is_active AND NOT is_exclusive"),
+            sqlite_where=text("is_active = 1 AND is_exclusive = 0"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
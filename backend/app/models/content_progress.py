@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Boolean
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, UniqueConstraint, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -10,7 +10,7 @@ class ContentProgress(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    content_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False)
+    content_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Progress tracking
     playback_position = Column(Float, default=0.0, nullable=False)  # Current position in seconds
@@ -32,4 +32,13 @@ class ContentProgress(Base):
     # Ensure one progress record per user per content
     __table_args__ = (
         UniqueConstraint('user_id', 'content_id', name='uq_user_content_progress'),
+        # Continue watching: a user's unfinished items, most recent first.
+        # The included columns keep the progress side an index-only scan.
+        Index(
+            'ix_content_progress_resume',
+            user_id,
+            is_completed,
+            last_watched.desc(),
+            postgresql_include=['content_id', 'playback_position', 'total_duration', 'progress_percentage'],
+        ),
     )
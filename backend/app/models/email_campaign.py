@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, ForeignKey, Text
+from sqlalchemy.sql import func
+import enum
+from app.db.session import Base
+from app.models.content import ContentCategory
+from app.models.user import UserRole
+
+
+class CampaignStatus(str, enum.Enum):
+    QUEUED = "queued"
+    SENDING = "sending"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class EmailCampaign(Base):
+    """A bulk announcement to every active user matching the role and/or purchase category."""
+    __tablename__ = "email_campaigns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject = Column(String, nullable=False)
+    headline = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    content_id = Column(Integer, ForeignKey("contents.id"), nullable=True)  # the publication announced
+    # Recipient filters; None means everyone
+    role = Column(SQLEnum(UserRole), nullable=True)
+    category = Column(SQLEnum(ContentCategory), nullable=True)  # users who bought content in it
+    status = Column(SQLEnum(CampaignStatus), nullable=False, default=CampaignStatus.QUEUED, index=True)
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Index, Text
+from sqlalchemy.sql import func
+import enum
+from app.db.session import Base
+
+
+class EmailStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"  # rejected by the server or retries exhausted
+
+
+class EmailOutbox(Base):
+    """A transactional email queued by a request and sent by the background sender."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    status = Column(SQLEnum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.db.session import Base
+
+
+class JobCheckpoint(Base):
+    """Resume position and run lease of a background job, shared by all workers."""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String, primary_key=True)
+    # Job-defined cursor, e.g. the last order id handled in the current pass
+    position = Column(Integer, nullable=False, default=0)
+    # The worker holding the lease runs the job; others skip until it lapses
+    lease_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
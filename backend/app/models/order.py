@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum, ForeignKey, Index, Text, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -15,9 +15,18 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Reconciliation walks pending orders by id; they are a small slice of the table.
+        Index(
+            "ix_orders_pending",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     total_amount = Column(Float, nullable=False)
     status = Column(SQLEnum(OrderStatus), default=OrderStatus.PENDING)
     payment_reference = Column(String, unique=True, nullable=True)
@@ -32,14 +41,15 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     purchases = relationship("Purchase", back_populates="order")
+    reservations = relationship("StockReservation", back_populates="order", cascade="all, delete-orphan")
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    content_id = Column(Integer, ForeignKey("contents.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    content_id = Column(Integer, ForeignKey("contents.id"), nullable=False, index=True)
     quantity = Column(Integer, default=1)
     price_at_purchase = Column(Float, nullable=False)
     
@@ -50,11 +60,17 @@ class OrderItem(Base):
 
 class Purchase(Base):
     __tablename__ = "purchases"
+    __table_args__ = (
+        # One library entry per user and item; fulfillment inserts with ON CONFLICT DO NOTHING.
+        UniqueConstraint("user_id", "content_id", name="uq_purchases_user_content"),
+        # My Library pages: a user's purchases newest first, keyset on the date.
+        Index("ix_purchases_user_date", "user_id", "purchase_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    content_id = Column(Integer, ForeignKey("contents.id"), nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    content_id = Column(Integer, ForeignKey("contents.id"), nullable=False, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True, index=True)
     amount = Column(Float, nullable=True)
     quantity = Column(Integer, default=1)
     purchase_date = Column(DateTime(timezone=True), server_default=func.now())
@@ -65,3 +81,28 @@ class Purchase(Base):
     user = relationship("User", back_populates="purchases")
     content = relationship("Content", back_populates="purchases")
     order = relationship("Order", back_populates="purchases")
+
+
+class StockReservation(Base):
+    """Units of a physical item held for an unpaid order until ``expires_at``."""
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # Availability sums active holds per item; the covering index keeps
+        # that an index-only scan on PostgreSQL.
+        Index(
+            "ix_stock_reservations_content_expires",
+            "content_id",
+            "expires_at",
+            postgresql_include=["quantity"],
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    content_id = Column(Integer, ForeignKey("contents.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    order = relationship("Order", back_populates="reservations")
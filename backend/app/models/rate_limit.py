@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Float
+from app.db.session import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket state shared by all workers when RATE_LIMIT_STORE=database."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # unix timestamp of last refill
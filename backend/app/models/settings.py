@@ -53,4 +53,11 @@ class EmailSettings(Base):
     emails_from_email = Column(String, nullable=True)  # sender email address
     emails_from_name = Column(String, nullable=True, default="CIBN Digital Library")
     
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SettingsVersion(Base):
+    """Change counter per settings singleton, polled by each worker's settings cache."""
+    __tablename__ = "settings_versions"
+
+    name = Column(String, primary_key=True)  # 'payment', 'email' or 'upload'
+    version = Column(Integer, nullable=False, default=0)
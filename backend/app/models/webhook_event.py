@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Index, Text
+from sqlalchemy.sql import func
+import enum
+from app.db.session import Base
+
+
+class WebhookEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    IGNORED = "ignored"  # not actionable: unknown reference, amount mismatch, unhandled type
+    DEAD = "dead"  # retries exhausted; needs a look and `requeue-webhooks`
+
+
+class WebhookEvent(Base):
+    """Raw Paystack event stored on receipt and processed by the inbox consumer."""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # The consumer claims due pending events in arrival order.
+        Index("ix_webhook_events_status_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Paystack redelivers the same event until acknowledged; this key dedupes them
+    event_key = Column(String, unique=True, nullable=False)
+    event_type = Column(String, nullable=False)
+    reference = Column(String, nullable=True, index=True)
+    payload = Column(Text, nullable=False)
+    status = Column(SQLEnum(WebhookEventStatus), nullable=False, default=WebhookEventStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
@@ -3,6 +3,7 @@ from app.schemas.content import *  # noqa: F401,F403
 from app.schemas.order import *  # noqa: F401,F403
 from app.schemas.settings import *  # noqa: F401,F403
 from app.schemas.content_progress import *  # noqa: F401,F403
+from app.schemas.campaign import *  # noqa: F401,F403
 
 from app.schemas.user import (
     UserCreate,
@@ -17,6 +18,9 @@ from app.schemas.content import (
     ContentUpdate,
     ContentResponse,
     ContentListResponse,
+    ContentSummary,
+    LibraryItem,
+    LibraryPage,
 )
 from app.schemas.order import (
     OrderCreate,
@@ -30,6 +34,11 @@ from app.schemas.content_progress import (
     ContentProgressCreate,
     ContentProgressUpdate,
     ContentProgressResponse,
+    ContinueWatchingItem,
+)
+from app.schemas.campaign import (
+    EmailCampaignCreate,
+    EmailCampaignResponse,
 )
 
 __all__ = [
@@ -43,10 +52,16 @@ __all__ = [
     "ContentUpdate",
     "ContentResponse",
     "ContentListResponse",
+    "ContentSummary",
+    "LibraryItem",
+    "LibraryPage",
     "OrderCreate",
     "OrderResponse",
     "OrderItemCreate",
     "OrderItemResponse",
     "PaystackInitializeResponse",
     "PaystackWebhook",
+    "ContinueWatchingItem",
+    "EmailCampaignCreate",
+    "EmailCampaignResponse",
 ]
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from app.models.content import ContentCategory
+from app.models.email_campaign import CampaignStatus
+from app.models.user import UserRole
+
+
+class EmailCampaignCreate(BaseModel):
+    """A bulk announcement; with no filters it goes to every active user."""
+    subject: str = Field(min_length=1, max_length=200)
+    headline: str = Field(min_length=1, max_length=200)
+    message: str = Field(min_length=1)
+    content_id: Optional[int] = None  # publication to link to
+    role: Optional[UserRole] = None
+    category: Optional[ContentCategory] = None  # users who bought content in this category
+
+
+class EmailCampaignResponse(BaseModel):
+    id: int
+    subject: str
+    headline: str
+    message: str
+    content_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    category: Optional[ContentCategory] = None
+    status: CampaignStatus
+    sent_count: int
+    failed_count: int
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
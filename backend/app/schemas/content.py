@@ -58,3 +58,35 @@ class ContentListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+
+
+class ContentSummary(BaseModel):
+    """The few content columns list views and rails show."""
+    id: int
+    title: str
+    content_type: ContentType
+    category: ContentCategory
+    author: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    duration: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LibraryItem(BaseModel):
+    """A purchased item in the user's library, with its progress."""
+    content: ContentSummary
+    purchase_id: int
+    purchase_date: Optional[datetime] = None
+    access_count: int = 0
+    last_accessed: Optional[datetime] = None
+    # None until the user starts playing the item
+    progress_percentage: Optional[float] = None
+    is_completed: bool = False
+
+
+class LibraryPage(BaseModel):
+    items: list[LibraryItem]
+    # Pass back as ``cursor`` for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.content import ContentSummary
 
 
 class ContentProgressBase(BaseModel):
@@ -22,8 +23,23 @@ class ContentProgressUpdate(BaseModel):
     is_completed: Optional[bool] = None
 
 
+class ProgressHeartbeat(BaseModel):
+    """Current playback state of one item, sent periodically by the players."""
+    content_id: int
+    playback_position: float = Field(ge=0)
+    total_duration: Optional[float] = Field(default=None, ge=0)
+    progress_percentage: float = Field(ge=0, le=100)
+    is_completed: bool = False
+
+
+class ProgressHeartbeatBatch(BaseModel):
+    """Heartbeats collected by a client; later entries for the same item win."""
+    updates: List[ProgressHeartbeat] = Field(min_length=1, max_length=100)
+
+
 class ContentProgressResponse(ContentProgressBase):
-    id: int
+    # None while the latest state is still buffered and has never been written
+    id: Optional[int] = None
     user_id: int
     last_watched: datetime
     created_at: datetime
@@ -31,3 +47,12 @@ class ContentProgressResponse(ContentProgressBase):
     
     class Config:
         from_attributes = True
+
+
+class ContinueWatchingItem(BaseModel):
+    """An unfinished item for the resume rail, with its content summary."""
+    content: ContentSummary
+    playback_position: float
+    total_duration: Optional[float] = None
+    progress_percentage: float
+    last_watched: datetime
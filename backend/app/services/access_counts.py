@@ -0,0 +1,115 @@
+"""
+Library access counters (``Purchase.access_count`` / ``last_accessed``).
+
+Downloads only note the access in ``access_counter``, an in-memory tally per
+worker, so serving a file never waits on a write. ``access_count_flusher``
+adds the tallies to ``purchases`` every ACCESS_COUNT_FLUSH_SECONDS (and on
+shutdown). Each purchase accessed since the last flush costs one row of a
+single executemany ``UPDATE ... SET access_count = access_count + :n``,
+found by its (user_id, content_id) key.
+The increments are relative, so workers flushing the same rows never lose
+each other's counts.
+
+A failed flush puts its tallies back for the next one. Counts still in
+memory when a worker is killed without a shutdown are lost; these are
+analytics, not billing.
+"""
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+from sqlalchemy import Integer, bindparam, case, func, update
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.models import Purchase
+
+purchases = Purchase.__table__
+
+Key = Tuple[int, int]  # user id, content id
+
+accessed_at_param = bindparam("accessed_at", type_=purchases.c.last_accessed.type)
+
+INCREMENT = (
+    update(purchases)
+    .where(purchases.c.user_id == bindparam("b_user_id"), purchases.c.content_id == bindparam("b_content_id"))
+    .values(
+        access_count=func.coalesce(purchases.c.access_count, 0) + bindparam("increment", type_=Integer),
+        # Another worker may already have written a later access
+        last_accessed=case(
+            (purchases.c.last_accessed > accessed_at_param, purchases.c.last_accessed),
+            else_=accessed_at_param,
+        ),
+    )
+)
+
+
+class AccessCounter:
+    """Accesses per purchase since the last flush."""
+
+    def __init__(self) -> None:
+        self._counts: Counter = Counter()
+        self._last: Dict[Key, datetime] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, user_id: int, content_id: int) -> None:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._counts[user_id, content_id] += 1
+            self._last[user_id, content_id] = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts, self._last = Counter(), {}
+
+    def flush(self, db: Session) -> int:
+        """Add the tallies to ``purchases`` and commit; returns the number of purchases updated."""
+        with self._lock:
+            counts, last = self._counts, self._last
+            self._counts, self._last = Counter(), {}
+        if not counts:
+            return 0
+        try:
+            db.execute(
+                INCREMENT,
+                [
+                    {"b_user_id": user_id, "b_content_id": content_id, "increment": n, "accessed_at": last[user_id, content_id]}
+                    for (user_id, content_id), n in counts.items()
+                ],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._counts.update(counts)
+                for key, accessed_at in last.items():
+                    self._last[key] = max(accessed_at, self._last.get(key, accessed_at))
+            raise
+        return len(counts)
+
+
+access_counter = AccessCounter()
+
+
+def flush_access_counts() -> None:
+    if not len(access_counter):
+        return
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        access_counter.flush(db)
+    finally:
+        db.close()
+
+
+access_count_flusher = PeriodicTask(
+    "access-counts",
+    interval=settings.ACCESS_COUNT_FLUSH_SECONDS,
+    func=flush_access_counts,
+)
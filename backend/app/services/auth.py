@@ -10,7 +10,7 @@ from app.db.mssql_connector import mssql_db
 
 
 def create_user(db: Session, user_data: UserCreate) -> User:
-    """Create a new user."""
+    """Add a new user to the session; the caller commits."""
     # Check if email already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -54,8 +54,7 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
@@ -0,0 +1,223 @@
+"""
+Bulk email campaigns: newsletters and new-content announcements.
+
+An admin queues a campaign, and ``campaign_runner`` picks it up on whichever
+worker first takes its lease (``app.services.checkpoints``). Recipients are
+the active users matching the campaign's role and/or purchase category. They
+are streamed in id order through a server-side cursor (``yield_per``), so
+memory stays flat however many members there are.
+
+Each batch is rendered from the ``announcement`` template. It is then sent
+over a small pool of persistent SMTP sessions (CAMPAIGN_SMTP_CONNECTIONS),
+all paced by one CAMPAIGN_RATE_PER_SECOND throttle.
+
+After every batch, the last user id and the sent counts are checkpointed.
+If a run dies, another worker takes over once the lease lapses, and at most
+the unfinished batch is sent twice. Recipients the server rejects
+permanently are counted as failed and skipped. Any other failure stops the
+run, and the next poll retries it from the checkpoint.
+"""
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.models import CampaignStatus, Content, EmailCampaign, Purchase, User
+from app.services.checkpoints import acquire_lease, release_lease, save_checkpoint
+from app.services.email import EmailConfig, SMTPConnection, Throttle, build_message, get_email_config
+from app.services.email_outbox import is_permanent
+from app.services.email_templates import EmailContent, email_templates
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = "announcement"
+ACTIVE = (CampaignStatus.QUEUED, CampaignStatus.SENDING)
+
+Recipient = Tuple[int, str, str]  # user id, email, full name
+
+
+def checkpoint_name(campaign_id: int) -> str:
+    return f"email_campaign:{campaign_id}"
+
+
+def campaign_link(campaign: EmailCampaign) -> str:
+    base = settings.FRONTEND_URL or ""
+    return f"{base}/content/{campaign.content_id}" if campaign.content_id else base
+
+
+def recipients_query(campaign: EmailCampaign, after_id: int = 0):
+    """Active users the campaign goes to, after ``after_id``, in id order."""
+    query = select(User.id, User.email, User.full_name).where(User.is_active.is_(True), User.id > after_id)
+    if campaign.role is not None:
+        query = query.where(User.role == campaign.role)
+    if campaign.category is not None:
+        query = query.where(
+            exists().where(
+                Purchase.user_id == User.id,
+                Purchase.content_id == Content.id,
+                Content.category == campaign.category,
+            )
+        )
+    return query.order_by(User.id)
+
+
+def render_batch(campaign: EmailCampaign, batch: Sequence[Recipient]) -> List[Tuple[str, EmailContent]]:
+    shared = dict(subject=campaign.subject, headline=campaign.headline, message=campaign.message, link=campaign_link(campaign))
+    return [(email, email_templates.render(TEMPLATE, user_name=name, **shared)) for _, email, name in batch]
+
+
+class CampaignSender:
+    """Sends rendered batches over a pool of persistent SMTP sessions at a shared rate."""
+
+    def __init__(self, config: EmailConfig, connections: int, rate: float) -> None:
+        self.config = config
+        self.connections = [SMTPConnection() for _ in range(max(1, connections))]
+        self.throttle = Throttle(rate)
+        self._pool = ThreadPoolExecutor(len(self.connections), thread_name_prefix="campaign-smtp")
+
+    def send(self, messages: List[Tuple[str, EmailContent]]) -> Counter:
+        """Send a batch, one slice per connection; raises if a connection keeps failing."""
+        n = len(self.connections)
+        futures = [
+            self._pool.submit(self._send_slice, connection, messages[i::n])
+            for i, connection in enumerate(self.connections)
+        ]
+        stats: Counter = Counter()
+        errors = []
+        for future in futures:
+            sent, failed, error = future.result()
+            stats.update(sent=sent, failed=failed)
+            if error is not None:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+        return +stats
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        for connection in self.connections:
+            connection.close()
+
+    def _send_slice(self, connection: SMTPConnection, messages: List[Tuple[str, EmailContent]]):
+        sent = failed = 0
+        for email_to, content in messages:
+            self.throttle.wait()
+            try:
+                connection.send(self.config, build_message(self.config, email_to, *content))
+            except Exception as exc:
+                if not is_permanent(exc):
+                    connection.close()
+                    return sent, failed, exc
+                logger.warning(f"Campaign email to {email_to} rejected: {exc}")
+                failed += 1
+            else:
+                sent += 1
+        return sent, failed, None
+
+
+def send_campaign(
+    campaign_id: int,
+    session_factory: Optional[Callable[[], Session]] = None,
+    *,
+    batch_size: Optional[int] = None,
+    connections: Optional[int] = None,
+    rate: Optional[float] = None,
+) -> Counter:
+    """Send (or resume) one campaign; returns counts of sent and failed emails for this run."""
+    if session_factory is None:
+        from app.db.session import SessionLocal as session_factory
+
+    batch_size = batch_size or settings.CAMPAIGN_BATCH_SIZE
+    lease = settings.CAMPAIGN_LEASE_SECONDS
+    name = checkpoint_name(campaign_id)
+    stats: Counter = Counter()
+
+    db = session_factory()
+    try:
+        campaign = db.get(EmailCampaign, campaign_id)
+        if campaign is None or campaign.status not in ACTIVE:
+            return stats
+        config = get_email_config(db)
+        if config is None:
+            logger.warning(f"Campaign {campaign_id} not sent: SMTP is not configured")
+            return stats
+        position = acquire_lease(db, name, lease)
+        if position is None:
+            return stats  # another worker is sending it
+
+        if campaign.status == CampaignStatus.QUEUED:
+            campaign.status = CampaignStatus.SENDING
+            campaign.started_at = datetime.now(timezone.utc)
+        save_checkpoint(db, name, position, lease)
+        logger.info(f"Sending campaign {campaign_id} from user {position}")
+
+        sender = CampaignSender(
+            config,
+            connections or settings.CAMPAIGN_SMTP_CONNECTIONS,
+            settings.CAMPAIGN_RATE_PER_SECOND if rate is None else rate,
+        )
+        # The cursor needs its own connection: checkpoint commits would close it.
+        stream = session_factory()
+        completed = False
+        try:
+            query = recipients_query(campaign, position).execution_options(yield_per=batch_size)
+            with closing(stream.execute(query)) as result:
+                for batch in result.partitions():
+                    db.refresh(campaign)
+                    if campaign.status == CampaignStatus.CANCELLED:
+                        logger.info(f"Campaign {campaign_id} cancelled at user {position}")
+                        break
+                    sent = sender.send(render_batch(campaign, batch))
+                    position = batch[-1].id
+                    campaign.sent_count += sent["sent"]
+                    campaign.failed_count += sent["failed"]
+                    save_checkpoint(db, name, position, lease)
+                    stats += sent
+                else:
+                    completed = True
+        finally:
+            stream.close()
+            sender.close()
+            db.rollback()  # counts not checkpointed belong to the unfinished batch
+            if completed:
+                campaign.status = CampaignStatus.COMPLETED
+                campaign.finished_at = datetime.now(timezone.utc)
+                logger.info(f"Campaign {campaign_id} completed: {campaign.sent_count} sent, {campaign.failed_count} failed")
+            release_lease(db, name, position)
+        return stats
+    finally:
+        db.close()
+
+
+def _run_campaigns() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        campaign_ids = db.scalars(
+            select(EmailCampaign.id).where(EmailCampaign.status.in_(ACTIVE)).order_by(EmailCampaign.id)
+        ).all()
+    finally:
+        db.close()
+    for campaign_id in campaign_ids:
+        try:
+            stats = send_campaign(campaign_id)
+        except Exception as exc:
+            logger.error(f"Campaign {campaign_id} stopped, will resume from its checkpoint: {exc}")
+        else:
+            if stats:
+                logger.info(f"Campaign {campaign_id}: {dict(stats)}")
+
+
+campaign_runner = PeriodicTask(
+    "email-campaigns",
+    interval=settings.CAMPAIGN_POLL_SECONDS,
+    func=_run_campaigns,
+)
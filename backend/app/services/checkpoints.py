@@ -0,0 +1,63 @@
+"""
+Checkpoints and run leases for resumable background jobs.
+
+A job that walks a table in batches records its position after each batch,
+so a crash or redeploy resumes where it stopped instead of starting over.
+The same row carries a lease: every worker runs the scheduler, but only the
+one that takes the lease does a pass, and a lease left by a dead worker
+lapses after ``lease_seconds``. All functions commit; call them with
+``run_sync`` from async code.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import JobCheckpoint
+
+
+def acquire_lease(db: Session, name: str, lease_seconds: float, now: Optional[datetime] = None) -> Optional[int]:
+    """Take the lease for ``name`` and return the saved position, or None if another worker holds it."""
+    now = now or datetime.utcnow()
+    if db.scalar(select(JobCheckpoint.name).where(JobCheckpoint.name == name)) is None:
+        db.add(JobCheckpoint(name=name, position=0))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another worker created it first
+
+    taken = db.execute(
+        update(JobCheckpoint)
+        .where(
+            JobCheckpoint.name == name,
+            or_(JobCheckpoint.lease_until.is_(None), JobCheckpoint.lease_until <= now),
+        )
+        .values(lease_until=now + timedelta(seconds=lease_seconds), updated_at=now)
+    ).rowcount
+    db.commit()
+    if not taken:
+        return None
+    return db.scalar(select(JobCheckpoint.position).where(JobCheckpoint.name == name))
+
+
+def save_checkpoint(db: Session, name: str, position: int, lease_seconds: float) -> None:
+    """Record progress (with the caller's pending changes) and extend the lease."""
+    now = datetime.utcnow()
+    db.execute(
+        update(JobCheckpoint)
+        .where(JobCheckpoint.name == name)
+        .values(position=position, lease_until=now + timedelta(seconds=lease_seconds), updated_at=now)
+    )
+    db.commit()
+
+
+def release_lease(db: Session, name: str, position: int) -> None:
+    """Record the final position and let the next run start immediately."""
+    db.execute(
+        update(JobCheckpoint)
+        .where(JobCheckpoint.name == name)
+        .values(position=position, lease_until=None, updated_at=datetime.utcnow())
+    )
+    db.commit()
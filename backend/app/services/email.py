@@ -3,6 +3,8 @@ Email service for sending emails via SMTP.
 Supports dynamic configuration from database with fallback to environment variables.
 """
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Optional, NamedTuple
@@ -10,6 +12,8 @@ from sqlalchemy.orm import Session
 import logging
 
 from app.core.config import settings
+from app.services.email_templates import EmailContent, email_templates
+from app.services.settings_cache import EMAIL, settings_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +29,31 @@ class EmailConfig(NamedTuple):
     from_name: str
 
 
+def _load_email_settings(db: Session) -> Optional[EmailConfig]:
+    """Snapshot the EmailSettings row, or None when it has no usable SMTP server."""
+    from app.models import EmailSettings
+    email_settings = db.query(EmailSettings).first()
+    if not (email_settings and email_settings.smtp_host and email_settings.smtp_password):
+        return None
+    smtp_user = email_settings.smtp_user
+    return EmailConfig(
+        smtp_host=email_settings.smtp_host,
+        smtp_port=email_settings.smtp_port or 587,
+        smtp_user=smtp_user,
+        smtp_password=email_settings.smtp_password,
+        smtp_tls=email_settings.smtp_tls if email_settings.smtp_tls is not None else True,
+        from_email=email_settings.emails_from_email or smtp_user,
+        from_name=email_settings.emails_from_name or "CIBN Digital Library",
+    )
+
+
 def get_email_config(db: Optional[Session] = None) -> Optional[EmailConfig]:
     """
     Get email configuration from database, falling back to environment variables.
     
     Priority:
-    1. Database EmailSettings (if db provided and settings exist)
+    1. Database EmailSettings (if db provided and settings exist), served
+       from the settings cache
     2. Environment variables via app.core.config.settings
     
     Returns None if no valid configuration is available.
@@ -46,16 +69,9 @@ def get_email_config(db: Optional[Session] = None) -> Optional[EmailConfig]:
     # Try database first
     if db is not None:
         try:
-            from app.models import EmailSettings
-            email_settings = db.query(EmailSettings).first()
-            if email_settings and email_settings.smtp_host and email_settings.smtp_password:
-                smtp_host = email_settings.smtp_host
-                smtp_port = email_settings.smtp_port or 587
-                smtp_user = email_settings.smtp_user
-                smtp_password = email_settings.smtp_password
-                smtp_tls = email_settings.smtp_tls if email_settings.smtp_tls is not None else True
-                from_email = email_settings.emails_from_email or smtp_user
-                from_name = email_settings.emails_from_name or "CIBN Digital Library"
+            db_config = settings_cache.get(db, EMAIL, _load_email_settings)
+            if db_config:
+                smtp_host, smtp_port, smtp_user, smtp_password, smtp_tls, from_email, from_name = db_config
                 logger.debug("Using email configuration from database")
         except Exception as e:
             logger.warning(f"Failed to load email settings from database: {e}")
@@ -86,6 +102,120 @@ def get_email_config(db: Optional[Session] = None) -> Optional[EmailConfig]:
     )
 
 
+def build_message(
+    config: EmailConfig,
+    email_to: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None,
+) -> MIMEMultipart:
+    """Build a multipart/alternative message (plain text first, then HTML)."""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = f"{config.from_name} <{config.from_email}>"
+    message["To"] = email_to
+    
+    # Add plain text part
+    if text_content:
+        text_part = MIMEText(text_content, "plain")
+        message.attach(text_part)
+    
+    # Add HTML part
+    html_part = MIMEText(html_content, "html")
+    message.attach(html_part)
+    return message
+
+
+def open_smtp(config: EmailConfig, timeout: Optional[float] = None) -> smtplib.SMTP:
+    """Connect and log in: STARTTLS when ``smtp_tls`` is set, implicit TLS (SSL) otherwise."""
+    timeout = timeout or settings.SMTP_TIMEOUT
+    if config.smtp_tls:
+        server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=timeout)
+        try:
+            server.starttls()
+            server.login(config.smtp_user, config.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    server = smtplib.SMTP_SSL(config.smtp_host, config.smtp_port, timeout=timeout)
+    try:
+        server.login(config.smtp_user, config.smtp_password)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+class SMTPConnection:
+    """One authenticated SMTP session reused for many messages.
+
+    The session is opened on first use, reopened when the configuration
+    changes or it sat idle longer than SMTP_IDLE_SECONDS (servers drop idle
+    clients), and a message is resent once if the server had already closed
+    the connection. Not thread-safe: use one per sending thread.
+    """
+
+    def __init__(self, idle_seconds: Optional[float] = None) -> None:
+        self.idle_seconds = settings.SMTP_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self._server: Optional[smtplib.SMTP] = None
+        self._config: Optional[EmailConfig] = None
+        self._last_used = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._server is not None
+
+    def send(self, config: EmailConfig, message: MIMEMultipart) -> None:
+        """Send over the shared session; SMTP errors propagate to the caller."""
+        try:
+            self._session(config).send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._session(config).send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+    def _session(self, config: EmailConfig) -> smtplib.SMTP:
+        if self._server is not None and (
+            config != self._config or time.monotonic() - self._last_used > self.idle_seconds
+        ):
+            self.close()
+        if self._server is None:
+            logger.info(f"Opening SMTP session to {config.smtp_host}:{config.smtp_port}")
+            self._server = open_smtp(config)
+            self._config = config
+            self._last_used = time.monotonic()
+        return self._server
+
+
+class Throttle:
+    """Spaces calls to ``wait`` at most ``rate`` per second, across threads (0 disables)."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def send_email(
     email_to: str,
     subject: str,
@@ -94,7 +224,10 @@ def send_email(
     db: Optional[Session] = None
 ) -> bool:
     """
-    Send an email using SMTP configuration.
+    Send an email immediately over a new SMTP connection.
+
+    Request handlers should queue mail with ``app.services.email_outbox.queue_email``
+    instead; this is for callers that need the result now (the admin test email).
     
     Args:
         email_to: Recipient email address
@@ -113,35 +246,16 @@ def send_email(
             logger.error("SMTP credentials not configured (neither in database nor environment)")
             return False
         
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = f"{config.from_name} <{config.from_email}>"
-        message["To"] = email_to
-        
-        # Add plain text part
-        if text_content:
-            text_part = MIMEText(text_content, "plain")
-            message.attach(text_part)
-        
-        # Add HTML part
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
+        message = build_message(config, email_to, subject, html_content, text_content)
         
         # Send email
         logger.info(f"Sending email to {email_to} via {config.smtp_host}:{config.smtp_port}")
         
-        if config.smtp_tls:
-            # Use TLS (STARTTLS)
-            with smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=30) as server:
-                server.starttls()
-                server.login(config.smtp_user, config.smtp_password)
-                server.send_message(message)
-        else:
-            # Use SSL
-            with smtplib.SMTP_SSL(config.smtp_host, config.smtp_port, timeout=30) as server:
-                server.login(config.smtp_user, config.smtp_password)
-                server.send_message(message)
+        server = open_smtp(config)
+        try:
+            server.send_message(message)
+        finally:
+            server.quit()
         
         logger.info(f"Email sent successfully to {email_to}")
         return True
@@ -168,61 +282,16 @@ def send_test_email(recipient_email: str, db: Optional[Session] = None) -> bool:
     Returns:
         True if test email was sent successfully
     """
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }
-            .header { background: linear-gradient(135deg, #002366 0%, #059669 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }
-            .content { background: #ffffff; padding: 30px; border: 1px solid #e0e0e0; border-top: none; }
-            .success { background: #d4edda; border: 1px solid #c3e6cb; border-radius: 5px; padding: 15px; margin: 20px 0; color: #155724; }
-            .footer { background: #f5f5f5; padding: 20px; text-align: center; font-size: 12px; color: #666; border-radius: 0 0 8px 8px; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>✅ Email Configuration Test</h1>
-        </div>
-        <div class="content">
-            <div class="success">
-                <strong>Success!</strong> Your email configuration is working correctly.
-            </div>
-            <p>This is a test email from the CIBN Digital Library admin panel.</p>
-            <p>If you received this email, your SMTP settings are correctly configured and the system can send emails for:</p>
-            <ul>
-                <li>Welcome emails to new users</li>
-                <li>Password reset emails</li>
-                <li>Order confirmations</li>
-                <li>System notifications</li>
-            </ul>
-            <p>Best regards,<br>CIBN Digital Library System</p>
-        </div>
-        <div class="footer">
-            <p>This is an automated test message from CIBN Digital Library.</p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    text_content = """
-    Email Configuration Test - SUCCESS!
-    
-    This is a test email from the CIBN Digital Library admin panel.
-    
-    If you received this email, your SMTP settings are correctly configured.
-    
-    Best regards,
-    CIBN Digital Library System
-    """
-    
-    return send_email(
-        email_to=recipient_email,
-        subject="✅ CIBN Digital Library - Email Test Successful",
-        html_content=html_content,
-        text_content=text_content,
-        db=db
+    return send_email(email_to=recipient_email, db=db, **email_templates.render("smtp_test")._asdict())
+
+
+def password_reset_email_content(reset_token: str, user_name: str, locale: Optional[str] = None) -> EmailContent:
+    """Subject and bodies of the password reset email."""
+    return email_templates.render(
+        "password_reset",
+        locale,
+        user_name=user_name,
+        reset_link=f"{settings.FRONTEND_URL}/reset-password?token={reset_token}",
     )
 
 
@@ -238,123 +307,12 @@ def send_password_reset_email(email_to: str, reset_token: str, user_name: str) -
     Returns:
         True if email was sent successfully
     """
-    reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #002366 0%, #059669 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-                border-radius: 8px 8px 0 0;
-            }}
-            .content {{
-                background: #ffffff;
-                padding: 30px;
-                border: 1px solid #e0e0e0;
-                border-top: none;
-            }}
-            .button {{
-                display: inline-block;
-                background: linear-gradient(135deg, #002366 0%, #059669 100%);
-                color: white;
-                padding: 12px 30px;
-                text-decoration: none;
-                border-radius: 5px;
-                margin: 20px 0;
-                font-weight: bold;
-            }}
-            .footer {{
-                background: #f5f5f5;
-                padding: 20px;
-                text-align: center;
-                font-size: 12px;
-                color: #666;
-                border-radius: 0 0 8px 8px;
-            }}
-            .warning {{
-                background: #fff3cd;
-                border: 1px solid #ffc107;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 20px 0;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Password Reset Request</h1>
-        </div>
-        <div class="content">
-            <p>Hello {user_name},</p>
-            
-            <p>We received a request to reset your password for your CIBN Digital Library account.</p>
-            
-            <p>Click the button below to reset your password:</p>
-            
-            <div style="text-align: center;">
-                <a href="{reset_link}" class="button">Reset Password</a>
-            </div>
-            
-            <p>Or copy and paste this link into your browser:</p>
-            <p style="background: #f5f5f5; padding: 10px; word-break: break-all; font-family: monospace; font-size: 12px;">
-                {reset_link}
-            </p>
-            
-            <div class="warning">
-                <strong>⚠️ Important:</strong> This link will expire in 24 hours for security reasons.
-            </div>
-            
-            <p>If you didn't request this password reset, please ignore this email. Your password will remain unchanged.</p>
-            
-            <p>Best regards,<br>
-            The CIBN Digital Library Team</p>
-        </div>
-        <div class="footer">
-            <p>This is an automated message from CIBN Digital Library. Please do not reply to this email.</p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    text_content = f"""
-    Password Reset Request
-    
-    Hello {user_name},
-    
-    We received a request to reset your password for your CIBN Digital Library account.
-    
-    Click the link below to reset your password:
-    {reset_link}
-    
-    This link will expire in 24 hours for security reasons.
-    
-    If you didn't request this password reset, please ignore this email. Your password will remain unchanged.
-    
-    Best regards,
-    The CIBN Digital Library Team
-    """
-    
-    return send_email(
-        email_to=email_to,
-        subject="Reset Your Password - CIBN Digital Library",
-        html_content=html_content,
-        text_content=text_content
-    )
+    return send_email(email_to=email_to, **password_reset_email_content(reset_token, user_name)._asdict())
+
+
+def welcome_email_content(user_name: str, locale: Optional[str] = None) -> EmailContent:
+    """Subject and bodies of the welcome email."""
+    return email_templates.render("welcome", locale, user_name=user_name)
 
 
 def send_welcome_email(email_to: str, user_name: str) -> bool:
@@ -368,123 +326,4 @@ def send_welcome_email(email_to: str, user_name: str) -> bool:
     Returns:
         True if email was sent successfully
     """
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #002366 0%, #059669 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-                border-radius: 8px 8px 0 0;
-            }}
-            .content {{
-                background: #ffffff;
-                padding: 30px;
-                border: 1px solid #e0e0e0;
-                border-top: none;
-            }}
-            .button {{
-                display: inline-block;
-                background: linear-gradient(135deg, #002366 0%, #059669 100%);
-                color: white;
-                padding: 12px 30px;
-                text-decoration: none;
-                border-radius: 5px;
-                margin: 20px 0;
-                font-weight: bold;
-            }}
-            .footer {{
-                background: #f5f5f5;
-                padding: 20px;
-                text-align: center;
-                font-size: 12px;
-                color: #666;
-                border-radius: 0 0 8px 8px;
-            }}
-            .feature {{
-                background: #f8f9fa;
-                padding: 15px;
-                margin: 10px 0;
-                border-left: 4px solid #059669;
-                border-radius: 4px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Welcome to CIBN Digital Library!</h1>
-        </div>
-        <div class="content">
-            <p>Hello {user_name},</p>
-            
-            <p>Welcome to the CIBN Digital Library! Your account has been successfully created.</p>
-            
-            <p>You now have access to our extensive collection of banking and finance resources, including:</p>
-            
-            <div class="feature">
-                <strong>📚 E-Books</strong><br>
-                Access thousands of books on banking, finance, and professional development.
-            </div>
-            
-            <div class="feature">
-                <strong>📄 Research Papers</strong><br>
-                Read the latest research and publications in the financial sector.
-            </div>
-            
-            <div class="feature">
-                <strong>🎓 Educational Content</strong><br>
-                Enhance your knowledge with curated educational materials.
-            </div>
-            
-            <div style="text-align: center;">
-                <a href="{settings.FRONTEND_URL}" class="button">Start Exploring</a>
-            </div>
-            
-            <p>If you have any questions or need assistance, please don't hesitate to contact our support team.</p>
-            
-            <p>Best regards,<br>
-            The CIBN Digital Library Team</p>
-        </div>
-        <div class="footer">
-            <p>This is an automated message from CIBN Digital Library. Please do not reply to this email.</p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    text_content = f"""
-    Welcome to CIBN Digital Library!
-    
-    Hello {user_name},
-    
-    Welcome to the CIBN Digital Library! Your account has been successfully created.
-    
-    You now have access to our extensive collection of banking and finance resources.
-    
-    Visit {settings.FRONTEND_URL} to start exploring.
-    
-    If you have any questions or need assistance, please don't hesitate to contact our support team.
-    
-    Best regards,
-    The CIBN Digital Library Team
-    """
-    
-    return send_email(
-        email_to=email_to,
-        subject="Welcome to CIBN Digital Library!",
-        html_content=html_content,
-        text_content=text_content
-    )
+    return send_email(email_to=email_to, **welcome_email_content(user_name)._asdict())
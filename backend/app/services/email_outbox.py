@@ -0,0 +1,166 @@
+"""
+Transactional email outbox.
+
+Request handlers queue mail with ``queue_email`` in their own transaction,
+so a registration or password reset commits without waiting on the mail
+server, and an email is only sent if the change it describes committed.
+
+``email_sender`` drains the outbox on every worker. It claims due rows in
+batches (``app.db.queue.claim_due``) and sends them over one persistent SMTP
+session per worker (``SMTPConnection``), paced to EMAIL_RATE_PER_SECOND.
+Transient failures (connection, authentication, 4xx) are retried with
+jittered exponential backoff; permanent 5xx rejections, and messages out of
+attempts after EMAIL_MAX_ATTEMPTS, are marked dead. Delivery is at least
+once: a worker that dies mid-batch leaves its sent rows to be retried after
+the claim lease.
+"""
+import logging
+import smtplib
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.http import backoff_delay
+from app.db.queue import claim_due
+from app.models import EmailOutbox, EmailStatus
+from app.services.email import EmailContent, SMTPConnection, Throttle, build_message, get_email_config
+
+logger = logging.getLogger(__name__)
+
+# How long claimed messages are hidden from other workers while being sent
+CLAIM_SECONDS = 300
+RETRY_CAP_SECONDS = 6 * 3600
+
+
+def queue_email(db: Session, email_to: str, content: EmailContent) -> EmailOutbox:
+    """Add an email to the outbox; it is sent after the caller commits."""
+    email = EmailOutbox(
+        to_email=email_to,
+        subject=content.subject,
+        html_content=content.html_content,
+        text_content=content.text_content,
+        status=EmailStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(email)
+    return email
+
+
+def is_permanent(exc: Exception) -> bool:
+    """True for 5xx rejections of the message itself (retrying will not help)."""
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return False  # server configuration, not this message
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return False
+
+
+class OutboxSender:
+    """Sends outbox batches over a reused SMTP session at a bounded rate."""
+
+    def __init__(self, connection: Optional[SMTPConnection] = None) -> None:
+        self.connection = connection or SMTPConnection()
+        self._throttle = Throttle(settings.EMAIL_RATE_PER_SECOND)
+        # PeriodicTask runs never overlap, but the CLI or tests may share the sender.
+        self._lock = threading.Lock()
+
+    def send_batch(self, db: Session, batch_size: Optional[int] = None, now: Optional[datetime] = None) -> Counter:
+        """Claim and send one batch of due emails; returns the count of each outcome."""
+        with self._lock:
+            return self._send_batch(db, batch_size or settings.EMAIL_BATCH_SIZE, now or datetime.utcnow())
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    def _send_batch(self, db: Session, batch_size: int, now: datetime) -> Counter:
+        stats: Counter = Counter()
+        config = get_email_config(db)
+        if config is None:
+            logger.warning("Email outbox not sent: SMTP is not configured")
+            return stats
+
+        self._throttle.rate = settings.EMAIL_RATE_PER_SECOND
+        claimed: List[EmailOutbox] = claim_due(db, EmailOutbox, EmailStatus.PENDING, batch_size, now, CLAIM_SECONDS)
+        sent: List[int] = []
+        for position, email in enumerate(claimed):
+            self._throttle.wait()
+            try:
+                message = build_message(config, email.to_email, email.subject, email.html_content, email.text_content)
+                self.connection.send(config, message)
+            except Exception as exc:
+                if is_permanent(exc):
+                    self._fail(db, [email], exc, dead=True)
+                    stats["dead"] += 1
+                    continue
+                # The server or connection is unhealthy: put the rest of the
+                # batch back too instead of failing each one in turn.
+                self.connection.close()
+                remaining = claimed[position:]
+                dead = [e for e in remaining if e.attempts >= settings.EMAIL_MAX_ATTEMPTS]
+                retry = [e for e in remaining if e.attempts < settings.EMAIL_MAX_ATTEMPTS]
+                self._fail(db, dead, exc, dead=True)
+                self._fail(db, retry, exc, dead=False)
+                stats.update({"dead": len(dead), "retrying": len(retry)})
+                stats = +stats  # drop zero counts
+                break
+            else:
+                sent.append(email.id)
+
+        if sent:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent))
+                .values(status=EmailStatus.SENT, sent_at=datetime.utcnow(), last_error=None)
+            )
+            stats["sent"] += len(sent)
+        db.commit()
+        return stats
+
+    def _fail(self, db: Session, emails: List[EmailOutbox], exc: Exception, dead: bool) -> None:
+        if not emails:
+            return
+        values = {"last_error": f"{exc.__class__.__name__}: {exc}"}
+        if dead:
+            values["status"] = EmailStatus.DEAD
+            logger.error(f"Giving up on {len(emails)} email(s): {exc}")
+        else:
+            base = settings.EMAIL_RETRY_BACKOFF_SECONDS
+            delay = base + backoff_delay(max(e.attempts for e in emails), base, cap=RETRY_CAP_SECONDS)
+            values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Email sending failed, retrying {len(emails)} in {delay:.0f}s: {exc}")
+        db.execute(update(EmailOutbox).where(EmailOutbox.id.in_([e.id for e in emails])).values(**values))
+
+
+outbox_sender = OutboxSender()
+
+
+def _send_pending() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        while True:
+            stats = outbox_sender.send_batch(db)
+            if stats:
+                logger.info(f"Email outbox: {dict(stats)}")
+            if sum(stats.values()) < settings.EMAIL_BATCH_SIZE:
+                break
+    finally:
+        db.close()
+
+
+email_sender = PeriodicTask(
+    "email-outbox-sender",
+    interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    func=_send_pending,
+)
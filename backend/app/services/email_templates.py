@@ -0,0 +1,142 @@
+"""
+Email templates.
+
+Each email is one Jinja2 template in ``app/templates/email`` that is rendered
+twice: as HTML (autoescaped, inside ``layout.html.j2``) and as plain text
+(inside ``layout.txt.j2``). The macros in ``_macros.j2`` produce markup or
+text depending on ``format``, so both bodies come from the same source. A
+copy at ``<locale>/<name>.j2`` replaces the default for that locale.
+
+Templates are compiled once, by ``load()`` at startup, and never evicted or
+reloaded; compiled code also goes to a bytecode cache on disk so that new
+workers skip the compile step. Rendering is split in two. The first time an
+email is rendered for a locale and set of fields, the template is rendered
+with placeholders in place of the recipient's fields, and the output is kept
+as its static fragments. Every later email only joins those fragments with
+the escaped field values. Recipient fields must therefore be output as they
+are (``{{ user_name }}``), not through filters or conditions.
+"""
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, Template, TemplateError
+from markupsafe import escape
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+LAYOUTS = {"html": "layout.html.j2", "text": "layout.txt.j2"}
+
+# Placeholder for a recipient field; the control characters survive autoescaping.
+_SLOT = re.compile("\x1e(\\w+)\x1f")
+
+
+class EmailContent(NamedTuple):
+    """A rendered email, ready to send or queue."""
+    subject: str
+    html_content: str
+    text_content: Optional[str]
+
+
+class _Prerendered(NamedTuple):
+    """Static fragments of one email; odd positions hold recipient field names."""
+    subject: List[str]
+    html: List[str]
+    text: List[str]
+
+
+def _fill(parts: List[str], fields: Dict[str, Any], html: bool) -> str:
+    if len(parts) == 1:
+        return parts[0]
+    out = list(parts)
+    for i in range(1, len(parts), 2):
+        value = fields[parts[i]]
+        out[i] = escape(value) if html else str(value)
+    return "".join(out)
+
+
+class EmailTemplates:
+    """Compiled email templates with a cache of their pre-rendered static parts."""
+
+    def __init__(self, directory: Path = TEMPLATE_DIR, cache_dir: Optional[str] = None) -> None:
+        self.directory = Path(directory)
+        self.cache_dir = cache_dir
+        self.environments: Dict[str, Environment] = {}
+        self._prerendered: Dict[Tuple, _Prerendered] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Compile every template; call once at startup."""
+        environments = {fmt: self._environment(fmt) for fmt in LAYOUTS}
+        count = 0
+        for env in environments.values():
+            for name in env.list_templates(extensions=["j2"]):
+                env.get_template(name)
+                count += 1
+        with self._lock:
+            self.environments = environments
+            self._prerendered.clear()
+        logger.info(f"Compiled {count} email templates from {self.directory}")
+
+    def render(self, name: str, locale: Optional[str] = None, **fields: Any) -> EmailContent:
+        """Render the ``name`` email for one recipient."""
+        locale = locale or settings.EMAIL_DEFAULT_LOCALE
+        frontend_url = settings.FRONTEND_URL or ""
+        key = (name, locale, frontend_url, tuple(sorted(fields)))
+        prerendered = self._prerendered.get(key)
+        if prerendered is None:
+            prerendered = self._prerender(name, locale, frontend_url, fields)
+            self._prerendered[key] = prerendered
+        return EmailContent(
+            subject=_fill(prerendered.subject, fields, html=False).strip(),
+            html_content=_fill(prerendered.html, fields, html=True),
+            text_content=_fill(prerendered.text, fields, html=False),
+        )
+
+    def _environment(self, fmt: str) -> Environment:
+        env = Environment(
+            loader=FileSystemLoader(self.directory),
+            autoescape=fmt == "html",
+            # Autoescaping changes the compiled code, so each format has its own cache files.
+            bytecode_cache=FileSystemBytecodeCache(self.cache_dir, pattern=f"__email_{fmt}_%s.cache"),
+            cache_size=-1,
+            auto_reload=False,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        env.globals.update(format=fmt, layout=LAYOUTS[fmt])
+        env.globals["m"] = env.get_template("_macros.j2").module
+        return env
+
+    def _template(self, fmt: str, name: str, locale: str) -> Template:
+        if not self.environments:
+            self.load()
+        return self.environments[fmt].select_template([f"{locale}/{name}.j2", f"{name}.j2"])
+
+    def _prerender(self, name: str, locale: str, frontend_url: str, fields: Dict[str, Any]) -> _Prerendered:
+        context = {field: f"\x1e{field}\x1f" for field in fields}
+        context["frontend_url"] = frontend_url
+        text = self._template("text", name, locale)
+        subject = "".join(text.blocks["subject"](text.new_context(context)))
+        rendered = [subject, self._template("html", name, locale).render(context), text.render(context)]
+
+        split = []
+        for output in rendered:
+            parts = _SLOT.split(output)
+            unknown = set(parts[1::2]) - set(fields)
+            if unknown or any("\x1e" in part or "\x1f" in part for part in parts[::2]):
+                raise TemplateError(
+                    f"Email template {name!r} changes a recipient field ({', '.join(sorted(unknown)) or 'filtered'}); "
+                    "recipient fields must be output as they are"
+                )
+            split.append(parts)
+        return _Prerendered(*split)
+
+
+email_templates = EmailTemplates(cache_dir=settings.EMAIL_TEMPLATE_CACHE_DIR)
@@ -0,0 +1,93 @@
+"""
+Entitlements: which content a user has in their library.
+
+Every download asks "has this user purchased content X". ``entitlements``
+answers from memory. Each worker keeps, for its recently active users, the
+sorted ids of the content they own in a compact ``array`` (4 bytes per
+item), searched with ``bisect``. A user's ids are loaded with one read of
+``uq_purchases_user_content`` (user_id, content_id).
+
+Purchases on this worker drop the user's entry when their transaction
+commits (``invalidate_on_commit`` / ``invalidate``). A purchase made on
+another worker is found anyway: an id missing from the cached array is never
+trusted, and the entry is reloaded before access is refused. Positive
+answers can be stale for at most ENTITLEMENT_CACHE_TTL_SECONDS after a
+purchase is removed elsewhere. Only the ENTITLEMENT_CACHE_USERS most
+recently checked users are kept.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Purchase
+
+
+def _contains(ids: array, content_id: int) -> bool:
+    i = bisect_left(ids, content_id)
+    return i < len(ids) and ids[i] == content_id
+
+
+class EntitlementCache:
+    """Per-user sorted arrays of owned content ids, least recently used evicted first."""
+
+    def __init__(self, max_users: int, ttl: float) -> None:
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def owns(self, db: AsyncSession, user_id: int, content_id: int) -> bool:
+        """Whether ``user_id`` has ``content_id`` in their library."""
+        ids = self._cached(user_id)
+        if ids is not None and _contains(ids, content_id):
+            return True
+        owned = await db.scalars(
+            select(Purchase.content_id).where(Purchase.user_id == user_id).order_by(Purchase.content_id)
+        )
+        return _contains(self._store(user_id, owned), content_id)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user's entry (or all)."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def invalidate_on_commit(self, db: Session, user_id: int) -> None:
+        """Drop the user's entry once the caller's transaction commits."""
+        event.listen(db, "after_commit", lambda session: self.invalidate(user_id), once=True)
+
+    def _cached(self, user_id: int) -> Optional[array]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def _store(self, user_id: int, content_ids: Iterable[int]) -> array:
+        ids = array("i", content_ids)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic(), ids)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return ids
+
+
+entitlements = EntitlementCache(
+    max_users=settings.ENTITLEMENT_CACHE_USERS,
+    ttl=settings.ENTITLEMENT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,138 @@
+"""
+Order fulfillment shared by the verify-payment and webhook paths.
+
+Fulfilling an order costs a fixed number of statements however many items
+it has:
+
+1. a conditional ``UPDATE orders ... WHERE status NOT IN ('completed',
+   'processing')`` that claims the order, so a verify call and a webhook
+   racing on different workers cannot both fulfill it;
+2. one joined read of the order lines with their content type;
+3. one ``INSERT ... ON CONFLICT (user_id, content_id) DO NOTHING`` for the
+   digital purchases;
+4. for physical items, a locked read of their stock and holds, one
+   ``UPDATE contents`` decrementing all their stock (clamped at 0) and one
+   ``DELETE`` of the order's reservations.
+
+A payment can arrive after the order's hold expired and its units were sold
+to someone else. Lines stock can no longer cover are left out of the
+decrement, and the order is set to ``processing`` with a note for staff to
+refund or restock by hand (``orders_oversold_total`` counts them).
+
+The caller commits.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.metrics import ORDERS_OVERSOLD
+from app.db.upsert import upsert_insert
+from app.models import Content, ContentType, Order, OrderItem, OrderStatus, Purchase
+from app.services.entitlements import entitlements
+from app.services.stock import release_reservations, stock_shortfall
+
+logger = logging.getLogger(__name__)
+
+DIGITAL_TYPES = (ContentType.DOCUMENT, ContentType.VIDEO, ContentType.AUDIO)
+# Paid orders; ``processing`` ones are waiting for staff because stock ran short
+FULFILLED_STATUSES = (OrderStatus.COMPLETED, OrderStatus.PROCESSING)
+
+
+def paid_amount_matches(order: Order, paid_amount_kobo: Optional[int]) -> bool:
+    """Compare a Paystack amount (kobo) with the order total (naira).
+
+    A missing amount (test stubs) is treated as a match.
+    """
+    if paid_amount_kobo is None:
+        return True
+    return int(paid_amount_kobo) == int(round(order.total_amount * 100))
+
+
+def _clamped_at_zero(db: Session, expression):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.greatest(expression, 0)
+    # SQLite has no GREATEST; CASE is equivalent and portable.
+    return case((expression < 0, 0), else_=expression)
+
+
+def fulfill_order(db: Session, order: Order, payment_method: Optional[str] = None) -> bool:
+    """Complete an order: grant digital purchases and take physical stock.
+
+    Returns False (and changes nothing) when the order was already fulfilled.
+    """
+    values = {"status": OrderStatus.COMPLETED, "completed_at": datetime.utcnow()}
+    if payment_method is not None:
+        values["payment_method"] = payment_method
+    claimed = db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status.notin_(FULFILLED_STATUSES))
+        .values(**values)
+    ).rowcount
+    if not claimed:
+        logger.info(f"Order {order.id} already fulfilled; skipping")
+        return False
+
+    lines = db.execute(
+        select(OrderItem.content_id, OrderItem.quantity, OrderItem.price_at_purchase, Content.content_type)
+        .join(Content, Content.id == OrderItem.content_id)
+        .where(OrderItem.order_id == order.id)
+        .order_by(OrderItem.id)
+    ).all()
+
+    purchases: Dict[int, dict] = {}
+    stock_taken: Dict[int, int] = defaultdict(int)
+    for content_id, quantity, price, content_type in lines:
+        if content_type in DIGITAL_TYPES:
+            purchases.setdefault(content_id, {
+                "user_id": order.user_id,
+                "content_id": content_id,
+                "order_id": order.id,
+                "amount": price,
+                "quantity": quantity,
+                "access_count": 0,
+            })
+        elif content_type == ContentType.PHYSICAL:
+            stock_taken[content_id] += quantity
+
+    if purchases:
+        db.execute(
+            upsert_insert(db, Purchase)
+            .values(list(purchases.values()))
+            .on_conflict_do_nothing(index_elements=["user_id", "content_id"])
+        )
+        entitlements.invalidate_on_commit(db, order.user_id)
+
+    if stock_taken:
+        short = stock_shortfall(db, order.id, stock_taken)
+        for content_id in short:
+            del stock_taken[content_id]
+        if stock_taken:
+            taken = case(stock_taken, value=Content.id, else_=0)
+            db.execute(
+                update(Content)
+                .where(Content.id.in_(stock_taken), Content.stock_quantity.isnot(None))
+                .values(stock_quantity=_clamped_at_zero(db, Content.stock_quantity - taken))
+                .execution_options(synchronize_session=False)
+            )
+        release_reservations(db, order.id)
+        if short:
+            _flag_oversold(db, order, short)
+
+    return True
+
+
+def _flag_oversold(db: Session, order: Order, short: Dict[int, int]) -> None:
+    """Hold a paid order whose lapsed hold left it short of stock for staff."""
+    lines = ", ".join(f"content {content_id}: {units} short" for content_id, units in sorted(short.items()))
+    logger.error(f"Order {order.id} was paid after its stock hold lapsed and cannot be filled ({lines})")
+    ORDERS_OVERSOLD.inc()
+    note = f"Paid after the stock hold lapsed; not enough stock ({lines}). Refund or restock by hand."
+    db.execute(
+        update(Order)
+        .where(Order.id == order.id)
+        .values(status=OrderStatus.PROCESSING, notes=func.coalesce(Order.notes + "\n", "") + note)
+    )
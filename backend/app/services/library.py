@@ -0,0 +1,68 @@
+"""
+The user's library ("My Library"): purchased items with their progress.
+
+``library_query`` reads one page in a single statement. It walks the user's
+purchases newest first on ``ix_purchases_user_date``, joins the content
+summary, and left-joins ``content_progress`` on its (user_id, content_id)
+key. Pages are keyset-paginated on (purchase_date, id), so page 40 costs the
+same as page 1. The cursor is the last item's key, opaque to clients.
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, false, func, select, tuple_
+
+from app.models import Content, ContentCategory, ContentProgress, ContentType, Purchase
+from app.services.progress import SUMMARY_COLUMNS
+
+Cursor = Tuple[datetime, int]  # purchase_date, purchase id
+
+
+def encode_cursor(purchase_date: datetime, purchase_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{purchase_date.isoformat()}|{purchase_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ``ValueError`` for anything ``encode_cursor`` did not produce."""
+    try:
+        purchase_date, purchase_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(purchase_date), int(purchase_id)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def library_query(
+    user_id: int,
+    limit: int,
+    after: Optional[Cursor] = None,
+    content_type: Optional[ContentType] = None,
+    category: Optional[ContentCategory] = None,
+):
+    """Up to ``limit`` library rows after the cursor, newest purchase first."""
+    query = (
+        select(
+            Purchase.id.label("purchase_id"),
+            Purchase.purchase_date,
+            func.coalesce(Purchase.access_count, 0).label("access_count"),
+            Purchase.last_accessed,
+            ContentProgress.progress_percentage,
+            func.coalesce(ContentProgress.is_completed, false()).label("is_completed"),
+            *SUMMARY_COLUMNS,
+        )
+        .join(Content, Content.id == Purchase.content_id)
+        .outerjoin(
+            ContentProgress,
+            and_(ContentProgress.user_id == Purchase.user_id, ContentProgress.content_id == Purchase.content_id),
+        )
+        .where(Purchase.user_id == user_id)
+        .order_by(Purchase.purchase_date.desc(), Purchase.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(Purchase.purchase_date, Purchase.id) < tuple_(*after))
+    if content_type is not None:
+        query = query.where(Content.content_type == content_type)
+    if category is not None:
+        query = query.where(Content.category == category)
+    return query
@@ -1,25 +1,65 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 import uuid
 import logging
 
-from app.models import Order, OrderItem, Content, User, OrderStatus, Purchase, PaymentSettings as _PS
+from app.core.config import settings
+from app.models import Order, OrderItem, Content, ContentType, User, OrderStatus
 from app.schemas import OrderCreate
 from app.services.payment import paystack_service, resolve_active_secret_key
+from app.services.fulfillment import FULFILLED_STATUSES, fulfill_order, paid_amount_matches
+from app.services.stock import lock_available_stock, release_reservations, reserve_stock
 
 logger = logging.getLogger(__name__)
 
+VAT_RATE = Decimal("0.075")
+PAYSTACK_FEE_RATE = Decimal("0.015")
+PAYSTACK_FLAT_FEE = Decimal("100")
+PAYSTACK_FLAT_FEE_THRESHOLD = Decimal("2500")
+PAYSTACK_FEE_CAP = Decimal("2000")
+_KOBO = Decimal("0.01")
+
+
+def to_money(value) -> Decimal:
+    """Exact decimal for a naira amount (floats go through str to avoid binary noise)."""
+    return Decimal(str(value)).quantize(_KOBO, rounding=ROUND_HALF_UP)
+
+
+def calculate_order_total(subtotal: Decimal) -> Decimal:
+    """Subtotal plus 7.5% VAT plus the Paystack processing fee.
+
+    The fee is 1.5% + NGN 100 (the flat part waived under NGN 2500), capped
+    at NGN 2000. Each component is rounded to the kobo, half up.
+    """
+    vat_amount = (subtotal * VAT_RATE).quantize(_KOBO, rounding=ROUND_HALF_UP)
+    subtotal_with_vat = subtotal + vat_amount
+
+    paystack_fee = subtotal_with_vat * PAYSTACK_FEE_RATE
+    if subtotal_with_vat >= PAYSTACK_FLAT_FEE_THRESHOLD:
+        paystack_fee += PAYSTACK_FLAT_FEE
+    paystack_fee = min(paystack_fee, PAYSTACK_FEE_CAP).quantize(_KOBO, rounding=ROUND_HALF_UP)
+
+    return subtotal_with_vat + paystack_fee
+
+
 class OrderService:
     @staticmethod
-    def create_order(db: Session, user: User, order_data: OrderCreate) -> Order:
+    async def create_order(db: AsyncSession, user: User, order_data: OrderCreate) -> Order:
         """
         Creates a new order with validation for stock and content availability.
+
+        Runs in a constant number of queries regardless of cart size: one
+        fetch for all requested content, one locked stock read for physical
+        items, one bulk insert each for order items and stock reservations.
+        Physical rows stay locked until the reservations commit, so concurrent
+        checkouts for the last unit serialize and only one of them passes.
         """
-        total_amount = 0.0
-        order_items_data = []
-        
         for item in order_data.items:
             # Quantity validation
             if item.quantity <= 0:
@@ -28,83 +68,98 @@ class OrderService:
                     detail="Quantity must be at least 1"
                 )
 
-            content = db.query(Content).filter(Content.id == item.content_id).first()
+        content_ids = sorted({item.content_id for item in order_data.items})
+        contents: Dict[int, Content] = {}
+        if content_ids:
+            result = await db.execute(select(Content).where(Content.id.in_(content_ids)))
+            contents = {content.id: content for content in result.scalars()}
+
+        requested: Dict[int, int] = defaultdict(int)
+        for item in order_data.items:
+            content = contents.get(item.content_id)
             if not content:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Content {item.content_id} not found"
                 )
-            
+
             if not content.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Content {content.title} is not available"
                 )
-            
-            # Check stock for physical items
-            if content.content_type.value == "physical":
-                if content.stock_quantity is None or content.stock_quantity < item.quantity:
+            requested[content.id] += item.quantity
+
+        # Check stock for physical items against locked rows
+        physical_ids = [
+            content_id for content_id in content_ids
+            if contents[content_id].content_type == ContentType.PHYSICAL
+        ]
+        if physical_ids:
+            available = await lock_available_stock(db, physical_ids)
+            for content_id in physical_ids:
+                if available[content_id] < requested[content_id]:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock for {content.title}"
+                        detail=f"Insufficient stock for {contents[content_id].title}"
                     )
-            
-            item_total = content.price * item.quantity
-            total_amount += item_total
-            
-            order_items_data.append({
-                "content": content,
-                "quantity": item.quantity,
-                "price": content.price
-            })
-            
-        # Calculate VAT (7.5%)
-        vat_amount = round(total_amount * 0.075, 2)
-        subtotal_with_vat = total_amount + vat_amount
-        
-        # Calculate Paystack Processing Fee
-        # 1.5% + NGN 100 (waived if under 2500), capped at NGN 2000
-        paystack_fee = subtotal_with_vat * 0.015
-        if subtotal_with_vat >= 2500:
-            paystack_fee += 100
-        paystack_fee = round(min(paystack_fee, 2000), 2)
-        
-        final_total = subtotal_with_vat + paystack_fee
-        
+
+        subtotal = sum(
+            (to_money(contents[item.content_id].price) * item.quantity for item in order_data.items),
+            Decimal("0.00"),
+        )
+        final_total = calculate_order_total(subtotal)
+
         # Create order
         order = Order(
             user_id=user.id,
-            total_amount=final_total,
+            total_amount=float(final_total),
             status=OrderStatus.PENDING,
             shipping_address=order_data.shipping_address,
             notes=order_data.notes
         )
         db.add(order)
-        db.flush()
-        
-        # Create order items
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=order.id,
-                content_id=item_data["content"].id,
-                quantity=item_data["quantity"],
-                price_at_purchase=item_data["price"]
+        await db.flush()
+
+        # Create order items in one statement
+        if order_data.items:
+            await db.execute(
+                insert(OrderItem),
+                [
+                    {
+                        "order_id": order.id,
+                        "content_id": item.content_id,
+                        "quantity": item.quantity,
+                        "price_at_purchase": contents[item.content_id].price,
+                    }
+                    for item in order_data.items
+                ],
             )
-            db.add(order_item)
-        
-        db.commit()
-        db.refresh(order)
-        return order
+        if physical_ids:
+            await reserve_stock(db, order.id, {content_id: requested[content_id] for content_id in physical_ids})
+
+        await db.commit()
+        return await OrderService._load_order(db, order.id)
+
+    @staticmethod
+    async def _load_order(db: AsyncSession, order_id: int) -> Order:
+        """Reload an order with its items eager-loaded for serialization."""
+        result = await db.execute(
+            select(Order)
+            .options(selectinload(Order.items))
+            .where(Order.id == order_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
 
     @staticmethod
-    async def initialize_payment(db: Session, user: User, order_id: int) -> Dict[str, Any]:
+    async def initialize_payment(db: AsyncSession, user: User, order_id: int) -> Dict[str, Any]:
         """
         Initializes a Paystack payment for an order.
         """
-        order = db.query(Order).filter(
-            Order.id == order_id,
-            Order.user_id == user.id
-        ).first()
+        order = await db.scalar(
+            select(Order).where(Order.id == order_id, Order.user_id == user.id)
+        )
         
         if not order:
             raise HTTPException(
@@ -122,13 +177,7 @@ class OrderService:
         reference = f"CIBN-{order.id}-{uuid.uuid4().hex[:8]}"
         
         # Resolve Paystack secret key from DB settings (fallback to env)
-        settings_row = db.query(_PS).first()
-        secret_key = None
-        if settings_row:
-            if settings_row.active_mode == "live" and settings_row.live_secret_key:
-                secret_key = settings_row.live_secret_key
-            elif settings_row.test_secret_key:
-                secret_key = settings_row.test_secret_key
+        secret_key = await db.run_sync(resolve_active_secret_key)
 
         try:
             payment_data = await paystack_service.initialize_transaction(
@@ -149,19 +198,18 @@ class OrderService:
         
         # Update order with payment reference
         order.payment_reference = reference
-        db.commit()
+        await db.commit()
         
         return payment_data
 
     @staticmethod
-    async def verify_payment(db: Session, user: User, reference: str) -> Dict[str, Any]:
+    async def verify_payment(db: AsyncSession, user: User, reference: str) -> Dict[str, Any]:
         """
         Verifies a payment with Paystack and updates the order status.
         """
-        order = db.query(Order).filter(
-            Order.payment_reference == reference,
-            Order.user_id == user.id
-        ).first()
+        order = await db.scalar(
+            select(Order).where(Order.payment_reference == reference, Order.user_id == user.id)
+        )
         
         if not order:
             raise HTTPException(
@@ -170,7 +218,7 @@ class OrderService:
             )
         
         # Verify with Paystack (key resolved from Admin Settings, env fallback)
-        secret_key = resolve_active_secret_key(db)
+        secret_key = await db.run_sync(resolve_active_secret_key)
         try:
             payment_data = await paystack_service.verify_transaction(
                 reference, secret_key_override=secret_key
@@ -186,60 +234,30 @@ class OrderService:
         
         if payment_data["status"] == "success":
             # Verify the amount actually paid matches the order total before
-            # fulfilling. Paystack returns the amount in kobo; order.total_amount
-            # is stored in naira. A tampered/under-paid transaction must not
-            # complete the order. (Skipped for the test stub, which omits amount.)
-            paid_amount_kobo = payment_data.get("amount")
-            if paid_amount_kobo is not None:
-                expected_amount_kobo = int(round(order.total_amount * 100))
-                if int(paid_amount_kobo) != expected_amount_kobo:
-                    logger.error(
-                        "Payment amount mismatch for order %s: expected %s kobo, "
-                        "got %s kobo (reference=%s)",
-                        order.id, expected_amount_kobo, paid_amount_kobo, reference,
-                    )
-                    order.status = OrderStatus.CANCELLED
-                    db.commit()
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Payment amount does not match order total"
-                    )
+            # fulfilling. A tampered/under-paid transaction must not complete
+            # the order. (Skipped for the test stub, which omits amount.)
+            if not paid_amount_matches(order, payment_data.get("amount")):
+                logger.error(
+                    "Payment amount mismatch for order %s: expected %s kobo, "
+                    "got %s kobo (reference=%s)",
+                    order.id, int(round(order.total_amount * 100)), payment_data.get("amount"), reference,
+                )
+                order.status = OrderStatus.CANCELLED
+                await db.run_sync(release_reservations, order.id)
+                await db.commit()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Payment amount does not match order total"
+                )
 
-            # Update order status
-            order.status = OrderStatus.COMPLETED
-            order.payment_method = payment_data.get("channel")
-            order.completed_at = datetime.utcnow()
-            
-            # Create purchases for digital content
-            for item in order.items:
-                if item.content.content_type.value in ["document", "video", "audio"]:
-                    # Check if already purchased to avoid duplicates (optional but good practice)
-                    existing = db.query(Purchase).filter(
-                        Purchase.user_id == user.id,
-                        Purchase.content_id == item.content_id
-                    ).first()
-                    
-                    if not existing:
-                        purchase = Purchase(
-                            user_id=user.id,
-                            content_id=item.content_id,
-                            order_id=order.id, # Link purchase to order
-                            amount=item.price_at_purchase,
-                            quantity=item.quantity
-                        )
-                        db.add(purchase)
-            
-            # Update stock for physical items
-            for item in order.items:
-                if item.content.content_type.value == "physical" and item.content.stock_quantity:
-                    item.content.stock_quantity = max(0, item.content.stock_quantity - item.quantity)
-            
-            db.commit()
+            await db.run_sync(fulfill_order, order, payment_data.get("channel"))
+            await db.commit()
             
             return {"message": "Payment verified successfully", "status": "success"}
         else:
             order.status = OrderStatus.CANCELLED
-            db.commit()
+            await db.run_sync(release_reservations, order.id)
+            await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Payment verification failed"
@@ -261,41 +279,18 @@ class OrderService:
             return False
 
         # Already fulfilled — nothing to do (idempotent).
-        if order.status == OrderStatus.COMPLETED:
+        if order.status in FULFILLED_STATUSES:
             return True
 
         # Verify amount paid matches the order total (kobo vs naira).
-        if paid_amount_kobo is not None:
-            expected_amount_kobo = int(round(order.total_amount * 100))
-            if int(paid_amount_kobo) != expected_amount_kobo:
-                logger.error(
-                    "Webhook amount mismatch for order %s: expected %s kobo, got %s kobo",
-                    order.id, expected_amount_kobo, paid_amount_kobo,
-                )
-                return False
-
-        order.status = OrderStatus.COMPLETED
-        order.completed_at = datetime.utcnow()
-
-        for item in order.items:
-            if item.content.content_type.value in ["document", "video", "audio"]:
-                existing = db.query(Purchase).filter(
-                    Purchase.user_id == order.user_id,
-                    Purchase.content_id == item.content_id
-                ).first()
-                if not existing:
-                    db.add(Purchase(
-                        user_id=order.user_id,
-                        content_id=item.content_id,
-                        order_id=order.id,
-                        amount=item.price_at_purchase,
-                        quantity=item.quantity
-                    ))
-
-        for item in order.items:
-            if item.content.content_type.value == "physical" and item.content.stock_quantity:
-                item.content.stock_quantity = max(0, item.content.stock_quantity - item.quantity)
+        if not paid_amount_matches(order, paid_amount_kobo):
+            logger.error(
+                "Webhook amount mismatch for order %s: expected %s kobo, got %s kobo",
+                order.id, int(round(order.total_amount * 100)), paid_amount_kobo,
+            )
+            return False
 
+        fulfill_order(db, order)
         db.commit()
         return True
 
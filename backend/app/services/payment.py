@@ -2,26 +2,42 @@ import httpx
 from typing import Dict, Any
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.http import (
+    CONNECT_ERRORS,
+    RETRY_STATUSES,
+    TRANSPORT_ERRORS,
+    build_async_client,
+    request_with_retries,
+)
+from app.services.settings_cache import PAYMENT, settings_cache
 import os
 
 
+def _load_secret_key(db) -> str | None:
+    from app.models import PaymentSettings
+    row = db.query(PaymentSettings).first()
+    if row:
+        if row.active_mode == "live" and row.live_secret_key:
+            return row.live_secret_key.strip()
+        if row.test_secret_key:
+            return row.test_secret_key.strip()
+        if row.live_secret_key:
+            return row.live_secret_key.strip()
+    return None
+
+
 def resolve_active_secret_key(db) -> str | None:
     """Resolve the Paystack secret key for the active mode from Admin Settings
     (PaymentSettings table), falling back to the PAYSTACK_SECRET_KEY env var.
 
     This lets the key be managed entirely from the Admin Settings (Payments) page;
-    the environment variable is now only an optional fallback.
+    the environment variable is now only an optional fallback. The key is
+    served from the settings cache, so the row is only re-read after a change.
     """
     try:
-        from app.models import PaymentSettings
-        row = db.query(PaymentSettings).first()
-        if row:
-            if row.active_mode == "live" and row.live_secret_key:
-                return row.live_secret_key.strip()
-            if row.test_secret_key:
-                return row.test_secret_key.strip()
-            if row.live_secret_key:
-                return row.live_secret_key.strip()
+        key = settings_cache.get(db, PAYMENT, _load_secret_key)
+        if key:
+            return key
     except Exception:
         # Never let a settings lookup failure crash a payment flow; fall back to env.
         pass
@@ -29,16 +45,54 @@ def resolve_active_secret_key(db) -> str | None:
 
 
 class PaystackService:
-    """Service for interacting with Paystack API."""
+    """Service for interacting with Paystack API.
+
+    Requests go through one pooled client opened with the app (see
+    ``start``/``aclose``), so checkout reuses a warm HTTP/2 connection
+    instead of paying a TLS handshake per call.
+    """
     
     BASE_URL = "https://api.paystack.co"
     
-    def __init__(self):
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
         self.secret_key = settings.PAYSTACK_SECRET_KEY
         self.headers = {
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json"
         }
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use if startup did not open it."""
+        if self._client is None or self._client.is_closed:
+            self._client = build_async_client(
+                self.BASE_URL,
+                connect_timeout=settings.PAYSTACK_CONNECT_TIMEOUT,
+                read_timeout=settings.PAYSTACK_READ_TIMEOUT,
+                max_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAYSTACK_MAX_KEEPALIVE,
+                transport=self._transport,
+            )
+        return self._client
+
+    def start(self) -> None:
+        self.client  # noqa: B018 - open the pool at startup
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def use_transport(self, transport: httpx.AsyncBaseTransport | None) -> None:
+        """Route requests through ``transport`` (e.g. ``httpx.MockTransport`` in tests)."""
+        await self.aclose()
+        self._transport = transport
+
+    def _stubbed(self) -> bool:
+        # The TESTING stubs stand in for Paystack unless a transport was injected.
+        return os.getenv("TESTING") == "true" and self._transport is None
     
     async def initialize_transaction(
         self, 
@@ -49,7 +103,7 @@ class PaystackService:
         secret_key_override: str | None = None,
     ) -> Dict[str, Any]:
         """Initialize a payment transaction."""
-        if os.getenv("TESTING") == "true":
+        if self._stubbed():
             if os.getenv("PAYSTACK_TEST_MODE") == "success":
                 return {
                     "authorization_url": f"https://paystack.test/authorize/{reference}",
@@ -61,7 +115,7 @@ class PaystackService:
                 detail="Payment service unavailable",
             )
         # Paystack expects amount in kobo (NGN * 100)
-        amount_kobo = int(amount * 100)
+        amount_kobo = int(round(amount * 100))
         
         payload = {
             "email": email,
@@ -76,51 +130,57 @@ class PaystackService:
             "Authorization": f"Bearer {secret}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.BASE_URL}/transaction/initialize",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data.get("status"):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Failed to initialize payment"
-                    )
-                
-                return data["data"]
+        try:
+            # Initialization creates a transaction, so only retry failures
+            # where the request never reached Paystack.
+            response = await request_with_retries(
+                self.client,
+                "POST",
+                "/transaction/initialize",
+                retries=settings.PAYSTACK_MAX_RETRIES,
+                backoff=settings.PAYSTACK_RETRY_BACKOFF,
+                retry_on=CONNECT_ERRORS,
+                json=payload,
+                headers=headers,
+            )
+            response.raise_for_status()
+            data = response.json()
             
-            except httpx.HTTPStatusError as e:
-                if e.response is not None and e.response.status_code == 401:
-                    # Upstream (Paystack) unauthorized. Do NOT bubble a 401 to the client
-                    # to avoid logging the user out on the frontend. Treat as bad gateway.
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail=(
-                            "Payment service error: Unauthorized (401) from gateway. "
-                            "Check PAYSTACK_SECRET_KEY in backend .env or Admin Settings (Payments) "
-                            "and ensure it is a valid key for the selected mode."
-                        ),
-                    )
+            if not data.get("status"):
                 raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"Payment service error: {str(e)}"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Failed to initialize payment"
                 )
-            except httpx.HTTPError as e:
+            
+            return data["data"]
+        
+        except httpx.HTTPStatusError as e:
+            if e.response is not None and e.response.status_code == 401:
+                # Upstream (Paystack) unauthorized. Do NOT bubble a 401 to the client
+                # to avoid logging the user out on the frontend. Treat as bad gateway.
                 raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"Payment service error: {str(e)}"
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=(
+                        "Payment service error: Unauthorized (401) from gateway. "
+                        "Check PAYSTACK_SECRET_KEY in backend .env or Admin Settings (Payments) "
+                        "and ensure it is a valid key for the selected mode."
+                    ),
                 )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Payment service error: {str(e)}"
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Payment service error: {str(e)}"
+            )
     
     async def verify_transaction(
         self, reference: str, secret_key_override: str | None = None
     ) -> Dict[str, Any]:
         """Verify a payment transaction."""
-        if os.getenv("TESTING") == "true":
+        if self._stubbed():
             if os.getenv("PAYSTACK_TEST_MODE") == "success":
                 return {
                     "status": "success",
@@ -137,28 +197,35 @@ class PaystackService:
             "Authorization": f"Bearer {secret}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/transaction/verify/{reference}",
-                    headers=headers
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data.get("status"):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Transaction verification failed"
-                    )
-                
-                return data["data"]
+        try:
+            # Verification is a read: retry timeouts, dropped connections,
+            # rate limiting and gateway errors with jittered backoff.
+            response = await request_with_retries(
+                self.client,
+                "GET",
+                f"/transaction/verify/{reference}",
+                retries=settings.PAYSTACK_MAX_RETRIES,
+                backoff=settings.PAYSTACK_RETRY_BACKOFF,
+                retry_on=TRANSPORT_ERRORS,
+                retry_statuses=RETRY_STATUSES,
+                headers=headers,
+            )
+            response.raise_for_status()
+            data = response.json()
             
-            except httpx.HTTPError as e:
+            if not data.get("status"):
                 raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"Payment verification error: {str(e)}"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Transaction verification failed"
                 )
+            
+            return data["data"]
+        
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Payment verification error: {str(e)}"
+            )
     
     def validate_webhook(
         self, signature: str, payload: bytes, secret_key_override: str | None = None
@@ -0,0 +1,359 @@
+"""
+Playback progress ingestion for the media players.
+
+Players heartbeat their position every few seconds while media plays, and
+may send several items in one request. Only the newest position matters, so
+heartbeats are not written straight away. ``progress_buffer`` keeps the
+latest state for each (user, content) pair in memory, and ``progress_flusher``
+writes everything pending every PROGRESS_FLUSH_SECONDS. That is one
+``INSERT ... ON CONFLICT (user_id, content_id) DO UPDATE`` per chunk on
+``uq_user_content_progress``, however many heartbeats arrived in between.
+The buffer is also flushed on shutdown, and early by the request that fills
+it (PROGRESS_BUFFER_MAX_ENTRIES).
+
+Each worker has its own buffer. Progress reads check it before the database,
+so a player resuming on the same worker sees its latest position. Another
+worker sees the last flushed one, at most one interval old. An upsert only
+replaces a row whose ``last_watched`` is not newer, so a slow flush from one
+worker never rolls back a later position written by another.
+
+``continue_watching`` reads the resume rail in one query on
+``ix_content_progress_resume``, joined to the content summary, and merges in
+what this worker still has buffered.
+
+Content ids are checked against ``content_ids``, an in-process cache of ids
+known to exist, so ``contents`` is only read for ids this worker has not
+seen yet. The foreign key still rejects content deleted since it was cached.
+A flush that hits it drops the states for missing content and retries.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import (
+    PROGRESS_BUFFER_ENTRIES,
+    PROGRESS_DROPPED,
+    PROGRESS_FLUSH_DURATION,
+    PROGRESS_ROWS_WRITTEN,
+    PROGRESS_UPDATES,
+)
+from app.db.upsert import upsert_insert
+from app.models import Content, ContentProgress, User
+from app.schemas.content import ContentSummary
+from app.schemas.content_progress import ContinueWatchingItem, ProgressHeartbeat
+
+logger = logging.getLogger(__name__)
+
+# Written by a heartbeat; everything except the key and created_at
+HEARTBEAT_FIELDS = ("playback_position", "total_duration", "progress_percentage", "is_completed", "last_watched", "updated_at")
+SUMMARY_COLUMNS = (
+    Content.id, Content.title, Content.content_type, Content.category, Content.author, Content.thumbnail_url, Content.duration,
+)
+# Rows per upsert statement; keeps bound parameters under SQLite's limit
+FLUSH_CHUNK_SIZE = 1000
+
+
+class KnownContentIds:
+    """Ids of content known to exist; emptied when full or when a write proves one stale."""
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self.max_size = max_size
+        self._ids: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def missing(self, db: Session, ids: Iterable[int]) -> Set[int]:
+        """The ids that do not exist, reading ``contents`` only for ids not seen before."""
+        unknown = set(ids) - self._ids
+        if not unknown:
+            return set()
+        found = set(db.scalars(select(Content.id).where(Content.id.in_(unknown))))
+        with self._lock:
+            if len(self._ids) + len(found) > self.max_size:
+                self._ids.clear()
+            self._ids |= found
+        return unknown - found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+
+content_ids = KnownContentIds()
+
+
+class BufferedProgress(NamedTuple):
+    """Latest playback state of one item that has not been written yet."""
+    playback_position: float
+    total_duration: Optional[float]
+    progress_percentage: float
+    is_completed: bool
+    last_watched: datetime
+    created_at: datetime
+
+
+def coalesce(updates: Iterable[ProgressHeartbeat]) -> Dict[int, ProgressHeartbeat]:
+    """The last update for each content item, in the order the client sent them."""
+    latest: Dict[int, ProgressHeartbeat] = {}
+    for update in updates:
+        latest[update.content_id] = update
+    return latest
+
+
+def upsert_progress(db: Session, rows: List[dict]) -> None:
+    """Write progress rows with one statement, unless the stored row was watched more recently."""
+    if not rows:
+        return
+    stmt = upsert_insert(db, ContentProgress).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "content_id"],  # uq_user_content_progress
+            set_={field: stmt.excluded[field] for field in HEARTBEAT_FIELDS},
+            where=ContentProgress.last_watched <= stmt.excluded.last_watched,
+        )
+    )
+
+
+class ProgressBuffer:
+    """Newest unwritten progress per (user, content), written to ``content_progress`` in bulk."""
+
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self.max_entries = max_entries
+        self._pending: Dict[int, Dict[int, BufferedProgress]] = {}
+        self._size = 0
+        # States taken by the running flush, readable until it commits
+        self._flushing: Dict[Tuple[int, int], BufferedProgress] = {}
+        # Keys of the running flush that a request has since written or deleted itself
+        self._superseded: Set[Tuple[int, int]] = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.max_entries
+
+    def record(self, user_id: int, updates: Iterable[ProgressHeartbeat]) -> None:
+        """Keep ``updates`` as the user's latest state for their items."""
+        now = datetime.utcnow()
+        count = 0
+        with self._lock:
+            items = self._pending.setdefault(user_id, {})
+            for update in updates:
+                previous = items.get(update.content_id)
+                if previous is None:
+                    self._size += 1
+                items[update.content_id] = BufferedProgress(
+                    playback_position=update.playback_position,
+                    total_duration=update.total_duration,
+                    progress_percentage=update.progress_percentage,
+                    is_completed=update.is_completed,
+                    last_watched=now,
+                    created_at=previous.created_at if previous else now,
+                )
+                count += 1
+            PROGRESS_BUFFER_ENTRIES.set(self._size)
+        PROGRESS_UPDATES.inc(count)
+
+    def get(self, user_id: int, content_id: int) -> Optional[BufferedProgress]:
+        with self._lock:
+            state = self._pending.get(user_id, {}).get(content_id)
+            return state or self._flushing.get((user_id, content_id))
+
+    def for_user(self, user_id: int) -> Dict[int, BufferedProgress]:
+        """The user's unwritten states by content id."""
+        with self._lock:
+            states = {c: s for (u, c), s in self._flushing.items() if u == user_id} if self._flushing else {}
+            states.update(self._pending.get(user_id, {}))
+            return states
+
+    def pop(self, user_id: int, content_id: int) -> Optional[BufferedProgress]:
+        """Remove and return an unwritten state, for requests that write the row themselves."""
+        with self._lock:
+            items = self._pending.get(user_id, {})
+            state = items.pop(content_id, None)
+            if state is not None:
+                self._size -= 1
+                PROGRESS_BUFFER_ENTRIES.set(self._size)
+                if not items:
+                    del self._pending[user_id]
+            flushing = self._flushing.pop((user_id, content_id), None)
+            if flushing is not None:
+                self._superseded.add((user_id, content_id))
+            return state or flushing
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending, self._size = {}, 0
+            PROGRESS_BUFFER_ENTRIES.set(0)
+
+    def flush(self, db: Session) -> int:
+        """Write everything pending and commit; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending, self._size = self._pending, {}, 0
+                self._flushing = {
+                    (user_id, content_id): state
+                    for user_id, items in pending.items()
+                    for content_id, state in items.items()
+                }
+                self._superseded = set()
+                # Built under the lock: pop() removes keys from _flushing
+                rows = [
+                    dict(user_id=user_id, content_id=content_id, updated_at=state.last_watched, **state._asdict())
+                    for (user_id, content_id), state in self._flushing.items()
+                ]
+                PROGRESS_BUFFER_ENTRIES.set(0)
+            if not rows:
+                return 0
+            started = time.perf_counter()
+            try:
+                rows = self._write(db, rows)
+                self._undo_superseded(db, rows)
+            except Exception:
+                db.rollback()
+                self._restore()
+                raise
+            finally:
+                PROGRESS_FLUSH_DURATION.observe(time.perf_counter() - started)
+                with self._lock:
+                    self._flushing, self._superseded = {}, set()
+            PROGRESS_ROWS_WRITTEN.inc(len(rows))
+            return len(rows)
+
+    def _current(self, rows: List[dict]) -> List[dict]:
+        """``rows`` without the ones a request has superseded since the flush began."""
+        with self._lock:
+            if not self._superseded:
+                return rows
+            return [r for r in rows if (r["user_id"], r["content_id"]) not in self._superseded]
+
+    def _write(self, db: Session, rows: List[dict]) -> List[dict]:
+        try:
+            for i in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                upsert_progress(db, self._current(rows[i:i + FLUSH_CHUNK_SIZE]))
+            db.commit()
+            return rows
+        except IntegrityError:
+            # Content (or a user) deleted while its progress waited here
+            db.rollback()
+            content_ids.clear()
+        users = set(db.scalars(select(User.id).where(User.id.in_({r["user_id"] for r in rows}))))
+        contents = set(db.scalars(select(Content.id).where(Content.id.in_({r["content_id"] for r in rows}))))
+        kept = [r for r in rows if r["user_id"] in users and r["content_id"] in contents]
+        logger.info(f"Dropped progress for {len(rows) - len(kept)} deleted users or content items")
+        for i in range(0, len(kept), FLUSH_CHUNK_SIZE):
+            upsert_progress(db, self._current(kept[i:i + FLUSH_CHUNK_SIZE]))
+        db.commit()
+        return kept
+
+    def _undo_superseded(self, db: Session, rows: List[dict]) -> None:
+        """Remove rows this flush wrote after a request had replaced or deleted them.
+
+        A request that pops a state mid-flush writes its own row (with a later
+        ``last_watched``) or deletes it. Only a row still holding exactly the
+        flushed state is one the flush put back, so only that row is removed.
+        """
+        with self._lock:
+            superseded = [r for r in rows if (r["user_id"], r["content_id"]) in self._superseded]
+        if not superseded:
+            return
+        for r in superseded:
+            db.execute(
+                delete(ContentProgress).where(
+                    ContentProgress.user_id == r["user_id"],
+                    ContentProgress.content_id == r["content_id"],
+                    ContentProgress.last_watched == r["last_watched"],
+                )
+            )
+        db.commit()
+
+    def _restore(self) -> None:
+        """Put back states from a failed flush, unless newer ones arrived or there is no room."""
+        with self._lock:
+            dropped = 0
+            for (user_id, content_id), state in self._flushing.items():
+                items = self._pending.setdefault(user_id, {})
+                if content_id in items:
+                    continue
+                if self._size >= self.max_entries:
+                    dropped += 1
+                    continue
+                items[content_id] = state
+                self._size += 1
+            PROGRESS_BUFFER_ENTRIES.set(self._size)
+        if dropped:
+            PROGRESS_DROPPED.inc(dropped)
+            logger.warning(f"Progress buffer full after a failed flush; dropped {dropped} states")
+
+
+progress_buffer = ProgressBuffer(max_entries=settings.PROGRESS_BUFFER_MAX_ENTRIES)
+
+
+def flush_progress() -> None:
+    if not len(progress_buffer):
+        return
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        progress_buffer.flush(db)
+    finally:
+        db.close()
+
+
+progress_flusher = PeriodicTask(
+    "progress-flush",
+    interval=settings.PROGRESS_FLUSH_SECONDS,
+    func=flush_progress,
+)
+
+
+def continue_watching(db: Session, user_id: int, limit: int) -> List[ContinueWatchingItem]:
+    """The user's most recently watched unfinished items, newest first."""
+    buffered = progress_buffer.for_user(user_id)
+    rows = db.execute(
+        select(
+            ContentProgress.playback_position,
+            ContentProgress.total_duration,
+            ContentProgress.progress_percentage,
+            ContentProgress.last_watched,
+            *SUMMARY_COLUMNS,
+        )
+        .join(Content, Content.id == ContentProgress.content_id)
+        .where(
+            ContentProgress.user_id == user_id,
+            ContentProgress.is_completed.is_(False),
+            Content.is_active.is_(True),
+        )
+        .order_by(ContentProgress.last_watched.desc())
+        # Room for rows that buffered states complete or replace
+        .limit(limit + len(buffered))
+    ).all()
+    items = {
+        row.id: ContinueWatchingItem(content=ContentSummary.model_validate(row), **row._mapping)
+        for row in rows
+    }
+
+    unfinished = {content_id: state for content_id, state in buffered.items() if not state.is_completed}
+    for content_id in buffered.keys() - unfinished.keys():
+        items.pop(content_id, None)
+    unknown = unfinished.keys() - items.keys()
+    summaries = {item.content.id: item.content for item in items.values()}
+    if unknown:
+        for row in db.execute(select(*SUMMARY_COLUMNS).where(Content.id.in_(unknown), Content.is_active.is_(True))):
+            summaries[row.id] = ContentSummary.model_validate(row)
+    for content_id, state in unfinished.items():
+        if content_id in summaries:
+            items[content_id] = ContinueWatchingItem(content=summaries[content_id], **state._asdict())
+
+    return sorted(items.values(), key=lambda item: item.last_watched, reverse=True)[:limit]
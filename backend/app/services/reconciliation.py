@@ -0,0 +1,169 @@
+"""
+Reconciliation of pending Paystack orders.
+
+An order stays pending if the buyer pays and closes the tab before the
+verify call and the webhook is lost. The reconciler walks pending orders
+older than PAYMENT_RECONCILE_MIN_AGE_MINUTES in id order, verifies each
+batch against Paystack with at most PAYMENT_RECONCILE_CONCURRENCY calls in
+flight, and then:
+
+* fulfills orders Paystack reports as paid (for the right amount);
+* cancels orders whose payment failed, was reversed or was underpaid;
+* expires orders still unpaid after PAYMENT_ORDER_EXPIRY_HOURS;
+* leaves the rest (and any that could not be verified) for the next pass.
+
+Progress is checkpointed after every batch (see ``app.services.checkpoints``)
+so an interrupted pass resumes where it stopped. It runs in-process on every
+worker (``payment_reconciler``; the lease lets one worker at a time do the
+pass) and from the CLI (``python -m app.cli reconcile-payments``).
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.models import Order, OrderStatus
+from app.services.checkpoints import acquire_lease, release_lease, save_checkpoint
+from app.services.fulfillment import fulfill_order, paid_amount_matches
+from app.services.payment import paystack_service, resolve_active_secret_key
+from app.services.stock import release_reservations
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = "payment-reconciler"
+LEASE_SECONDS = 600
+# Paystack transaction statuses that will never turn into a payment
+FAILED_STATUSES = {"failed", "reversed"}
+
+Verification = Union[Dict[str, Any], Exception, None]
+
+
+async def _verify_batch(orders: List[Order], secret_key: Optional[str], concurrency: int) -> List[Verification]:
+    """Verify orders concurrently; errors are returned in place, not raised."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def verify(order: Order) -> Verification:
+        if not order.payment_reference:
+            return None  # never reached Paystack
+        async with semaphore:
+            try:
+                return await paystack_service.verify_transaction(
+                    order.payment_reference, secret_key_override=secret_key
+                )
+            except HTTPException as exc:
+                return exc
+
+    return await asyncio.gather(*(verify(order) for order in orders))
+
+
+def _cancel(db: Session, order: Order) -> bool:
+    # Conditional so a verify call completing the order concurrently wins.
+    cancelled = db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
+        .values(status=OrderStatus.CANCELLED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if cancelled:
+        release_reservations(db, order.id)
+    return bool(cancelled)
+
+
+def settle_order(db: Session, order: Order, verification: Verification, expired: bool) -> str:
+    """Apply one verification result; returns the outcome counted in the run stats."""
+    if isinstance(verification, Exception):
+        logger.warning(f"Could not verify order {order.id} ({order.payment_reference}): {verification}")
+        return "unverified"
+
+    paystack_status = (verification or {}).get("status")
+    if paystack_status == "success":
+        if paid_amount_matches(order, verification.get("amount")):
+            fulfill_order(db, order, verification.get("channel"))
+            return "fulfilled"
+        logger.error(
+            f"Reconciler amount mismatch for order {order.id}: expected "
+            f"{int(round(order.total_amount * 100))} kobo, got {verification.get('amount')} kobo"
+        )
+        return "cancelled" if _cancel(db, order) else "skipped"
+    if paystack_status in FAILED_STATUSES:
+        return "cancelled" if _cancel(db, order) else "skipped"
+    if expired:
+        return "expired" if _cancel(db, order) else "skipped"
+    return "pending"
+
+
+async def reconcile_pending_payments(
+    session_factory: async_sessionmaker = None,
+    *,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Counter:
+    """Run one reconciliation pass and return the count of each outcome."""
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal as session_factory
+    batch_size = batch_size or settings.PAYMENT_RECONCILE_BATCH_SIZE
+    concurrency = concurrency or settings.PAYMENT_RECONCILE_CONCURRENCY
+    now = now or datetime.utcnow()
+    settle_before = now - timedelta(minutes=settings.PAYMENT_RECONCILE_MIN_AGE_MINUTES)
+    expire_before = now - timedelta(hours=settings.PAYMENT_ORDER_EXPIRY_HOURS)
+    stats: Counter = Counter()
+
+    db: AsyncSession
+    async with session_factory() as db:
+        position = await db.run_sync(acquire_lease, CHECKPOINT, LEASE_SECONDS)
+        if position is None:
+            logger.info("Payment reconciliation already running on another worker")
+            return stats
+        if position:
+            logger.info(f"Resuming payment reconciliation after order {position}")
+
+        secret_key = await db.run_sync(resolve_active_secret_key)
+        try:
+            while True:
+                rows = (await db.execute(
+                    select(Order, Order.created_at <= expire_before)
+                    .where(
+                        Order.status == OrderStatus.PENDING,
+                        Order.created_at <= settle_before,
+                        Order.id > position,
+                    )
+                    .order_by(Order.id)
+                    .limit(batch_size)
+                )).all()
+                if not rows:
+                    position = 0  # pass complete; the next one starts over
+                    break
+
+                orders = [order for order, _ in rows]
+                last_id = orders[-1].id
+                verifications = await _verify_batch(orders, secret_key, concurrency)
+                for (order, expired), verification in zip(rows, verifications):
+                    stats[await db.run_sync(settle_order, order, verification, bool(expired))] += 1
+                # Commits this batch's settlements together with the checkpoint.
+                await db.run_sync(save_checkpoint, CHECKPOINT, last_id, LEASE_SECONDS)
+                position = last_id
+        except BaseException:
+            await db.rollback()
+            raise
+        finally:
+            await db.run_sync(release_lease, CHECKPOINT, position)
+
+    if stats:
+        logger.info(f"Payment reconciliation: {dict(stats)}")
+    return stats
+
+
+payment_reconciler = PeriodicTask(
+    "payment-reconciler",
+    interval=settings.PAYMENT_RECONCILE_INTERVAL_SECONDS,
+    func=reconcile_pending_payments,
+)
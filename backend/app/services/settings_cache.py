@@ -0,0 +1,85 @@
+"""
+In-memory cache for the admin-managed settings singletons.
+
+Payment, email and upload settings are read on every checkout, email and
+upload but change only when an admin saves them. Each worker keeps a
+snapshot of every singleton tagged with the row's version from
+``settings_versions``. The admin ``PUT`` handlers bump the version in the
+same transaction as the change (``bump``); other workers notice at their
+next version poll, a single primary-key read at most once every
+SETTINGS_CACHE_POLL_SECONDS, and reload only what changed. The worker that
+made the change drops its snapshot as soon as the transaction commits.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import SettingsVersion
+
+logger = logging.getLogger(__name__)
+
+PAYMENT = "payment"
+EMAIL = "email"
+UPLOAD = "upload"
+
+
+class SettingsCache:
+    """Versioned per-process snapshots of settings rows."""
+
+    def __init__(self, poll_interval: float) -> None:
+        self.poll_interval = poll_interval
+        self._entries: Dict[str, Tuple[int, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._polled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, name: str, loader: Callable[[Session], Any]) -> Any:
+        """Return the snapshot for ``name``, calling ``loader(db)`` when stale."""
+        version = self._current_version(db, name)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = loader(db)
+        with self._lock:
+            # A concurrent bump may have moved the version on while we loaded.
+            if self._versions.get(name, 0) == version:
+                self._entries[name] = (version, value)
+        return value
+
+    def bump(self, db: Session, name: str) -> None:
+        """Mark ``name`` changed in the caller's transaction (commit follows)."""
+        bumped = db.execute(
+            update(SettingsVersion)
+            .where(SettingsVersion.name == name)
+            .values(version=SettingsVersion.version + 1)
+        ).rowcount
+        if not bumped:
+            db.execute(insert(SettingsVersion).values(name=name, version=1))
+        event.listen(db, "after_commit", lambda session: self.invalidate(name), once=True)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one snapshot (or all) and re-poll versions on the next read."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+            self._polled_at = None
+
+    def _current_version(self, db: Session, name: str) -> int:
+        now = time.monotonic()
+        polled_at = self._polled_at
+        if polled_at is None or now - polled_at >= self.poll_interval:
+            versions = dict(db.execute(select(SettingsVersion.name, SettingsVersion.version)).all())
+            with self._lock:
+                self._versions = versions
+                self._polled_at = now
+        return self._versions.get(name, 0)
+
+
+settings_cache = SettingsCache(poll_interval=settings.SETTINGS_CACHE_POLL_SECONDS)
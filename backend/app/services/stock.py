@@ -0,0 +1,136 @@
+"""
+Stock reservations for physical items.
+
+Placing an order holds its physical units in ``stock_reservations`` for
+ORDER_STOCK_HOLD_MINUTES, which covers the Paystack checkout. Available
+stock is ``stock_quantity`` minus unexpired holds. Holds are released when
+the order is paid (stock is decremented then) or cancelled, and a sweeper
+deletes holds that expired or whose order is no longer pending.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.models import Content, Order, OrderStatus, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+async def lock_available_stock(db: AsyncSession, content_ids: List[int]) -> Dict[int, int]:
+    """Lock physical content rows and return stock not held by active reservations.
+
+    Rows are locked in id order so concurrent carts cannot deadlock; the
+    locks are held until the caller commits its own reservations.
+    """
+    stock = dict((await db.execute(
+        select(Content.id, Content.stock_quantity)
+        .where(Content.id.in_(content_ids))
+        .order_by(Content.id)
+        .with_for_update()
+    )).all())
+
+    held = dict((await db.execute(
+        select(StockReservation.content_id, func.sum(StockReservation.quantity))
+        .where(
+            StockReservation.content_id.in_(content_ids),
+            StockReservation.expires_at > datetime.utcnow(),
+        )
+        .group_by(StockReservation.content_id)
+    )).all())
+
+    return {
+        content_id: (stock.get(content_id) or 0) - (held.get(content_id) or 0)
+        for content_id in content_ids
+    }
+
+
+async def reserve_stock(db: AsyncSession, order_id: int, quantities: Dict[int, int]) -> None:
+    """Hold ``quantities`` (content id -> units) for an order in one insert."""
+    expires_at = datetime.utcnow() + timedelta(minutes=settings.ORDER_STOCK_HOLD_MINUTES)
+    await db.execute(
+        insert(StockReservation),
+        [
+            {"order_id": order_id, "content_id": content_id, "quantity": quantity, "expires_at": expires_at}
+            for content_id, quantity in quantities.items()
+        ],
+    )
+
+
+def stock_shortfall(db: Session, order_id: int, quantities: Dict[int, int]) -> Dict[int, int]:
+    """Units of ``quantities`` a paid order can no longer be given (content id -> units short).
+
+    Units under the order's own unexpired hold are covered. The rest (its hold
+    expired or was swept before the payment arrived) must come out of stock
+    not held by other orders. Rows are locked as in ``lock_available_stock``.
+    """
+    holds = (
+        select(
+            StockReservation.content_id,
+            func.sum(case((StockReservation.order_id == order_id, StockReservation.quantity), else_=0)).label("own"),
+            func.sum(StockReservation.quantity).label("held"),
+        )
+        .where(StockReservation.content_id.in_(quantities), StockReservation.expires_at > datetime.utcnow())
+        .group_by(StockReservation.content_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Content.id, Content.stock_quantity, func.coalesce(holds.c.own, 0), func.coalesce(holds.c.held, 0))
+        .outerjoin(holds, holds.c.content_id == Content.id)
+        .where(Content.id.in_(quantities), Content.stock_quantity.isnot(None))
+        .order_by(Content.id)
+        .with_for_update(of=Content)
+    ).all()
+
+    short = {}
+    for content_id, stock, own, held in rows:
+        unheld = quantities[content_id] - own
+        available = stock - held
+        if unheld > 0 and unheld > available:
+            short[content_id] = unheld - max(available, 0)
+    return short
+
+
+def release_reservations(db: Session, order_id: int) -> None:
+    """Drop an order's holds; the caller commits (use ``run_sync`` from async code)."""
+    db.execute(delete(StockReservation).where(StockReservation.order_id == order_id))
+
+
+def sweep_reservations(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete holds that expired or whose order is no longer pending."""
+    now = now or datetime.utcnow()
+    inactive_orders = select(Order.id).where(Order.status != OrderStatus.PENDING)
+    result = db.execute(
+        delete(StockReservation)
+        .where(or_(
+            StockReservation.expires_at <= now,
+            StockReservation.order_id.in_(inactive_orders),
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+def _sweep() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        released = sweep_reservations(db)
+        if released:
+            logger.info(f"Released {released} stale stock reservation(s)")
+    finally:
+        db.close()
+
+
+reservation_sweeper = PeriodicTask(
+    "stock-reservation-sweeper",
+    interval=settings.STOCK_RESERVATION_SWEEP_SECONDS,
+    func=_sweep,
+)
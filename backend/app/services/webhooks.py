@@ -0,0 +1,146 @@
+"""
+Durable inbox for Paystack webhooks.
+
+The webhook route only checks the signature and stores the raw event in
+``webhook_events`` (one insert, ignoring redeliveries of an event already
+stored), then acknowledges. Acknowledgement latency therefore does not
+depend on fulfillment, and Paystack stops retrying as soon as the event is
+safe in the database.
+
+``webhook_consumer`` processes pending events in arrival order on every
+worker: a batch is claimed with ``FOR UPDATE SKIP LOCKED`` (PostgreSQL) and
+a short lease, so workers never process the same event at once. Handling is
+idempotent (fulfillment claims the order with a conditional update). A
+failed event is retried with jittered exponential backoff and moves to
+``dead`` after WEBHOOK_MAX_ATTEMPTS; ``python -m app.cli requeue-webhooks``
+puts dead events back in the queue.
+"""
+import hashlib
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.http import backoff_delay
+from app.db.queue import claim_due
+from app.db.upsert import upsert_insert
+from app.models import WebhookEvent, WebhookEventStatus
+from app.services.orders import order_service
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed event is hidden from other workers while it is handled
+CLAIM_SECONDS = 300
+RETRY_CAP_SECONDS = 3600
+
+
+def event_key(event: Dict[str, Any], raw_body: bytes) -> str:
+    """Identity of an event across redeliveries: type plus transaction id or reference."""
+    data = event.get("data") if isinstance(event.get("data"), dict) else {}
+    identity = data.get("id") or data.get("reference")
+    if identity is None:
+        identity = hashlib.sha256(raw_body).hexdigest()
+    return f"{event.get('event')}:{identity}"
+
+
+async def record_webhook_event(db: AsyncSession, raw_body: bytes, event: Dict[str, Any]) -> bool:
+    """Store a verified event; returns False when it was already in the inbox."""
+    data = event.get("data") if isinstance(event.get("data"), dict) else {}
+    result = await db.execute(
+        upsert_insert(db, WebhookEvent)
+        .values(
+            event_key=event_key(event, raw_body),
+            event_type=str(event.get("event") or "unknown"),
+            reference=data.get("reference"),
+            payload=raw_body.decode("utf-8"),
+            status=WebhookEventStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["event_key"])
+    )
+    await db.commit()
+    return bool(result.rowcount)
+
+
+def handle_event(db: Session, event: Dict[str, Any]) -> bool:
+    """Apply one event; returns False when there was nothing to do."""
+    if event.get("event") != "charge.success":
+        return False
+    data = event.get("data") or {}
+    reference = data.get("reference")
+    if not reference:
+        return False
+    return order_service.confirm_order_from_webhook(db, reference, data.get("amount"))
+
+
+def process_webhook_events(db: Session, batch_size: Optional[int] = None, now: Optional[datetime] = None) -> Counter:
+    """Claim and handle one batch of due events; returns the count of each outcome."""
+    now = now or datetime.utcnow()
+    stats: Counter = Counter()
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    for event in claim_due(db, WebhookEvent, WebhookEventStatus.PENDING, batch_size, now, CLAIM_SECONDS):
+        event_id, attempts = event.id, event.attempts
+        try:
+            handled = handle_event(db, json.loads(event.payload))
+        except Exception as exc:
+            db.rollback()
+            dead = attempts >= settings.WEBHOOK_MAX_ATTEMPTS
+            values = {"last_error": f"{exc.__class__.__name__}: {exc}"}
+            if dead:
+                values["status"] = WebhookEventStatus.DEAD
+                logger.error(f"Webhook event {event_id} dead after {attempts} attempt(s): {exc}")
+            else:
+                base = settings.WEBHOOK_RETRY_BACKOFF_SECONDS
+                delay = base + backoff_delay(attempts, base, cap=RETRY_CAP_SECONDS)
+                values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning(f"Webhook event {event_id} failed (attempt {attempts}); retrying in {delay:.0f}s: {exc}")
+            outcome = "dead" if dead else "retrying"
+        else:
+            outcome = "processed" if handled else "ignored"
+            values = {"status": WebhookEventStatus(outcome), "processed_at": datetime.utcnow(), "last_error": None}
+        db.execute(update(WebhookEvent).where(WebhookEvent.id == event_id).values(**values))
+        db.commit()
+        stats[outcome] += 1
+    return stats
+
+
+def requeue_dead_events(db: Session) -> int:
+    """Move dead events back to pending with a fresh retry budget."""
+    requeued = db.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.status == WebhookEventStatus.DEAD)
+        .values(status=WebhookEventStatus.PENDING, attempts=0, next_attempt_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return requeued
+
+
+def _consume() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        # Drain the backlog (e.g. after a sales spike) before sleeping again.
+        while True:
+            stats = process_webhook_events(db)
+            if stats:
+                logger.info(f"Processed webhook events: {dict(stats)}")
+            if sum(stats.values()) < settings.WEBHOOK_BATCH_SIZE:
+                break
+    finally:
+        db.close()
+
+
+webhook_consumer = PeriodicTask(
+    "webhook-consumer",
+    interval=settings.WEBHOOK_POLL_SECONDS,
+    func=_consume,
+)
@@ -0,0 +1,79 @@
+"""
+Load benchmark for the async-session routes.
+
+Fires concurrent requests at a running API and reports throughput and
+latency percentiles for an async-session route, while probing /health on
+the side. /health does no I/O, so its latency is a direct measure of how
+long the event loop is stalled by the route under test: with blocking
+queries on the loop it tracks the query latency, with the async session it
+stays flat.
+
+Usage (from backend/, against a server backed by PostgreSQL):
+    python -m benchmarks.async_db_benchmark --base-url http://localhost:8000 \\
+        --token <JWT> --path /api/v1/content/me/purchased --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list[float], errors: list[int]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run(base_url: str, token: str, path: str, concurrency: int, duration: float) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    probe_latencies: list[float] = []
+    errors: list[int] = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            probe(client, deadline, probe_latencies),
+            *(worker(client, path, deadline, latencies, errors) for _ in range(concurrency)),
+        )
+
+    print(f"{path}: {len(latencies) / duration:.1f} req/s over {duration:.0f}s at concurrency {concurrency}")
+    print(
+        f"  latency p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:.1f}ms errors={len(errors)}"
+    )
+    print(
+        f"  /health under load p50={statistics.median(probe_latencies) * 1000:.1f}ms "
+        f"max={max(probe_latencies) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--path", default="/api/v1/content/me/purchased")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.token, args.path, args.concurrency, args.duration))
@@ -0,0 +1,73 @@
+"""
+Benchmark response compression on typical ContentListResponse payloads.
+
+Reports raw vs compressed size and CPU time per response for every codec
+installed in this environment, using the same compressor settings as
+CompressionMiddleware.
+
+Usage (from backend/):
+    python -m benchmarks.compression_benchmark [--iterations 200]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from app.core.compression import available_encodings, make_compressor
+
+
+def build_content_list(page_size: int) -> bytes:
+    """Build a JSON body shaped like ContentListResponse."""
+    now = datetime.now(timezone.utc).isoformat()
+    items = []
+    for i in range(page_size):
+        items.append({
+            "id": i + 1,
+            "title": f"Principles of Banking Practice, Volume {i + 1}",
+            "description": (
+                "A comprehensive guide for CIBN examination candidates covering "
+                "credit administration, risk management, regulatory compliance and "
+                "the ethics of professional banking practice in Nigeria. "
+            ) * 4,
+            "content_type": "document",
+            "category": "exam_text",
+            "price": 2500.0 + i,
+            "is_exclusive": i % 5 == 0,
+            "author": "Chartered Institute of Bankers of Nigeria",
+            "publisher": "CIBN Press",
+            "file_url": f"/uploads/{i:08d}-document.pdf",
+            "thumbnail_url": f"/uploads/{i:08d}-thumb.png",
+            "file_size": 1048576 + i,
+            "duration": None,
+            "is_active": True,
+            "stock_quantity": None,
+            "purchase_count": i * 3,
+            "publication_date": now,
+            "created_at": now,
+            "updated_at": None,
+        })
+    payload = {"items": items, "total": page_size * 10, "page": 1, "page_size": page_size}
+    return json.dumps(payload).encode("utf-8")
+
+
+def run(iterations: int) -> None:
+    print(f"{'page_size':>9} {'codec':>6} {'raw':>9} {'compressed':>10} {'saved':>7} {'cpu/resp':>10}")
+    for page_size in (20, 50, 100):
+        body = build_content_list(page_size)
+        for encoding in available_encodings():
+            start = time.process_time()
+            for _ in range(iterations):
+                compress, flush = make_compressor(encoding, 6, 4, 3)
+                payload = compress(body) + flush()
+            cpu_ms = (time.process_time() - start) * 1000 / iterations
+            saved = 100 * (1 - len(payload) / len(body))
+            print(
+                f"{page_size:>9} {encoding:>6} {len(body):>9} {len(payload):>10} "
+                f"{saved:>6.1f}% {cpu_ms:>8.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    run(parser.parse_args().iterations)
@@ -0,0 +1,86 @@
+"""
+Benchmark a client per Paystack call against the shared pooled client.
+
+Runs a local plain-HTTP stand-in server with a fixed response delay and
+times sequential verify-style GETs both ways, so the difference is the
+cost of connection setup that the shared client keeps warm. Point
+``--url`` at a real endpoint to include DNS and TLS.
+
+Usage (from backend/):
+    python -m benchmarks.paystack_client_benchmark [--requests 200] [--url URL]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core.http import build_async_client
+
+
+async def _serve(delay: float):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        body = b'{"status": true, "data": {"status": "success"}}'
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    return server, f"http://{host}:{port}/transaction/verify/REF"
+
+
+async def _time(requests: int, send) -> list:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        (await send()).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:>18} {statistics.mean(latencies):>9.2f}ms {statistics.median(latencies):>9.2f}ms {p95:>9.2f}ms")
+
+
+async def run(requests: int, url: str | None, delay: float) -> None:
+    server = None
+    if url is None:
+        server, url = await _serve(delay)
+
+    async def per_call():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await client.get(url)
+
+    shared = build_async_client(connect_timeout=3, read_timeout=10, max_connections=20, max_keepalive_connections=10)
+    try:
+        print(f"{'client':>18} {'mean':>11} {'p50':>11} {'p95':>11}")
+        _report("per-call", await _time(requests, per_call))
+        _report("shared (pooled)", await _time(requests, lambda: shared.get(url)))
+    finally:
+        await shared.aclose()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--url", default=None, help="endpoint to GET instead of the local stand-in")
+    parser.add_argument("--delay", type=float, default=0.002, help="stand-in server delay in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.url, args.delay))
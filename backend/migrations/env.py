@@ -1,43 +1,31 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
-from alembic import context
-import os
-import sys
-from app.db.session import Base
 
+from sqlalchemy import engine_from_config, pool, text
+from alembic import context
 
-# Then your other imports
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.core.config import settings
 from app.db.session import Base
-# Import all your models here
-from app.models.user import User
-
-# Rest of the file remains the same
-# Add the project root directory to Python path
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, project_root)
-
-# Now import the models
-try:
-    from app.models import user, content, order, settings
-except ImportError as e:
-    print(f"Error importing models: {e}")
-    raise
 
 # This is the Alembic Config object
 config = context.config
 
 # Override the sqlalchemy.url from environment variables or use the one from alembic.ini
-from app.core.config import settings
-config.set_main_option('sqlalchemy.url', settings.DATABASE_URL)
+config.set_main_option('sqlalchemy.url', settings.DATABASE_URL.replace('%', '%%'))
 
-# Interpret the config file for Python logging
-if config.config_file_name is not None:
+# Interpret the config file for Python logging; callers that configure
+# logging themselves (the migrate command, tests) skip it
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
     fileConfig(config.config_file_name)
 
 # Add your model's MetaData object here
 target_metadata = Base.metadata
 
+# Held while migrating so that two `migrate` runs (e.g. two containers
+# starting at once) apply the chain one after the other
+MIGRATION_LOCK_ID = 0x63696260  # 'cib`'
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -51,26 +39,45 @@ def run_migrations_offline() -> None:
     with context.begin_transaction():
         context.run_migrations()
 
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        compare_server_default=True
+    )
+
+    is_postgres = connection.dialect.name == "postgresql"
+    if is_postgres:
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+    try:
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        if is_postgres:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+
+
 def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
+    """Run migrations in 'online' mode, on the caller's connection if it passed one."""
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, 
-            target_metadata=target_metadata,
-            compare_type=True,
-            compare_server_default=True
-        )
+        run_migrations(connection)
 
-        with context.begin_transaction():
-            context.run_migrations()
 
 if context.is_offline_mode():
     run_migrations_offline()
 else:
-    run_migrations_online()
\ No newline at end of file
+    run_migrations_online()
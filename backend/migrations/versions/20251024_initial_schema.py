@@ -0,0 +1,127 @@
+"""Initial schema: users, contents, orders, order items and purchases
+
+Revision ID: 20251024_initial_schema
+Revises:
+Create Date: 2025-10-24 04:19:40.522041
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20251024_initial_schema'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('role', sa.Enum('SUBSCRIBER', 'CIBN_MEMBER', 'ADMIN', name='userrole'), nullable=True),
+        sa.Column('cibn_employee_id', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_cibn_employee_id'), 'users', ['cibn_employee_id'], unique=True)
+
+    op.create_table('contents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('content_type', sa.Enum('DOCUMENT', 'VIDEO', 'AUDIO', 'PHYSICAL', name='contenttype'), nullable=False),
+        sa.Column('category', sa.Enum('EXAM_TEXT', 'CIBN_PUBLICATION', 'RESEARCH_PAPER', 'STATIONERY', 'SOUVENIR', 'OTHER', name='contentcategory'), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('file_url', sa.String(), nullable=True),
+        sa.Column('thumbnail_url', sa.String(), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=True),
+        sa.Column('is_exclusive', sa.Boolean(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('stock_quantity', sa.Integer(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('publisher', sa.String(), nullable=True),
+        sa.Column('publication_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contents_id'), 'contents', ['id'], unique=False)
+    op.create_index(op.f('ix_contents_title'), 'contents', ['title'], unique=False)
+    op.create_index(op.f('ix_contents_content_type'), 'contents', ['content_type'], unique=False)
+    op.create_index(op.f('ix_contents_category'), 'contents', ['category'], unique=False)
+
+    op.create_table('orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'CANCELLED', 'REFUNDED', name='orderstatus'), nullable=True),
+        sa.Column('payment_reference', sa.String(), nullable=True),
+        sa.Column('payment_method', sa.String(), nullable=True),
+        sa.Column('shipping_address', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('payment_reference')
+    )
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+
+    op.create_table('order_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('content_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('price_at_purchase', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+
+    op.create_table('purchases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('content_id', sa.Integer(), nullable=False),
+        sa.Column('purchase_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('access_count', sa.Integer(), nullable=True),
+        sa.Column('last_accessed', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_purchases_id'), 'purchases', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_purchases_id'), table_name='purchases')
+    op.drop_table('purchases')
+    op.drop_index(op.f('ix_order_items_id'), table_name='order_items')
+    op.drop_table('order_items')
+    op.drop_index(op.f('ix_orders_id'), table_name='orders')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_contents_category'), table_name='contents')
+    op.drop_index(op.f('ix_contents_content_type'), table_name='contents')
+    op.drop_index(op.f('ix_contents_title'), table_name='contents')
+    op.drop_index(op.f('ix_contents_id'), table_name='contents')
+    op.drop_table('contents')
+    op.drop_index(op.f('ix_users_cibn_employee_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
+    bind = op.get_bind()
+    for enum in ('orderstatus', 'contentcategory', 'contenttype', 'userrole'):
+        sa.Enum(name=enum).drop(bind, checkfirst=True)
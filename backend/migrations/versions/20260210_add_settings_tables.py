@@ -32,7 +32,7 @@ def upgrade() -> None:
             sa.Column('test_secret_key', sa.String(), nullable=True),
             sa.Column('live_public_key', sa.String(), nullable=True),
             sa.Column('live_secret_key', sa.String(), nullable=True),
-            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
             sa.PrimaryKeyConstraint('id')
         )
         op.create_index(op.f('ix_payment_settings_id'), 'payment_settings', ['id'], unique=False)
@@ -48,7 +48,7 @@ def upgrade() -> None:
             sa.Column('smtp_tls', sa.Boolean(), nullable=True, server_default='true'),
             sa.Column('emails_from_email', sa.String(), nullable=True),
             sa.Column('emails_from_name', sa.String(), nullable=True, server_default='CIBN Digital Library'),
-            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
             sa.PrimaryKeyConstraint('id')
         )
         op.create_index(op.f('ix_email_settings_id'), 'email_settings', ['id'], unique=False)
@@ -0,0 +1,49 @@
+"""Add email_campaigns
+
+Revision ID: 20261019_add_email_campaigns
+Revises: 20261019_add_email_outbox
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_email_campaigns'
+down_revision: Union[str, None] = '20261019_add_email_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('email_campaigns',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('headline', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('content_id', sa.Integer(), nullable=True),
+        sa.Column('role', postgresql.ENUM('SUBSCRIBER', 'CIBN_MEMBER', 'ADMIN', name='userrole', create_type=False), nullable=True),
+        sa.Column('category', postgresql.ENUM('EXAM_TEXT', 'CIBN_PUBLICATION', 'RESEARCH_PAPER', 'STATIONERY', 'SOUVENIR', 'OTHER', name='contentcategory', create_type=False), nullable=True),
+        sa.Column('status', sa.Enum('QUEUED', 'SENDING', 'COMPLETED', 'CANCELLED', name='campaignstatus'), nullable=False),
+        sa.Column('sent_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_campaigns_id'), 'email_campaigns', ['id'], unique=False)
+    op.create_index(op.f('ix_email_campaigns_status'), 'email_campaigns', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_email_campaigns_status'), table_name='email_campaigns')
+    op.drop_index(op.f('ix_email_campaigns_id'), table_name='email_campaigns')
+    op.drop_table('email_campaigns')
+    sa.Enum(name='campaignstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,59 @@
+"""Index foreign keys and hot filters found by the index audit
+
+Revision ID: 20261019_add_missing_indexes
+Revises: 20261019_add_purchases_user_date_index
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_missing_indexes'
+down_revision: Union[str, None] = '20261019_add_purchases_user_date_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns, partial-index predicate on PostgreSQL and on SQLite
+# (the same predicates the models declare)
+INDEXES = [
+    ('ix_orders_user_id', 'orders', ['user_id'], None, None),
+    ('ix_orders_pending', 'orders', ['id'], "status = 'PENDING'", "status = 'PENDING'"),
+    ('ix_order_items_order_id', 'order_items', ['order_id'], None, None),
+    ('ix_order_items_content_id', 'order_items', ['content_id'], None, None),
+    ('ix_purchases_content_id', 'purchases', ['content_id'], None, None),
+    ('ix_purchases_order_id', 'purchases', ['order_id'], None, None),
+    ('ix_content_progress_content_id', 'content_progress', ['content_id'], None, None),
+    ('ix_contents_public', 'contents', ['content_type', 'category'],
+     'is_active AND NOT is_exclusive', 'is_active = 1 AND is_exclusive = 0'),
+]
+
+
+def upgrade() -> None:
+    # content_progress may not exist yet; 20261019_add_model_only_schema creates
+    # it with its indexes.
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    # CONCURRENTLY keeps orders and purchases writable while the indexes build;
+    # it cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, postgresql_where, sqlite_where in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(postgresql_where) if postgresql_where else None,
+                sqlite_where=sa.text(sqlite_where) if sqlite_where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, *_ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
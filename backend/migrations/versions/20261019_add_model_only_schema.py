@@ -0,0 +1,91 @@
+"""Add the tables and columns that only startup create_all used to make
+
+content_progress, upload_settings and the users profile columns (avatar_url,
+arrears, annual_subscription) were never in a migration: workers created them
+from the models at boot. Databases built that way already have them, so each
+one is only added when it is missing.
+
+Revision ID: 20261019_add_model_only_schema
+Revises: 20261019_add_missing_indexes
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_model_only_schema'
+down_revision: Union[str, None] = '20261019_add_missing_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+USER_COLUMNS = [
+    sa.Column('avatar_url', sa.String(), nullable=True),
+    sa.Column('arrears', sa.Numeric(10, 2), nullable=True),
+    sa.Column('annual_subscription', sa.Numeric(10, 2), nullable=True),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    existing = {c['name'] for c in inspector.get_columns('users')}
+    missing = [column for column in USER_COLUMNS if column.name not in existing]
+    if missing:
+        with op.batch_alter_table('users') as batch_op:
+            for column in missing:
+                batch_op.add_column(column)
+
+    if 'upload_settings' not in tables:
+        op.create_table('upload_settings',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('max_file_size_document', sa.Integer(), nullable=True),
+            sa.Column('max_file_size_video', sa.Integer(), nullable=True),
+            sa.Column('max_file_size_audio', sa.Integer(), nullable=True),
+            sa.Column('max_file_size_image', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_upload_settings_id'), 'upload_settings', ['id'], unique=False)
+
+    if 'content_progress' not in tables:
+        op.create_table('content_progress',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('content_id', sa.Integer(), nullable=False),
+            sa.Column('playback_position', sa.Float(), nullable=False),
+            sa.Column('total_duration', sa.Float(), nullable=True),
+            sa.Column('progress_percentage', sa.Float(), nullable=False),
+            sa.Column('is_completed', sa.Boolean(), nullable=False),
+            sa.Column('last_watched', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'content_id', name='uq_user_content_progress')
+        )
+        op.create_index(op.f('ix_content_progress_id'), 'content_progress', ['id'], unique=False)
+        op.create_index(op.f('ix_content_progress_content_id'), 'content_progress', ['content_id'], unique=False)
+        op.create_index(
+            'ix_content_progress_resume',
+            'content_progress',
+            ['user_id', 'is_completed', sa.text('last_watched DESC')],
+            unique=False,
+            postgresql_include=['content_id', 'playback_position', 'total_duration', 'progress_percentage'],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_content_progress_resume', table_name='content_progress')
+    op.drop_index(op.f('ix_content_progress_content_id'), table_name='content_progress')
+    op.drop_index(op.f('ix_content_progress_id'), table_name='content_progress')
+    op.drop_table('content_progress')
+    op.drop_index(op.f('ix_upload_settings_id'), table_name='upload_settings')
+    op.drop_table('upload_settings')
+    with op.batch_alter_table('users') as batch_op:
+        for column in reversed(USER_COLUMNS):
+            batch_op.drop_column(column.name)
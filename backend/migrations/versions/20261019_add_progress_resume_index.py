@@ -0,0 +1,35 @@
+"""Add continue-watching index on content_progress
+
+Revision ID: 20261019_add_progress_resume_index
+Revises: 20261019_add_email_campaigns
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_progress_resume_index'
+down_revision: Union[str, None] = '20261019_add_email_campaigns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Until 20261019_add_model_only_schema, content_progress only existed where
+    # startup create_all had made it; that revision creates it, index included.
+    if 'content_progress' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_index(
+        'ix_content_progress_resume',
+        'content_progress',
+        ['user_id', 'is_completed', sa.text('last_watched DESC')],
+        unique=False,
+        postgresql_include=['content_id', 'playback_position', 'total_duration', 'progress_percentage'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_content_progress_resume', table_name='content_progress', if_exists=True)
@@ -0,0 +1,24 @@
+"""Add (user_id, purchase_date) index on purchases
+
+Revision ID: 20261019_add_purchases_user_date_index
+Revises: 20261019_add_progress_resume_index
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_purchases_user_date_index'
+down_revision: Union[str, None] = '20261019_add_progress_resume_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_purchases_user_date', 'purchases', ['user_id', 'purchase_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_purchases_user_date', table_name='purchases')
@@ -0,0 +1,34 @@
+"""Add settings_versions for cross-worker settings cache invalidation
+
+Revision ID: 20261019_add_settings_versions
+Revises: 20261019_unique_purchase_per_user
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_settings_versions'
+down_revision: Union[str, None] = '20261019_unique_purchase_per_user'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    settings_versions = op.create_table('settings_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(settings_versions, [
+        {'name': 'payment', 'version': 0},
+        {'name': 'email', 'version': 0},
+        {'name': 'upload', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('settings_versions')
@@ -0,0 +1,46 @@
+"""Add webhook_events inbox
+
+Revision ID: 20261019_add_webhook_events
+Revises: 20261019_add_job_checkpoints
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_webhook_events'
+down_revision: Union[str, None] = '20261019_add_job_checkpoints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('webhook_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_key', sa.String(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('reference', sa.String(), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PROCESSED', 'IGNORED', 'DEAD', name='webhookeventstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_key')
+    )
+    op.create_index(op.f('ix_webhook_events_id'), 'webhook_events', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_reference'), 'webhook_events', ['reference'], unique=False)
+    op.create_index('ix_webhook_events_status_due', 'webhook_events', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_events_status_due', table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_reference'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_id'), table_name='webhook_events')
+    op.drop_table('webhook_events')
+    sa.Enum(name='webhookeventstatus').drop(op.get_bind(), checkfirst=True)
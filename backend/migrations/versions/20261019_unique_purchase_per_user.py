@@ -0,0 +1,44 @@
+"""Unique purchase per (user_id, content_id)
+
+Revision ID: 20261019_unique_purchase_per_user
+Revises: 20261019_add_stock_reservations
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_unique_purchase_per_user'
+down_revision: Union[str, None] = '20261019_add_stock_reservations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Earlier check-then-insert fulfillment could race and duplicate rows;
+    # keep the oldest purchase per user and item, carrying over access counts.
+    op.execute(sa.text("""
+        UPDATE purchases AS keep
+        SET access_count = totals.access_count
+        FROM (
+            SELECT MIN(id) AS id, SUM(COALESCE(access_count, 0)) AS access_count
+            FROM purchases
+            GROUP BY user_id, content_id
+            HAVING COUNT(*) > 1
+        ) AS totals
+        WHERE keep.id = totals.id
+    """))
+    op.execute(sa.text("""
+        DELETE FROM purchases
+        WHERE id NOT IN (SELECT MIN(id) FROM purchases GROUP BY user_id, content_id)
+    """))
+    with op.batch_alter_table('purchases') as batch_op:
+        batch_op.create_unique_constraint('uq_purchases_user_content', ['user_id', 'content_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('purchases') as batch_op:
+        batch_op.drop_constraint('uq_purchases_user_content', type_='unique')
@@ -1,7 +1,7 @@
 """add_password_reset_fields
 
 Revision ID: 58a8fe653148
-Revises: 
+Revises: 20251024_initial_schema
 Create Date: 2025-11-12 13:45:37.456809
 
 """
@@ -13,7 +13,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '58a8fe653148'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '20251024_initial_schema'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
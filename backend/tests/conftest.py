@@ -3,20 +3,34 @@ Test configuration and fixtures for FastAPI backend testing.
 """
 import pytest
 import os
-from sqlalchemy import create_engine
+import datetime as dt
+import socket
+import ssl
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from typing import Generator
 from unittest.mock import patch, MagicMock
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
 
 # Set testing environment variable
 os.environ["TESTING"] = "true"
 
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_async_db
 from app.core.config import settings
-from app.models import User, Content, Order, ContentType, ContentCategory, UserRole
+from app.models import User, Content, Order, ContentType, ContentCategory, UserRole, EmailSettings
 from app.services.auth import get_password_hash, create_access_token
+from app.core.rate_limit import rate_limiter
+from app.services.settings_cache import settings_cache
+from app.services.entitlements import entitlements
 
 # Test database URL (using SQLite for tests)
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -27,9 +41,26 @@ test_engine = create_engine(
     connect_args={"check_same_thread": False}  # Needed for SQLite
 )
 
+
+@event.listens_for(test_engine, "connect")
+def _sqlite_wal(dbapi_connection, connection_record):
+    # Let a streaming read (campaign recipients) stay open while another session commits
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
 # Create test session factory
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Async engine on the same SQLite file for `async def` routes. NullPool keeps
+# aiosqlite connections from outliving the event loop of each TestClient.
+test_async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db",
+    poolclass=NullPool,
+)
+TestAsyncSessionLocal = async_sessionmaker(
+    test_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db() -> Generator:
@@ -38,6 +69,8 @@ def db() -> Generator:
     """
     # Create tables
     Base.metadata.create_all(bind=test_engine)
+    settings_cache.invalidate()
+    entitlements.invalidate()
     
     # Create session
     session = TestSessionLocal()
@@ -72,7 +105,13 @@ def client(db, mock_mssql_db) -> Generator:
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    rate_limiter.reset()
     
     with TestClient(app) as test_client:
         yield test_client
@@ -233,6 +272,96 @@ def test_physical_content(db) -> Content:
 
 
 # Pytest configuration
+class SMTPInbox:
+    """aiosmtpd handler that records delivered messages and the connection each came in on.
+
+    Recipients starting with ``bounce`` are rejected permanently (550); those
+    in ``unavailable`` get a transient 421.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.unavailable = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bounce"):
+            return "550 5.1.1 No such user"
+        if address in self.unavailable:
+            return "421 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append({"to": envelope.rcpt_tos[0], "peer": session.peer, "data": envelope.content})
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def self_signed_context(directory) -> ssl.SSLContext:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + dt.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_file, key_file = directory / "cert.pem", directory / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+@pytest.fixture(scope="session")
+def smtp_server(tmp_path_factory):
+    """Local SMTP server requiring STARTTLS and AUTH, shared by the session."""
+    inbox = SMTPInbox()
+    controller = Controller(
+        inbox,
+        hostname="127.0.0.1",
+        port=free_port(),
+        tls_context=self_signed_context(tmp_path_factory.mktemp("smtp")),
+        require_starttls=True,
+        auth_require_tls=True,
+        authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(
+            success=(auth_data.login, auth_data.password) == (b"mailer@cibn.org", b"secret")
+        ),
+    )
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+@pytest.fixture
+def smtp_inbox(smtp_server, db, monkeypatch) -> SMTPInbox:
+    """Email settings pointing at the local SMTP server, and its emptied inbox."""
+    controller, inbox = smtp_server
+    inbox.messages.clear()
+    inbox.unavailable.clear()
+    db.add(EmailSettings(
+        smtp_host=controller.hostname,
+        smtp_port=controller.port,
+        smtp_user="mailer@cibn.org",
+        smtp_password="secret",
+        smtp_tls=True,
+        emails_from_email="noreply@cibn.org",
+    ))
+    db.commit()
+    monkeypatch.setattr(settings, "EMAIL_RATE_PER_SECOND", 0)
+    return inbox
+
+
 def pytest_configure(config):
     """Configure pytest markers."""
     config.addinivalue_line("markers", "unit: Unit tests")
@@ -0,0 +1,162 @@
+"""
+Tests for bulk email campaigns.
+"""
+import smtplib
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models import (
+    CampaignStatus, Content, ContentCategory, ContentType, EmailCampaign, JobCheckpoint, Purchase, User, UserRole,
+)
+from app.services.campaigns import checkpoint_name, recipients_query, send_campaign
+from app.services.checkpoints import acquire_lease
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def frontend_url(monkeypatch):
+    monkeypatch.setattr(settings, "FRONTEND_URL", "https://library.cibn.org")
+
+
+def make_users(db, count, role=UserRole.CIBN_MEMBER, prefix="member", is_active=True):
+    users = [
+        User(email=f"{prefix}{i}@example.com", hashed_password="x", full_name=f"Member {i}", role=role, is_active=is_active)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def make_campaign(db, **filters):
+    campaign = EmailCampaign(
+        subject="New: Banking Law Review",
+        headline="A new publication is out",
+        message="The 2026 Banking Law Review is now in the library.",
+        status=CampaignStatus.QUEUED,
+        **filters,
+    )
+    db.add(campaign)
+    db.commit()
+    return campaign.id
+
+
+def send(campaign_id, **options):
+    options.setdefault("rate", 0)
+    return send_campaign(campaign_id, TestSessionLocal, **options)
+
+
+@pytest.mark.integration
+class TestEmailCampaigns:
+    """Tests for streaming, sending and resuming announcement campaigns."""
+
+    def test_recipient_filters(self, db):
+        """Test role and purchase-category filters, and that inactive users are skipped."""
+        members = make_users(db, 2)
+        subscribers = make_users(db, 2, role=UserRole.SUBSCRIBER, prefix="subscriber")
+        make_users(db, 1, prefix="inactive", is_active=False)
+        paper = Content(title="Paper", content_type=ContentType.DOCUMENT, category=ContentCategory.RESEARCH_PAPER, price=0)
+        db.add(paper)
+        db.flush()
+        db.add_all([Purchase(user_id=members[1].id, content_id=paper.id), Purchase(user_id=subscribers[0].id, content_id=paper.id)])
+        db.commit()
+
+        def emails(**filters):
+            campaign = db.get(EmailCampaign, make_campaign(db, **filters))
+            return [row.email for row in db.execute(recipients_query(campaign))]
+
+        assert emails() == [u.email for u in members + subscribers]
+        assert emails(role=UserRole.CIBN_MEMBER) == [u.email for u in members]
+        assert emails(category=ContentCategory.RESEARCH_PAPER) == [members[1].email, subscribers[0].email]
+        assert emails(role=UserRole.SUBSCRIBER, category=ContentCategory.RESEARCH_PAPER) == [subscribers[0].email]
+
+    def test_sends_over_connection_pool(self, db, smtp_inbox):
+        """Test every recipient gets a personalised email over at most ``connections`` sessions."""
+        users = make_users(db, 9)
+        campaign_id = make_campaign(db)
+
+        assert send(campaign_id, batch_size=4, connections=3) == {"sent": 9}
+
+        assert sorted(m["to"] for m in smtp_inbox.messages) == sorted(u.email for u in users)
+        assert len({m["peer"] for m in smtp_inbox.messages}) == 3
+        assert b"Hello Member 0," in next(m["data"] for m in smtp_inbox.messages if m["to"] == users[0].email)
+        db.expire_all()
+        campaign = db.get(EmailCampaign, campaign_id)
+        assert (campaign.status, campaign.sent_count, campaign.failed_count) == (CampaignStatus.COMPLETED, 9, 0)
+        assert db.get(JobCheckpoint, checkpoint_name(campaign_id)).lease_until is None
+        assert send(campaign_id) == {}  # completed campaigns are not resent
+
+    def test_resumes_from_checkpoint(self, db, smtp_inbox):
+        """Test a run stopped by a server outage resumes after the last completed batch."""
+        users = make_users(db, 5)
+        campaign_id = make_campaign(db)
+        smtp_inbox.unavailable.add(users[2].email)
+
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            send(campaign_id, batch_size=2, connections=1)
+        db.expire_all()
+        assert db.get(JobCheckpoint, checkpoint_name(campaign_id)).position == users[1].id
+        campaign = db.get(EmailCampaign, campaign_id)
+        assert (campaign.status, campaign.sent_count) == (CampaignStatus.SENDING, 2)
+
+        smtp_inbox.unavailable.clear()
+        assert send(campaign_id, batch_size=2, connections=1) == {"sent": 3}
+        assert [m["to"] for m in smtp_inbox.messages] == [u.email for u in users]
+        db.expire_all()
+        assert db.get(EmailCampaign, campaign_id).sent_count == 5
+
+    def test_permanent_rejections_counted_and_skipped(self, db, smtp_inbox):
+        """Test a rejected address does not stop the campaign."""
+        make_users(db, 1, prefix="bounce")
+        make_users(db, 2)
+        campaign_id = make_campaign(db)
+
+        assert send(campaign_id, batch_size=2) == {"sent": 2, "failed": 1}
+        db.expire_all()
+        assert db.get(EmailCampaign, campaign_id).status == CampaignStatus.COMPLETED
+
+    def test_rate_ceiling(self, db, smtp_inbox):
+        """Test sends are spaced to the campaign rate across all connections."""
+        make_users(db, 5)
+        campaign_id = make_campaign(db)
+
+        started = time.monotonic()
+        assert send(campaign_id, connections=2, rate=20) == {"sent": 5}
+        assert time.monotonic() - started >= 4 / 20
+
+    def test_single_sender_per_campaign(self, db, smtp_inbox):
+        """Test a worker skips a campaign whose lease another worker holds."""
+        make_users(db, 2)
+        campaign_id = make_campaign(db)
+        acquire_lease(db, checkpoint_name(campaign_id), lease_seconds=600)
+
+        assert send(campaign_id) == {}
+        assert smtp_inbox.messages == []
+
+    def test_admin_queues_and_cancels(self, client: TestClient, db, admin_token, test_content_public):
+        """Test the admin API queues a campaign and a cancelled campaign is not sent."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = client.post(
+            "/api/v1/admin/campaigns",
+            json={"subject": "New", "headline": "New", "message": "Read it", "content_id": test_content_public.id, "role": "cibn_member"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+        campaign = response.json()
+        assert (campaign["status"], campaign["role"]) == ("queued", "cibn_member")
+
+        response = client.post(f"/api/v1/admin/campaigns/{campaign['id']}/cancel", headers=headers)
+        assert response.json()["status"] == "cancelled"
+        assert send(campaign["id"]) == {}
+
+    def test_admin_only(self, client: TestClient, user_token):
+        """Test members cannot send campaigns."""
+        response = client.post(
+            "/api/v1/admin/campaigns",
+            json={"subject": "x", "headline": "x", "message": "x"},
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 403
@@ -0,0 +1,138 @@
+"""
+Tests for the response compression middleware.
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, parse_accept_encoding, select_encoding
+from app.models import Content, ContentType, ContentCategory
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_sizes={"application/json": 512, "text/plain": 1024},
+    )
+
+    @app.get("/large-json")
+    def large_json():
+        return JSONResponse({"items": ["banking and finance " * 10] * 50})
+
+    @app.get("/small-json")
+    def small_json():
+        return JSONResponse({"ok": True})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for _ in range(20):
+                yield b"line of plain text output\n" * 20
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+@pytest.mark.unit
+class TestEncodingNegotiation:
+    """Tests for Accept-Encoding parsing and selection."""
+
+    def test_parse_q_values(self):
+        """Test q-values are parsed per coding."""
+        accepted = parse_accept_encoding("gzip;q=0.5, br, identity;q=0")
+        assert accepted == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+    def test_prefers_server_order(self):
+        """Test the server preference order wins among accepted codings."""
+        assert select_encoding("gzip, br, zstd", ("zstd", "br", "gzip")) == "zstd"
+        assert select_encoding("gzip, br", ("br", "gzip")) == "br"
+
+    def test_rejected_coding_is_skipped(self):
+        """Test a coding with q=0 is never selected."""
+        assert select_encoding("gzip;q=0", ("gzip",)) is None
+        assert select_encoding("*", ("gzip",)) == "gzip"
+
+
+@pytest.mark.unit
+class TestCompressionMiddleware:
+    """Tests for compressing responses by media type and size."""
+
+    def setup_method(self):
+        self.client = TestClient(_build_app())
+
+    def test_large_json_is_gzipped(self):
+        """Test JSON above the threshold is compressed with a correct length."""
+        response = self.client.get("/large-json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert response.json()["items"][0].startswith("banking")
+
+    def test_small_json_is_not_compressed(self):
+        """Test responses below the threshold are sent as-is."""
+        response = self.client.get("/small-json", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_compressed_media_is_skipped(self):
+        """Test already-compressed media types are never recompressed."""
+        response = self.client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content.startswith(b"\x89PNG")
+
+    def test_no_accept_encoding(self):
+        """Test clients that do not advertise compression get identity."""
+        response = self.client.get("/large-json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_body_is_compressed_incrementally(self):
+        """Test streaming responses are compressed without a Content-Length."""
+        with self.client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join(response.iter_raw())
+        assert gzip.decompress(raw) == (b"line of plain text output\n" * 20) * 20
+
+    def test_brotli_when_available(self):
+        """Test brotli is negotiated when the codec is installed."""
+        brotli = pytest.importorskip("brotli")
+        with self.client.stream("GET", "/large-json", headers={"Accept-Encoding": "br"}) as response:
+            assert response.headers["content-encoding"] == "br"
+            raw = b"".join(response.iter_raw())
+        assert b"banking and finance" in brotli.decompress(raw)
+
+
+@pytest.mark.content
+@pytest.mark.integration
+class TestContentListCompression:
+    """Tests for compression on real API payloads."""
+
+    def test_public_content_list_is_compressed(self, client: TestClient, db):
+        """Test a content list with long descriptions is gzipped."""
+        for i in range(20):
+            db.add(Content(
+                title=f"Banking Practice Volume {i}",
+                description="Long form description of the publication. " * 20,
+                content_type=ContentType.DOCUMENT,
+                category=ContentCategory.CIBN_PUBLICATION,
+                price=1000.0,
+                is_exclusive=False,
+                is_active=True,
+            ))
+        db.commit()
+
+        response = client.get(
+            "/api/v1/content/public?page_size=20",
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["total"] == 20
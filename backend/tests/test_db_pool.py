@@ -0,0 +1,92 @@
+"""
+Tests for connection pool configuration and instrumentation.
+"""
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, instrument_pool, pool_options
+from app.db.session import async_database_url
+
+
+@pytest.fixture
+def small_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    stats = instrument_pool(engine, "test")
+    yield engine, stats
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestPoolInstrumentation:
+    """Tests for pool hooks and stats."""
+
+    def test_checkout_and_checkin_are_counted(self, small_pool):
+        """Test checked-out count follows checkouts and checkins."""
+        engine, stats = small_pool
+        with engine.connect():
+            assert stats.snapshot()["checked_out"] == 1
+        snapshot = stats.snapshot()
+        assert snapshot["checked_out"] == 0
+        assert snapshot["checkouts"] == 1
+        assert snapshot["connections_opened"] == 1
+        assert snapshot["size"] == 1
+
+    def test_starvation_timeout_is_recorded(self, small_pool):
+        """Test a checkout timeout is counted along with the wait time."""
+        engine, stats = small_pool
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        snapshot = stats.snapshot()
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_seconds_max"] >= 0.05
+        assert snapshot["checked_out_max"] == 1
+
+    def test_stats_survive_dispose(self, small_pool):
+        """Test the replacement pool created by dispose() keeps reporting."""
+        engine, stats = small_pool
+        engine.dispose()
+        with engine.connect():
+            pass
+        assert stats.snapshot()["checkouts"] == 1
+        assert stats.pool is engine.pool
+
+
+@pytest.mark.unit
+class TestPoolOptions:
+    """Tests for engine options derived from settings."""
+
+    def test_queue_pool_from_settings(self):
+        """Test PostgreSQL engines get the configured sizing."""
+        options = pool_options("postgresql://u:p@db/cibn")
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+        assert options["pool_timeout"] == settings.DB_POOL_TIMEOUT
+
+    def test_pgbouncer_mode(self, monkeypatch):
+        """Test PgBouncer mode disables client pooling and prepared statements."""
+        monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+        options = pool_options("postgresql+asyncpg://u:p@db/cibn", is_async=True)
+        assert options["poolclass"] is NullPool
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+    def test_sqlite_has_no_sizing(self):
+        """Test SQLite keeps its driver's default pool."""
+        assert pool_options("sqlite:///./test.db") == {}
+
+    def test_async_database_url(self):
+        """Test sync URLs map onto their async drivers."""
+        assert async_database_url("postgresql://u:p@db/cibn?sslmode=require") == (
+            "postgresql+asyncpg://u:p@db/cibn?ssl=require"
+        )
+        assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
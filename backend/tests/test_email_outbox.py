@@ -0,0 +1,94 @@
+"""
+Tests for the transactional email outbox and its SMTP sender.
+
+Mail goes to the local aiosmtpd server from conftest (``smtp_inbox``), which
+requires STARTTLS and AUTH, so the sender's real connection path is exercised.
+"""
+import datetime as dt
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models import EmailOutbox, EmailSettings, EmailStatus
+from app.services.email import EmailContent
+from app.services.email_outbox import OutboxSender, queue_email
+from tests.conftest import free_port
+
+
+@pytest.fixture
+def sender():
+    sender = OutboxSender()
+    yield sender
+    sender.close()
+
+
+def queue(db, *recipients):
+    for recipient in recipients:
+        queue_email(db, recipient, EmailContent(f"Hello {recipient}", f"<p>Hi {recipient}</p>", f"Hi {recipient}"))
+    db.commit()
+
+
+@pytest.mark.integration
+class TestEmailOutbox:
+    """Tests for queueing and background delivery of transactional email."""
+
+    def test_batches_share_one_smtp_session(self, db, smtp_inbox, sender):
+        """Test a batch, and the next one, go over the same authenticated connection."""
+        queue(db, "a@example.com", "b@example.com", "c@example.com")
+        assert sender.send_batch(db) == {"sent": 3}
+        queue(db, "d@example.com")
+        assert sender.send_batch(db) == {"sent": 1}
+
+        assert [m["to"] for m in smtp_inbox.messages] == ["a@example.com", "b@example.com", "c@example.com", "d@example.com"]
+        assert len({m["peer"] for m in smtp_inbox.messages}) == 1
+        assert b"Hi a@example.com" in smtp_inbox.messages[0]["data"]
+        assert {e.status for e in db.query(EmailOutbox)} == {EmailStatus.SENT}
+
+    def test_permanent_rejection_is_dead_lettered(self, db, smtp_inbox, sender):
+        """Test a 5xx rejection marks only that email dead and the batch carries on."""
+        queue(db, "bounce@example.com", "ok@example.com")
+        assert sender.send_batch(db) == {"dead": 1, "sent": 1}
+
+        bounced = db.query(EmailOutbox).filter(EmailOutbox.to_email == "bounce@example.com").one()
+        assert bounced.status == EmailStatus.DEAD
+        assert "550" in bounced.last_error
+        assert [m["to"] for m in smtp_inbox.messages] == ["ok@example.com"]
+
+    def test_server_down_retries_with_backoff_then_gives_up(self, db, smtp_inbox, sender, monkeypatch):
+        """Test an unreachable server defers the whole batch, and gives up after the attempt budget."""
+        monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 2)
+        db.query(EmailSettings).one().smtp_port = free_port()  # nothing listening
+        db.commit()
+        queue(db, "a@example.com", "b@example.com")
+
+        assert sender.send_batch(db) == {"retrying": 2}
+        db.expire_all()
+        assert all(e.next_attempt_at > dt.datetime.utcnow() for e in db.query(EmailOutbox))
+        assert sender.send_batch(db) == {}  # not due yet
+
+        later = dt.datetime.utcnow() + dt.timedelta(days=1)
+        assert sender.send_batch(db, now=later) == {"dead": 2}
+
+    def test_rate_ceiling(self, db, smtp_inbox, sender, monkeypatch):
+        """Test sends are spaced to EMAIL_RATE_PER_SECOND."""
+        monkeypatch.setattr(settings, "EMAIL_RATE_PER_SECOND", 20)
+        queue(db, *[f"user{i}@example.com" for i in range(5)])
+
+        started = time.monotonic()
+        assert sender.send_batch(db) == {"sent": 5}
+        assert time.monotonic() - started >= 4 / 20
+
+    def test_registration_does_not_touch_smtp(self, client: TestClient, db, smtp_inbox):
+        """Test registering only queues the welcome email."""
+        with patch("app.services.email.open_smtp", side_effect=AssertionError("SMTP used in request")):
+            response = client.post(
+                "/api/v1/auth/register",
+                json={"email": "member@example.com", "password": "TestPass123!", "full_name": "New Member"},
+            )
+        assert response.status_code == 201
+        queued = db.query(EmailOutbox).one()
+        assert (queued.to_email, queued.status) == ("member@example.com", EmailStatus.PENDING)
+        assert smtp_inbox.messages == []
@@ -0,0 +1,90 @@
+"""
+Tests for the compiled, pre-rendered email templates.
+"""
+import shutil
+from unittest.mock import patch
+
+import pytest
+from jinja2 import TemplateError
+
+from app.core.config import settings
+from app.services.email import password_reset_email_content, welcome_email_content
+from app.services.email_templates import TEMPLATE_DIR, EmailTemplates
+
+
+@pytest.fixture(autouse=True)
+def frontend_url(monkeypatch):
+    monkeypatch.setattr(settings, "FRONTEND_URL", "https://library.cibn.org")
+
+
+@pytest.fixture
+def templates(tmp_path):
+    """Templates loaded from a copy of the shipped directory, with their own bytecode cache."""
+    directory = tmp_path / "email"
+    shutil.copytree(TEMPLATE_DIR, directory)
+    (tmp_path / "cache").mkdir()
+    return EmailTemplates(directory, cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.mark.integration
+class TestEmailTemplates:
+    """Tests for rendering transactional emails from templates."""
+
+    def test_html_and_text_from_one_template(self):
+        """Test both bodies carry the recipient's fields, escaped only in HTML."""
+        content = password_reset_email_content("tok&123", "Ada <Obi>")
+
+        assert content.subject == "Reset Your Password - CIBN Digital Library"
+        assert "Hello Ada &lt;Obi&gt;," in content.html_content
+        assert 'href="https://library.cibn.org/reset-password?token=tok&amp;123"' in content.html_content
+        assert "Hello Ada <Obi>," in content.text_content
+        assert "https://library.cibn.org/reset-password?token=tok&123" in content.text_content
+        assert "<" not in content.text_content.replace("<Obi>", "")
+
+    def test_welcome_links_to_frontend(self):
+        """Test shared settings reach the template."""
+        content = welcome_email_content("New User")
+
+        assert content.subject == "Welcome to CIBN Digital Library!"
+        assert 'href="https://library.cibn.org"' in content.html_content
+        assert "Start Exploring: https://library.cibn.org" in content.text_content
+
+    def test_static_parts_rendered_once(self, templates):
+        """Test later emails only fill in recipient fields, without running the template."""
+        first = templates.render("welcome", user_name="Ada")
+        with patch("jinja2.Template.render", side_effect=AssertionError("template re-rendered")):
+            second = templates.render("welcome", user_name="Obi")
+
+        assert second.html_content == first.html_content.replace("Hello Ada,", "Hello Obi,")
+        assert second.text_content == first.text_content.replace("Hello Ada,", "Hello Obi,")
+
+    def test_locale_variant_with_fallback(self, templates):
+        """Test a locale copy replaces the default and other locales fall back to it."""
+        (templates.directory / "fr").mkdir()
+        (templates.directory / "fr" / "welcome.j2").write_text(
+            "{% extends layout %}{% block subject %}Bienvenue{% endblock %}"
+            "{% block content %}{% call m.p() %}Bonjour {{ user_name }}{% endcall %}{% endblock %}",
+            encoding="utf-8",
+        )
+        templates.load()
+
+        assert templates.render("welcome", "fr", user_name="Ada").subject == "Bienvenue"
+        assert "Bonjour Ada" in templates.render("welcome", "fr", user_name="Ada").text_content
+        assert templates.render("welcome", "de", user_name="Ada").subject == "Welcome to CIBN Digital Library!"
+
+    def test_compiled_at_load_into_bytecode_cache(self, templates):
+        """Test load compiles every template for both formats and caches the bytecode."""
+        templates.load()
+
+        cached = sorted(p.name.split("_")[3] for p in (templates.directory.parent / "cache").iterdir())
+        assert cached.count("html") == cached.count("text") == len(list(TEMPLATE_DIR.glob("*.j2")))
+
+    def test_filtered_recipient_field_rejected(self, templates):
+        """Test a template that transforms a recipient field fails loudly instead of mis-rendering."""
+        (templates.directory / "shout.j2").write_text(
+            "{% extends layout %}{% block subject %}Hi{% endblock %}{% block content %}{{ user_name | upper }}{% endblock %}",
+            encoding="utf-8",
+        )
+
+        with pytest.raises(TemplateError, match="recipient field"):
+            templates.render("shout", user_name="Ada")
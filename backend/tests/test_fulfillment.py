@@ -0,0 +1,126 @@
+"""
+Tests for the shared order fulfillment engine.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Order, OrderItem, OrderStatus, Purchase, StockReservation
+from app.services.fulfillment import fulfill_order, paid_amount_matches
+
+
+def make_order(db, user, lines) -> Order:
+    order = Order(user_id=user.id, total_amount=1000.0, status=OrderStatus.PENDING)
+    db.add(order)
+    db.flush()
+    db.add_all([
+        OrderItem(order_id=order.id, content_id=content.id, quantity=quantity, price_at_purchase=content.price)
+        for content, quantity in lines
+    ])
+    db.commit()
+    return order
+
+
+def hold(db, order, content, quantity, minutes):
+    db.add(StockReservation(
+        order_id=order.id, content_id=content.id, quantity=quantity,
+        expires_at=datetime.utcnow() + timedelta(minutes=minutes),
+    ))
+    db.commit()
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestFulfillment:
+    """Tests for fulfill_order."""
+
+    def test_grants_purchases_and_takes_stock(self, db, test_user, test_content_public, test_physical_content):
+        """Test digital lines become purchases and physical lines reduce stock."""
+        order = make_order(db, test_user, [(test_content_public, 1), (test_physical_content, 4)])
+
+        assert fulfill_order(db, order, "card")
+        db.commit()
+
+        db.refresh(order)
+        db.refresh(test_physical_content)
+        assert order.status == OrderStatus.COMPLETED
+        assert order.payment_method == "card"
+        assert order.completed_at is not None
+        assert test_physical_content.stock_quantity == 6
+        purchase = db.query(Purchase).filter_by(user_id=test_user.id).one()
+        assert (purchase.content_id, purchase.order_id) == (test_content_public.id, order.id)
+
+    def test_existing_purchase_not_duplicated(self, db, test_user, test_content_public):
+        """Test content already in the library is skipped by ON CONFLICT DO NOTHING."""
+        db.add(Purchase(user_id=test_user.id, content_id=test_content_public.id, amount=0))
+        db.commit()
+        order = make_order(db, test_user, [(test_content_public, 1)])
+
+        assert fulfill_order(db, order)
+        db.commit()
+
+        assert db.query(Purchase).filter_by(user_id=test_user.id).count() == 1
+
+    def test_fulfillment_is_idempotent(self, db, test_user, test_physical_content):
+        """Test a second fulfillment (verify after webhook) changes nothing."""
+        order = make_order(db, test_user, [(test_physical_content, 3)])
+
+        assert fulfill_order(db, order)
+        db.commit()
+        assert not fulfill_order(db, order)
+        db.commit()
+
+        db.refresh(test_physical_content)
+        assert test_physical_content.stock_quantity == 7
+
+    def test_payment_after_expired_hold(self, db, test_user, test_physical_content):
+        """Test a lapsed hold is honoured from stock nobody else holds."""
+        order = make_order(db, test_user, [(test_physical_content, 4)])
+        hold(db, order, test_physical_content, 4, minutes=-1)
+
+        assert fulfill_order(db, order)
+        db.commit()
+
+        db.refresh(order)
+        db.refresh(test_physical_content)
+        assert order.status == OrderStatus.COMPLETED
+        assert test_physical_content.stock_quantity == 6
+        assert db.query(StockReservation).count() == 0
+
+    def test_payment_after_expired_hold_short_of_stock(self, db, test_user, test_physical_content):
+        """Test stock sold on after a hold lapsed is not oversold; the order is flagged for staff."""
+        order = make_order(db, test_user, [(test_physical_content, 4)])
+        hold(db, order, test_physical_content, 4, minutes=-1)
+        other = make_order(db, test_user, [(test_physical_content, 8)])
+        hold(db, other, test_physical_content, 8, minutes=30)
+        oversold = REGISTRY.get_sample_value("orders_oversold_total") or 0.0
+
+        assert fulfill_order(db, order)
+        db.commit()
+
+        db.refresh(order)
+        db.refresh(test_physical_content)
+        assert order.status == OrderStatus.PROCESSING
+        assert f"content {test_physical_content.id}: 2 short" in order.notes
+        assert test_physical_content.stock_quantity == 10
+        assert [r.order_id for r in db.query(StockReservation).all()] == [other.id]
+        assert REGISTRY.get_sample_value("orders_oversold_total") == oversold + 1
+        assert not fulfill_order(db, order)
+
+    def test_unique_purchase_constraint(self, db, test_user, test_content_public):
+        """Test the database rejects a second purchase row for the same item."""
+        db.add(Purchase(user_id=test_user.id, content_id=test_content_public.id))
+        db.commit()
+        db.add(Purchase(user_id=test_user.id, content_id=test_content_public.id))
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+
+    def test_paid_amount_matches(self):
+        """Test kobo amounts are compared against the naira total."""
+        order = Order(total_amount=1091.13)
+        assert paid_amount_matches(order, 109113)
+        assert not paid_amount_matches(order, 109112)
+        assert paid_amount_matches(order, None)
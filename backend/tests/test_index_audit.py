@@ -0,0 +1,89 @@
+"""
+Tests for the index audit and the query plans of filtered lookups.
+"""
+import pytest
+from sqlalchemy import func, select, text
+
+from app.db.index_audit import IndexInfo, _serves, audit_indexes, parse_indexdef
+from app.models import Content, Order, OrderItem, OrderStatus, Purchase
+
+
+def query_plan(db, query) -> str:
+    sql = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.mark.integration
+class TestIndexAudit:
+    """Tests for finding filtered columns without an index."""
+
+    def test_models_fully_indexed(self, db):
+        """Test a database built from the models has nothing missing."""
+        assert audit_indexes(db.connection()) == []
+
+    def test_reports_dropped_index(self, db):
+        """Test a missing index is reported both as an unserved foreign key and by name."""
+        index = next(i for i in OrderItem.__table__.indexes if i.name == "ix_order_items_order_id")
+        connection = db.connection()
+        index.drop(bind=connection)
+        try:
+            findings = {(f.table, f.index) for f in audit_indexes(connection)}
+        finally:
+            index.create(bind=connection)
+            db.commit()
+        assert findings == {("order_items", "order_id"), ("order_items", "ix_order_items_order_id")}
+
+    def test_partial_and_trailing_indexes_do_not_serve(self):
+        """Test only an unconditional index led by the required columns counts."""
+        assert _serves(IndexInfo("t", "a", ("user_id", "content_id")), ("content_id", "user_id"))
+        assert not _serves(IndexInfo("t", "b", ("content_id", "user_id")), ("user_id",))
+        assert not _serves(IndexInfo("t", "c", ("user_id",), "is_active"), ("user_id",))
+
+    def test_parse_pg_indexdef(self):
+        """Test key columns and predicates are read from pg_indexes definitions."""
+        assert parse_indexdef(
+            "CREATE INDEX ix_content_progress_resume ON public.content_progress USING btree "
+            "(user_id, is_completed, last_watched DESC) INCLUDE (content_id, playback_position)"
+        ) == (("user_id", "is_completed", "last_watched"), None)
+        assert parse_indexdef(
+            "CREATE INDEX ix_contents_public ON public.contents USING btree (content_type, category) "
+            "WHERE (is_active AND (NOT is_exclusive))"
+        ) == (("content_type", "category"), "(is_active AND (NOT is_exclusive))")
+        assert parse_indexdef(
+            'CREATE UNIQUE INDEX ix_users_email ON public.users USING btree (lower((email)::text), "order" NULLS FIRST)'
+        ) == (("lower((email)::text)", "order"), None)
+
+
+@pytest.mark.integration
+class TestQueryPlans:
+    """EXPLAIN regression tests: hot lookups must keep using their index."""
+
+    @pytest.mark.parametrize("query, index", [
+        (select(Order).where(Order.user_id == 1), "ix_orders_user_id"),
+        (select(OrderItem).where(OrderItem.order_id == 1), "ix_order_items_order_id"),
+        (
+            select(Purchase.content_id, func.count(Purchase.id)).where(Purchase.content_id.in_([1, 2])).group_by(Purchase.content_id),
+            "ix_purchases_content_id",
+        ),
+        (
+            select(Content.id).where(Content.is_active == True, Content.is_exclusive == False).limit(20),  # noqa: E712
+            "ix_contents_public",
+        ),
+        (
+            select(Order.id).where(Order.status == OrderStatus.PENDING, Order.id > 0).order_by(Order.id).limit(50),
+            "ix_orders_pending",
+        ),
+    ], ids=["orders-by-user", "items-by-order", "purchase-counts", "public-catalogue", "pending-orders"])
+    def test_uses_index(self, db, query, index):
+        """Test the lookup searches its index rather than scanning the table."""
+        plan = query_plan(db, query)
+
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_entitlements_read_unique_index(self, db):
+        """Test a user's owned ids come sorted straight from the (user_id, content_id) index."""
+        plan = query_plan(db, select(Purchase.content_id).where(Purchase.user_id == 1).order_by(Purchase.content_id))
+
+        assert "COVERING INDEX" in plan
+        assert "TEMP B-TREE" not in plan
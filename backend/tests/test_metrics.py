@@ -0,0 +1,138 @@
+"""
+Tests for the Prometheus metrics subsystem.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, instrument_pool, pool_stats
+
+
+def sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.mark.integration
+class TestMetricsEndpoint:
+    """Tests for request instrumentation and the /metrics endpoint."""
+
+    def test_metrics_exposition(self, client: TestClient):
+        """Test /metrics serves the Prometheus text format."""
+        client.get("/health")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
+        assert "db_queries_total" in response.text
+
+    def test_requests_labelled_by_route_template(self, client: TestClient, user_token, test_content_public):
+        """Test path parameters are collapsed into the route template."""
+        labels = {"method": "GET", "route": "/api/v1/content/{content_id}", "status": "200"}
+        before = sample("http_requests_total", labels)
+
+        response = client.get(
+            f"/api/v1/content/{test_content_public.id}",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert response.status_code == 200
+        assert sample("http_requests_total", labels) == before + 1
+        assert sample("http_request_duration_seconds_count", labels) >= 1
+
+    def test_unmatched_paths_share_one_label(self, client: TestClient):
+        """Test 404s for unknown paths do not create a label per path."""
+        labels = {"method": "GET", "route": metrics.UNMATCHED_ROUTE, "status": "404"}
+        before = sample("http_requests_total", labels)
+
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+
+        assert sample("http_requests_total", labels) == before + 2
+
+    def test_db_queries_counted_per_request(self, client: TestClient, user_token, test_content_public):
+        """Test statements issued while serving a request are attributed to its route."""
+        route = {"route": "/api/v1/content/{content_id}"}
+        count_before = sample("http_request_db_queries_count", route)
+        sum_before = sample("http_request_db_queries_sum", route)
+        total_before = sample("db_queries_total")
+
+        client.get(
+            f"/api/v1/content/{test_content_public.id}",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert sample("http_request_db_queries_count", route) == count_before + 1
+        assert sample("http_request_db_queries_sum", route) > sum_before
+        assert sample("db_queries_total") > total_before
+
+    def test_metrics_token(self, client: TestClient, monkeypatch):
+        """Test a configured METRICS_TOKEN is required to scrape."""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+        assert client.get("/metrics").status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert response.status_code == 200
+
+
+@pytest.mark.unit
+class TestMetricsCollectors:
+    """Tests for the collectors behind /metrics."""
+
+    def test_upload_disk_collector(self, tmp_path):
+        """Test upload usage reports file count and bytes."""
+        (tmp_path / "a.pdf").write_bytes(b"x" * 100)
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "b.mp4").write_bytes(b"y" * 50)
+
+        collector = metrics.UploadDiskCollector(str(tmp_path))
+        values = {family.name: family.samples[0].value for family in collector.collect()}
+
+        assert values["upload_dir_bytes"] == 150
+        assert values["upload_dir_files"] == 2
+        assert values["upload_disk_free_bytes"] > 0
+
+    def test_pool_overflow_gauges(self, tmp_path):
+        """Test overflow follows connections opened beyond the pool size and closed again."""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=2,
+        )
+        stats = instrument_pool(engine, "overflow-test")
+        stats.add_observer(metrics._observe_pool)
+        labels = {"pool": "overflow-test"}
+        try:
+            with engine.connect(), engine.connect():
+                assert sample("db_pool_overflow", labels) == 1
+                assert sample("db_pool_max_overflow", labels) == 2
+                assert sample("db_pool_size", labels) == 1
+            assert sample("db_pool_overflow", labels) == 0
+        finally:
+            pool_stats.pop("overflow-test")
+            engine.dispose()
+
+    def test_multiprocess_aggregation(self, tmp_path):
+        """Test samples written by separate worker processes are summed."""
+        worker = textwrap.dedent("""
+            from prometheus_client import Counter
+            Counter("worker_requests_total", "test").inc(3)
+        """)
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+        script = textwrap.dedent("""
+            from app.core.metrics import render_metrics
+            payload, _ = render_metrics()
+            print(payload.decode())
+        """)
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout
+        assert "worker_requests_total 6.0" in output
@@ -0,0 +1,158 @@
+"""
+Tests for the migration chain and the startup schema check.
+"""
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.migrations import (
+    STAMP_BASELINE,
+    alembic_config,
+    check_schema,
+    current_revision,
+    head_revision,
+    missing_from_baseline,
+    stamp,
+    unversioned_tables,
+    upgrade,
+)
+from app.db.session import Base
+
+
+@pytest.fixture
+def empty_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+# What the old startup create_all made beyond the tables the chain had at
+# STAMP_BASELINE (DDL as create_all emitted it on SQLite)
+PRE_CHAIN_DDL = [
+    "ALTER TABLE users ADD COLUMN avatar_url VARCHAR",
+    "ALTER TABLE users ADD COLUMN arrears NUMERIC(10, 2)",
+    "ALTER TABLE users ADD COLUMN annual_subscription NUMERIC(10, 2)",
+    """CREATE TABLE upload_settings (
+        id INTEGER NOT NULL,
+        max_file_size_document INTEGER,
+        max_file_size_video INTEGER,
+        max_file_size_audio INTEGER,
+        max_file_size_image INTEGER,
+        updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX ix_upload_settings_id ON upload_settings (id)",
+    """CREATE TABLE content_progress (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        content_id INTEGER NOT NULL,
+        playback_position FLOAT NOT NULL,
+        total_duration FLOAT,
+        progress_percentage FLOAT NOT NULL,
+        is_completed BOOLEAN NOT NULL,
+        last_watched DATETIME NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_user_content_progress UNIQUE (user_id, content_id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY(content_id) REFERENCES contents (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX ix_content_progress_id ON content_progress (id)",
+]
+
+
+def build_pre_chain_database(engine):
+    """The schema startup create_all built before the chain owned it: no alembic_version."""
+    with engine.connect() as connection:
+        upgrade(connection, STAMP_BASELINE)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        for statement in PRE_CHAIN_DDL:
+            connection.execute(text(statement))
+
+
+@pytest.mark.integration
+class TestMigrations:
+    """Tests for building the schema from the migration chain alone."""
+
+    def test_single_chain(self):
+        """Test the chain has one root and one head."""
+        script = ScriptDirectory.from_config(alembic_config())
+
+        assert len(script.get_heads()) == 1
+        assert len(script.get_bases()) == 1
+
+    def test_chain_builds_the_models(self, empty_engine):
+        """Test an empty database migrated to head matches the models exactly."""
+        with empty_engine.connect() as connection:
+            upgrade(connection)
+
+        with empty_engine.connect() as connection:
+            assert current_revision(connection) == head_revision()
+            context = MigrationContext.configure(connection, opts={"compare_type": True})
+            assert compare_metadata(context, Base.metadata) == []
+
+    def test_partial_indexes_keep_their_predicates(self, empty_engine):
+        """Test the chain creates the partial indexes with the predicates the models declare."""
+        with empty_engine.connect() as connection:
+            upgrade(connection)
+
+        with empty_engine.connect() as connection:
+            sql = dict(connection.execute(text(
+                "SELECT name, sql FROM sqlite_master WHERE name IN ('ix_contents_public', 'ix_orders_pending')"
+            )).all())
+        assert sql["ix_contents_public"].endswith("WHERE is_active = 1 AND is_exclusive = 0")
+        assert sql["ix_orders_pending"].endswith("WHERE status = 'PENDING'")
+
+    def test_downgrade_to_base(self, empty_engine):
+        """Test every revision can be undone."""
+        with empty_engine.connect() as connection:
+            upgrade(connection)
+        with empty_engine.connect() as connection:
+            command.downgrade(alembic_config(connection), "base")
+
+        with empty_engine.connect() as connection:
+            assert inspect(connection).get_table_names() == ["alembic_version"]
+
+    def test_check_schema(self, empty_engine):
+        """Test startup refuses a database behind the head and accepts one at it."""
+        with pytest.raises(RuntimeError, match="app.cli migrate"):
+            check_schema(empty_engine)
+
+        with empty_engine.connect() as connection:
+            upgrade(connection, "20261019_add_missing_indexes")
+        with pytest.raises(RuntimeError, match="20261019_add_missing_indexes"):
+            check_schema(empty_engine)
+
+        with empty_engine.connect() as connection:
+            upgrade(connection)
+        check_schema(empty_engine)
+
+    def test_adopt_create_all_database(self, empty_engine):
+        """Test a database built by the old startup create_all is checked, stamped and upgraded to head."""
+        build_pre_chain_database(empty_engine)
+        with empty_engine.connect() as connection:
+            assert unversioned_tables(connection)
+            assert missing_from_baseline(connection) == []
+        with empty_engine.connect() as connection:
+            stamp(connection, STAMP_BASELINE)
+        with empty_engine.connect() as connection:
+            upgrade(connection)
+
+        check_schema(empty_engine)
+        with empty_engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={"compare_type": True})
+            assert compare_metadata(context, Base.metadata) == []
+
+    def test_adopt_refuses_incomplete_database(self, empty_engine):
+        """Test a database missing part of the baseline schema is reported, not stamped."""
+        build_pre_chain_database(empty_engine)
+        with empty_engine.begin() as connection:
+            connection.execute(text("ALTER TABLE users DROP COLUMN reset_token_expires"))
+
+        with empty_engine.connect() as connection:
+            assert missing_from_baseline(connection) == ["users.reset_token_expires"]
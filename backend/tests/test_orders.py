@@ -5,6 +5,8 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from app.models import OrderStatus
+from app.db.query_budget import query_budget
+from app.services.payment import resolve_active_secret_key
 
 
 @pytest.mark.orders
@@ -507,3 +509,152 @@ class TestGetOrders:
         response = client.get("/api/v1/orders")
         
         assert response.status_code == 403
+
+
+@pytest.fixture
+def three_documents(db):
+    """Three purchasable documents for multi-item orders."""
+    from app.models import Content, ContentType, ContentCategory
+
+    documents = [
+        Content(
+            title=f"Budget Document {i}",
+            content_type=ContentType.DOCUMENT,
+            category=ContentCategory.RESEARCH_PAPER,
+            price=1000.0,
+            is_exclusive=False,
+            is_active=True,
+            file_url=f"/uploads/budget-{i}.pdf",
+        )
+        for i in range(3)
+    ]
+    db.add_all(documents)
+    db.commit()
+    return documents
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestOrderQueryBudgets:
+    """Lock in the number of SQL statements per order endpoint."""
+
+    def test_create_order_query_budget(self, client: TestClient, user_token, three_documents):
+        """Test creating a three-item order fetches content once and inserts items in bulk."""
+        payload = {"items": [{"content_id": c.id, "quantity": 1} for c in three_documents]}
+
+        with query_budget(6, max_repeats=1):
+            response = client.post(
+                "/api/v1/orders",
+                headers={"Authorization": f"Bearer {user_token}"},
+                json=payload,
+            )
+        assert response.status_code == 201
+        assert len(response.json()["items"]) == 3
+
+    def test_large_mixed_cart_constant_queries(self, client: TestClient, user_token, db):
+        """Test a 25-line cart with physical items costs the same as a small one."""
+        from app.models import Content, ContentType, ContentCategory
+
+        contents = [
+            Content(
+                title=f"Cart Item {i}",
+                content_type=ContentType.PHYSICAL if i % 2 else ContentType.DOCUMENT,
+                category=ContentCategory.STATIONERY if i % 2 else ContentCategory.RESEARCH_PAPER,
+                price=150.5,
+                is_exclusive=False,
+                is_active=True,
+                stock_quantity=5 if i % 2 else None,
+            )
+            for i in range(25)
+        ]
+        db.add_all(contents)
+        db.commit()
+        payload = {"items": [{"content_id": c.id, "quantity": 2} for c in contents]}
+
+        # Content fetch, locked stock read and held-stock sum, then the inserts
+        # (order, items, reservations) and reload.
+        with query_budget(9, max_repeats=1):
+            response = client.post(
+                "/api/v1/orders",
+                headers={"Authorization": f"Bearer {user_token}"},
+                json=payload,
+            )
+        assert response.status_code == 201
+        assert len(response.json()["items"]) == 25
+
+    @patch('app.services.payment.paystack_service.verify_transaction')
+    def test_verify_payment_query_budget(self, mock_verify, client: TestClient, user_token, test_user, three_documents, db):
+        """Test verifying a three-item order stays within its statement budget."""
+        from app.models import Order, OrderItem
+
+        order = Order(
+            user_id=test_user.id,
+            total_amount=3000.0,
+            status=OrderStatus.PENDING,
+            payment_reference="CIBN-budget-verify",
+        )
+        db.add(order)
+        db.flush()
+        db.add_all([
+            OrderItem(order_id=order.id, content_id=c.id, quantity=1, price_at_purchase=c.price)
+            for c in three_documents
+        ])
+        db.commit()
+        mock_verify.return_value = {"status": "success", "channel": "card"}
+        reference = order.payment_reference
+        resolve_active_secret_key(db)  # warm the settings cache, as after the first payment
+
+        # User and order, then claim, line read and one purchase insert; the
+        # Paystack key comes from the settings cache.
+        with query_budget(5, max_repeats=1):
+            response = client.post(
+                f"/api/v1/orders/verify-payment/{reference}",
+                headers={"Authorization": f"Bearer {user_token}"}
+            )
+        assert response.status_code == 200
+
+    def test_webhook_fulfillment_query_budget(self, test_user, three_documents, test_physical_content, db):
+        """Test webhook fulfillment of a mixed order is a fixed set of set-based statements."""
+        from app.models import Order, OrderItem
+        from app.services.orders import order_service
+
+        order = Order(
+            user_id=test_user.id,
+            total_amount=6000.0,
+            status=OrderStatus.PENDING,
+            payment_reference="CIBN-budget-webhook",
+        )
+        db.add(order)
+        db.flush()
+        db.add_all(
+            [OrderItem(order_id=order.id, content_id=c.id, quantity=1, price_at_purchase=c.price) for c in three_documents]
+            + [OrderItem(order_id=order.id, content_id=test_physical_content.id, quantity=2, price_at_purchase=3000.0)]
+        )
+        db.commit()
+        db.expire_all()
+
+        # Order lookup, claim, line read, purchase insert, stock and hold read, stock update, hold release.
+        with query_budget(7, max_repeats=1):
+            assert order_service.confirm_order_from_webhook(db, "CIBN-budget-webhook", None)
+
+    def test_get_specific_order_query_budget(self, client: TestClient, user_token, test_user, three_documents, db):
+        """Test reading one order is a constant number of statements with no repeats."""
+        from app.models import Order, OrderItem
+
+        order = Order(user_id=test_user.id, total_amount=3000.0, status=OrderStatus.PENDING)
+        db.add(order)
+        db.flush()
+        db.add_all([
+            OrderItem(order_id=order.id, content_id=c.id, quantity=1, price_at_purchase=c.price)
+            for c in three_documents
+        ])
+        db.commit()
+        order_id = order.id
+
+        with query_budget(3, max_repeats=1):
+            response = client.get(
+                f"/api/v1/orders/{order_id}",
+                headers={"Authorization": f"Bearer {user_token}"}
+            )
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 3
@@ -1,9 +1,21 @@
 """
 Advanced tests for order management functionality.
 """
+import asyncio
+import threading
+from decimal import Decimal
+
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from app.models import Content, ContentType, ContentCategory, Order, OrderItem, OrderStatus
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.session import Base
+from app.models import Content, ContentType, ContentCategory, Order, OrderItem, OrderStatus, User
+from app.schemas import OrderCreate
+from app.services.orders import calculate_order_total, order_service
 
 
 @pytest.mark.orders
@@ -582,3 +594,114 @@ class TestOrdersAdvanced:
         assert response.status_code == 200
         order_data = response.json()
         assert order_data["status"] == "pending"
+
+
+@pytest.mark.orders
+@pytest.mark.unit
+class TestOrderTotals:
+    """Tests for the decimal order total calculation."""
+
+    def test_total_rounds_half_up_to_kobo(self):
+        """Test VAT and fee are rounded to the kobo without float drift."""
+        # 1000 + 75 VAT = 1075; fee 1.5% = 16.125 -> 16.13
+        assert calculate_order_total(Decimal("1000.00")) == Decimal("1091.13")
+
+    def test_flat_fee_and_cap(self):
+        """Test the flat fee applies from NGN 2500 and the fee is capped at NGN 2000."""
+        # 3000 + 225 VAT = 3225; fee 48.375 + 100 = 148.38
+        assert calculate_order_total(Decimal("3000.00")) == Decimal("3373.38")
+        assert calculate_order_total(Decimal("1000000.00")) == Decimal("1077000.00")
+
+    def test_empty_order_is_free(self):
+        """Test an order without items totals zero."""
+        assert calculate_order_total(Decimal("0.00")) == Decimal("0.00")
+
+
+@pytest.fixture
+def contended_stock(tmp_path):
+    """A file database holding one buyer and a physical item with 3 units.
+
+    SQLite has no row locks, so every transaction on this database starts with
+    BEGIN IMMEDIATE: checkouts serialize the way SELECT ... FOR UPDATE
+    serializes them on PostgreSQL.
+    """
+    path = tmp_path / "concurrency.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(email="buyer@example.com", hashed_password="x", full_name="Buyer")
+        ).inserted_primary_key[0]
+        content_id = conn.execute(
+            Content.__table__.insert().values(
+                title="Last Souvenirs",
+                content_type=ContentType.PHYSICAL,
+                category=ContentCategory.SOUVENIR,
+                price=2500.0,
+                is_active=True,
+                stock_quantity=3,
+            )
+        ).inserted_primary_key[0]
+    yield f"sqlite+aiosqlite:///{path}", user_id, content_id
+    engine.dispose()
+
+
+def _serialized_async_engine(url: str):
+    engine = create_async_engine(url, poolclass=NullPool, connect_args={"timeout": 30})
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestOrderConcurrency:
+    """Concurrent checkouts competing for the same physical stock."""
+
+    def test_concurrent_checkouts_do_not_oversell(self, contended_stock):
+        """Test eight simultaneous one-unit orders for three units: exactly three succeed."""
+        url, user_id, content_id = contended_stock
+        buyers = 8
+        barrier = threading.Barrier(buyers)
+        outcomes: list = []
+
+        async def checkout():
+            engine = _serialized_async_engine(url)
+            sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            try:
+                async with sessions() as db:
+                    user = await db.get(User, user_id)
+                    await db.commit()  # release the write lock before lining up
+                    barrier.wait()
+                    order_data = OrderCreate(items=[{"content_id": content_id, "quantity": 1}])
+                    try:
+                        await order_service.create_order(db, user, order_data)
+                        outcomes.append("created")
+                    except HTTPException as exc:
+                        outcomes.append(exc.status_code)
+            finally:
+                await engine.dispose()
+
+        threads = [threading.Thread(target=asyncio.run, args=(checkout(),)) for _ in range(buyers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert outcomes.count("created") == 3
+        assert outcomes.count(400) == buyers - 3
+
+        engine = create_engine(url.replace("+aiosqlite", ""))
+        with engine.connect() as conn:
+            held = conn.scalar(select(func.sum(OrderItem.quantity)).where(OrderItem.content_id == content_id))
+            stock = conn.scalar(select(Content.stock_quantity).where(Content.id == content_id))
+        engine.dispose()
+        assert held == 3
+        assert stock == 3  # stock itself only moves when payment is confirmed
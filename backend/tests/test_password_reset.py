@@ -5,8 +5,9 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
+from jinja2 import TemplateError
 
-from app.models import User
+from app.models import EmailOutbox, User
 
 
 @pytest.mark.auth
@@ -33,10 +34,11 @@ class TestForgotPassword:
             assert test_user.reset_token_expires is not None
             assert test_user.reset_token_expires > datetime.utcnow()
             
-            # Verify email was sent
-            assert mock_send.called
-            call_args = mock_send.call_args
-            assert test_user.email in str(call_args)
+            # Verify the reset email was queued, not sent inside the request
+            assert not mock_send.called
+            queued = db.query(EmailOutbox).one()
+            assert queued.to_email == test_user.email
+            assert test_user.reset_token in queued.html_content
     
     def test_forgot_password_nonexistent_user(self, client: TestClient):
         """Test forgot password with nonexistent email (should still return success)."""
@@ -167,8 +169,8 @@ class TestResetPassword:
 class TestWelcomeEmail:
     """Tests for welcome email on registration."""
     
-    def test_registration_sends_welcome_email(self, client: TestClient):
-        """Test that registration sends welcome email."""
+    def test_registration_sends_welcome_email(self, client: TestClient, db):
+        """Test that registration queues a welcome email."""
         with patch('app.services.email.send_email') as mock_send:
             mock_send.return_value = True
             
@@ -184,11 +186,11 @@ class TestWelcomeEmail:
             
             assert response.status_code == 201
             
-            # Verify welcome email was sent
-            assert mock_send.called
-            call_args = mock_send.call_args
-            assert "newuser123@example.com" in str(call_args)
-            assert "Welcome" in str(call_args)
+            # Verify the welcome email was queued for the outbox sender
+            assert not mock_send.called
+            queued = db.query(EmailOutbox).one()
+            assert queued.to_email == "newuser123@example.com"
+            assert "Welcome" in queued.subject
     
     def test_registration_succeeds_even_if_email_fails(self, client: TestClient):
         """Test that registration succeeds even if welcome email fails."""
@@ -210,6 +212,23 @@ class TestWelcomeEmail:
             data = response.json()
             assert data["email"] == "newuser456@example.com"
 
+    def test_registration_succeeds_even_if_email_cannot_be_rendered(self, client: TestClient, db):
+        """Test a template error is logged and the user is still created, in one commit."""
+        with patch('app.api.routes.auth.welcome_email_content', side_effect=TemplateError("broken")):
+            response = client.post(
+                "/api/v1/auth/register",
+                json={
+                    "email": "newuser789@example.com",
+                    "password": "TestPass789!",
+                    "full_name": "Third Test User",
+                    "role": "subscriber"
+                }
+            )
+        
+        assert response.status_code == 201
+        assert db.query(User).filter(User.email == "newuser789@example.com").count() == 1
+        assert db.query(EmailOutbox).count() == 0
+
 
 @pytest.mark.integration
 class TestEmailService:
@@ -0,0 +1,150 @@
+"""
+Tests for the shared Paystack HTTP client.
+
+Paystack is replaced by an ``httpx.MockTransport`` injected into the
+service, so the real client code (pooling, timeouts, retries and error
+mapping) runs without network access.
+"""
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.http import backoff_delay
+from app.services.payment import PaystackService
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "PAYSTACK_RETRY_BACKOFF", 0.0)
+    monkeypatch.setattr(settings, "PAYSTACK_MAX_RETRIES", 2)
+
+
+def paystack(handler) -> PaystackService:
+    return PaystackService(transport=httpx.MockTransport(handler))
+
+
+def verified(request: httpx.Request) -> httpx.Response:
+    reference = request.url.path.rsplit("/", 1)[-1]
+    return httpx.Response(200, json={"status": True, "data": {"status": "success", "reference": reference}})
+
+
+@pytest.mark.unit
+class TestPaystackClient:
+    """Tests for client reuse, deadlines and retries."""
+
+    async def test_client_reused_across_calls(self):
+        """Test every call goes through the one pooled client."""
+        service = paystack(verified)
+        client = service.client
+        try:
+            await service.verify_transaction("REF-1", secret_key_override="sk_test")
+            await service.verify_transaction("REF-2", secret_key_override="sk_test")
+            assert service.client is client
+        finally:
+            await service.aclose()
+        assert client.is_closed
+
+    async def test_explicit_timeouts_and_limits(self):
+        """Test the client carries the configured connect/read deadlines."""
+        service = paystack(verified)
+        try:
+            timeout = service.client.timeout
+            assert timeout.connect == settings.PAYSTACK_CONNECT_TIMEOUT
+            assert timeout.read == settings.PAYSTACK_READ_TIMEOUT
+            assert str(service.client.base_url).rstrip("/") == PaystackService.BASE_URL
+        finally:
+            await service.aclose()
+
+    async def test_verify_retries_gateway_errors(self):
+        """Test verify retries a 503 and then returns the successful result."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            return verified(request)
+
+        service = paystack(handler)
+        try:
+            data = await service.verify_transaction("REF-3", secret_key_override="sk_test")
+        finally:
+            await service.aclose()
+
+        assert data == {"status": "success", "reference": "REF-3"}
+        assert len(calls) == 2
+        assert calls[0].headers["authorization"] == "Bearer sk_test"
+
+    async def test_verify_retries_read_timeouts_then_gives_up(self):
+        """Test a verify that keeps timing out surfaces as 503 after the retry budget."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        service = paystack(handler)
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await service.verify_transaction("REF-4")
+        finally:
+            await service.aclose()
+
+        assert exc_info.value.status_code == 503
+        assert len(calls) == settings.PAYSTACK_MAX_RETRIES + 1
+
+    async def test_initialize_not_retried_after_read_timeout(self):
+        """Test initialize does not resend a request that may have reached Paystack."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        service = paystack(handler)
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await service.initialize_transaction("a@example.com", 1000.0, "REF-5")
+        finally:
+            await service.aclose()
+
+        assert exc_info.value.status_code == 503
+        assert len(calls) == 1
+
+    async def test_initialize_retries_connect_errors(self):
+        """Test initialize retries when the connection was never made."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"status": True, "data": {"authorization_url": "https://pay"}})
+
+        service = paystack(handler)
+        try:
+            data = await service.initialize_transaction("a@example.com", 1000.5, "REF-6")
+        finally:
+            await service.aclose()
+
+        assert data == {"authorization_url": "https://pay"}
+        assert len(calls) == 2
+        assert b'"amount":100050' in calls[-1].content.replace(b" ", b"")
+
+    async def test_initialize_unauthorized_maps_to_bad_gateway(self):
+        """Test a Paystack 401 is reported as 502, not passed through to the user."""
+        service = paystack(lambda request: httpx.Response(401, json={"status": False}))
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await service.initialize_transaction("a@example.com", 1000.0, "REF-7")
+        finally:
+            await service.aclose()
+
+        assert exc_info.value.status_code == 502
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test backoff delays stay within the exponential envelope and the cap."""
+        delays = [backoff_delay(attempt, 0.25, cap=1.0) for attempt in range(6) for _ in range(20)]
+        assert all(0 <= delay <= 1.0 for delay in delays)
+        assert len(set(delays)) > 1
@@ -0,0 +1,285 @@
+"""
+Tests for playback progress heartbeats and the write-behind buffer.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.db.query_budget import query_budget
+from app.models import Content, ContentCategory, ContentProgress, ContentType
+from app.schemas.content_progress import ProgressHeartbeat
+from app.services import progress
+from app.services.progress import ProgressBuffer, content_ids, progress_buffer
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    content_ids.clear()
+    progress_buffer.clear()
+    yield
+    progress_buffer.clear()
+
+
+def heartbeat(client, token, *updates):
+    return client.post(
+        "/api/v1/progress/heartbeat",
+        json={"updates": list(updates)},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def state(content_id, position, duration=600.0):
+    return {
+        "content_id": content_id,
+        "playback_position": position,
+        "total_duration": duration,
+        "progress_percentage": position / duration * 100,
+        "is_completed": position / duration >= 0.95,
+    }
+
+
+@pytest.mark.integration
+class TestProgressHeartbeat:
+    """Tests for the batched progress ingestion endpoint."""
+
+    def test_upserts_latest_state(self, client: TestClient, db, test_user, user_token, test_content_public, test_content_exclusive):
+        """Test a batch creates rows, keeps the last state per item, and later heartbeats update in place."""
+        response = heartbeat(
+            client, user_token,
+            state(test_content_public.id, 10), state(test_content_exclusive.id, 30), state(test_content_public.id, 20),
+        )
+        assert response.status_code == 204
+
+        assert heartbeat(client, user_token, state(test_content_exclusive.id, 590)).status_code == 204
+        assert progress_buffer.flush(db) == 2
+
+        rows = {p.content_id: p for p in db.query(ContentProgress).filter(ContentProgress.user_id == test_user.id)}
+        assert len(rows) == 2
+        assert rows[test_content_public.id].playback_position == 20
+        assert rows[test_content_exclusive.id].playback_position == 590
+        assert rows[test_content_exclusive.id].is_completed is True
+
+        response = client.get(f"/api/v1/progress/{test_content_public.id}", headers={"Authorization": f"Bearer {user_token}"})
+        assert response.json()["playback_position"] == 20
+
+    def test_unknown_content_rejected(self, client: TestClient, db, user_token, test_content_public):
+        """Test a batch naming missing content is rejected without writing anything."""
+        response = heartbeat(client, user_token, state(test_content_public.id, 10), state(999999, 10))
+
+        assert response.status_code == 404
+        assert "999999" in response.json()["detail"]
+        assert db.query(ContentProgress).count() == 0
+
+    def test_heartbeat_skips_database(self, client: TestClient, user_token, test_content_public):
+        """Test a heartbeat for known content reads only the user and writes nothing."""
+        content_id = test_content_public.id
+        heartbeat(client, user_token, state(content_id, 5))  # caches the content id
+
+        with query_budget(1):
+            assert heartbeat(client, user_token, state(content_id, 10)).status_code == 204
+
+    def test_validation(self, client: TestClient, user_token, test_content_public):
+        """Test empty batches and out-of-range values are rejected."""
+        assert heartbeat(client, user_token).status_code == 422
+        bad = state(test_content_public.id, 10)
+        bad["progress_percentage"] = 140
+        assert heartbeat(client, user_token, bad).status_code == 422
+
+
+@pytest.mark.integration
+class TestProgressBuffer:
+    """Tests for buffering progress in memory and flushing it in bulk."""
+
+    def test_one_row_per_item_per_flush(self, client: TestClient, db, test_user, user_token, test_content_public, test_content_exclusive):
+        """Test many heartbeats become one upsert writing the newest state of each item."""
+        for position in range(1, 31):
+            heartbeat(client, user_token, state(test_content_public.id, position), state(test_content_exclusive.id, position * 2))
+        assert db.query(ContentProgress).count() == 0
+
+        with query_budget(1):
+            assert progress_buffer.flush(db) == 2
+        rows = {p.content_id: p.playback_position for p in db.query(ContentProgress)}
+        assert rows == {test_content_public.id: 30, test_content_exclusive.id: 60}
+        assert progress_buffer.flush(db) == 0
+
+    def test_reads_served_from_buffer(self, client: TestClient, db, user_token, test_content_public, test_content_exclusive):
+        """Test single and list reads return buffered states over older stored rows."""
+        headers = {"Authorization": f"Bearer {user_token}"}
+        heartbeat(client, user_token, state(test_content_public.id, 10))
+        progress_buffer.flush(db)
+        heartbeat(client, user_token, state(test_content_public.id, 40), state(test_content_exclusive.id, 5))
+
+        with query_budget(1):
+            response = client.get(f"/api/v1/progress/{test_content_public.id}", headers=headers)
+        assert response.json()["playback_position"] == 40
+
+        listed = {p["content_id"]: p for p in client.get("/api/v1/progress/", headers=headers).json()}
+        assert listed[test_content_public.id]["playback_position"] == 40
+        assert listed[test_content_public.id]["id"] is not None
+        assert (listed[test_content_exclusive.id]["playback_position"], listed[test_content_exclusive.id]["id"]) == (5, None)
+
+    def test_stale_flush_does_not_overwrite(self, db, test_user, test_content_public):
+        """Test a flush carrying an older state leaves a more recently watched row alone."""
+        db.add(ContentProgress(
+            user_id=test_user.id, content_id=test_content_public.id, playback_position=300,
+            progress_percentage=50, last_watched=datetime.utcnow() + timedelta(minutes=1),
+        ))
+        db.commit()
+        buffer = ProgressBuffer()
+        buffer.record(test_user.id, [ProgressHeartbeat(**state(test_content_public.id, 100))])
+
+        buffer.flush(db)
+        db.expire_all()
+        assert db.query(ContentProgress).one().playback_position == 300
+
+    def test_update_applies_over_buffered_state(self, client: TestClient, db, user_token, test_content_public):
+        """Test PATCH writes the buffered state with its changes, and the buffer forgets it."""
+        heartbeat(client, user_token, state(test_content_public.id, 120))
+
+        response = client.patch(
+            f"/api/v1/progress/{test_content_public.id}",
+            json={"is_completed": True},
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 200
+        assert (response.json()["playback_position"], response.json()["is_completed"]) == (120, True)
+        assert len(progress_buffer) == 0
+
+    def test_failed_flush_keeps_states_within_bound(self, db, test_user, test_content_public, test_content_exclusive):
+        """Test states survive a failed flush, newer states win, and the buffer never outgrows its bound."""
+        buffer = ProgressBuffer(max_entries=2)
+        buffer.record(test_user.id, [ProgressHeartbeat(**state(test_content_public.id, 10)), ProgressHeartbeat(**state(test_content_exclusive.id, 10))])
+
+        def record_during_flush(*args):
+            buffer.record(test_user.id, [ProgressHeartbeat(**state(test_content_public.id, 20)), ProgressHeartbeat(**state(999, 1))])
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+
+        with patch("app.services.progress.upsert_progress", side_effect=record_during_flush):
+            with pytest.raises(OperationalError):
+                buffer.flush(db)
+
+        assert len(buffer) == 2
+        assert buffer.get(test_user.id, test_content_public.id).playback_position == 20
+        assert buffer.get(test_user.id, test_content_exclusive.id) is None
+
+    def test_full_buffer_flushed_by_request(self, client: TestClient, db, user_token, test_content_public, test_content_exclusive, monkeypatch):
+        """Test the request that fills the buffer writes it out."""
+        monkeypatch.setattr(progress_buffer, "max_entries", 2)
+        heartbeat(client, user_token, state(test_content_public.id, 10))
+        assert db.query(ContentProgress).count() == 0
+
+        heartbeat(client, user_token, state(test_content_exclusive.id, 10))
+        assert db.query(ContentProgress).count() == 2
+        assert len(progress_buffer) == 0
+
+    def test_flush_skips_deleted_content(self, db, test_user, test_content_public, test_content_exclusive):
+        """Test content deleted while its progress was buffered does not block the other rows."""
+        buffer = ProgressBuffer()
+        buffer.record(test_user.id, [ProgressHeartbeat(**state(test_content_public.id, 10)), ProgressHeartbeat(**state(test_content_exclusive.id, 10))])
+        deleted_id = test_content_exclusive.id
+        db.delete(test_content_exclusive)
+        db.commit()
+        write = progress.upsert_progress
+
+        def foreign_key_violation(db, rows):
+            # SQLite here does not enforce foreign keys; PostgreSQL rejects the batch
+            if any(row["content_id"] == deleted_id for row in rows):
+                raise IntegrityError("INSERT", {}, Exception("violates foreign key constraint"))
+            write(db, rows)
+
+        with patch("app.services.progress.upsert_progress", side_effect=foreign_key_violation):
+            assert buffer.flush(db) == 1
+        assert db.query(ContentProgress).one().content_id == test_content_public.id
+
+    def test_pop_during_flush_not_written_back(self, db, test_user, test_content_public, test_content_exclusive):
+        """Test a state a request takes while the flush is writing is not left in the table."""
+        buffer = ProgressBuffer()
+        buffer.record(test_user.id, [ProgressHeartbeat(**state(test_content_public.id, 10)), ProgressHeartbeat(**state(test_content_exclusive.id, 10))])
+        write = progress.upsert_progress
+        popped = []
+
+        def delete_mid_write(db, rows):
+            # DELETE /progress/{id} arrives after the rows were built
+            popped.append(buffer.pop(test_user.id, test_content_public.id))
+            write(db, rows)
+
+        with patch("app.services.progress.upsert_progress", side_effect=delete_mid_write):
+            buffer.flush(db)
+
+        assert popped[0].playback_position == 10
+        assert db.query(ContentProgress).one().content_id == test_content_exclusive.id
+        assert buffer.pop(test_user.id, test_content_public.id) is None
+
+
+def make_videos(db, count):
+    videos = [
+        Content(title=f"Lecture {i}", content_type=ContentType.VIDEO, category=ContentCategory.EXAM_TEXT, price=0)
+        for i in range(count)
+    ]
+    db.add_all(videos)
+    db.commit()
+    return videos
+
+
+def watched(db, user, content, minutes_ago, percentage=50.0):
+    db.add(ContentProgress(
+        user_id=user.id, content_id=content.id, playback_position=percentage * 6, total_duration=600,
+        progress_percentage=percentage, is_completed=percentage >= 95,
+        last_watched=datetime.utcnow() - timedelta(minutes=minutes_ago),
+    ))
+    db.commit()
+
+
+@pytest.mark.integration
+class TestContinueWatching:
+    """Tests for the resume rail endpoint."""
+
+    def test_recent_unfinished_with_content(self, client: TestClient, db, test_user, user_token):
+        """Test unfinished items come newest first with their content, in one query."""
+        videos = make_videos(db, 5)
+        for minutes_ago, video in zip((30, 10, 20, 5, 1), videos):
+            watched(db, test_user, video, minutes_ago)
+        watched(db, test_user, make_videos(db, 1)[0], 0, percentage=100)
+        videos[4].is_active = False
+        db.commit()
+        ids = [v.id for v in videos]
+
+        with query_budget(2):
+            response = client.get("/api/v1/progress/continue?limit=3", headers={"Authorization": f"Bearer {user_token}"})
+
+        assert response.status_code == 200
+        items = response.json()
+        assert [item["content"]["id"] for item in items] == [ids[3], ids[1], ids[2]]
+        assert items[0]["content"]["title"] == "Lecture 3"
+        assert items[0]["content"]["content_type"] == "video"
+        assert items[0]["progress_percentage"] == 50
+
+    def test_buffered_states_merged(self, client: TestClient, db, test_user, user_token):
+        """Test states not yet flushed move items up, add new ones, and drop finished ones."""
+        videos = make_videos(db, 3)
+        watched(db, test_user, videos[0], 10)
+        watched(db, test_user, videos[1], 5)
+        heartbeat(client, user_token, state(videos[2].id, 60))
+        heartbeat(client, user_token, state(videos[1].id, 600))  # finished
+        heartbeat(client, user_token, state(videos[0].id, 300))
+
+        response = client.get("/api/v1/progress/continue", headers={"Authorization": f"Bearer {user_token}"})
+
+        items = response.json()
+        assert [item["content"]["id"] for item in items] == [videos[0].id, videos[2].id]
+        assert items[0]["playback_position"] == 300
+
+    def test_served_by_resume_index(self, db, test_user):
+        """Test the query walks ix_content_progress_resume instead of sorting the user's rows."""
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT content_id FROM content_progress "
+            "WHERE user_id = :user_id AND is_completed = 0 ORDER BY last_watched DESC LIMIT 10"
+        ), {"user_id": test_user.id}).all()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_content_progress_resume" in details
+        assert "TEMP B-TREE" not in details
@@ -0,0 +1,92 @@
+"""
+Tests for the query budget guard and N+1 detection.
+"""
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db.query_budget import (
+    QueryBudgetExceeded,
+    QueryInspectionMiddleware,
+    query_budget,
+    record_queries,
+    statement_shape,
+)
+from app.main import app
+from tests.conftest import TestSessionLocal
+
+
+@pytest.mark.unit
+class TestQueryBudget:
+    """Tests for statement recording and budgets."""
+
+    def test_statement_shape_folds_values(self):
+        """Test statements differing only in literals or IN-list length share a shape."""
+        assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+            "SELECT *\n  FROM t WHERE id IN (?)"
+        )
+        assert statement_shape("SELECT 'a', 10") == statement_shape("SELECT 'b', 20")
+
+    def test_within_budget(self, db):
+        """Test a block inside its budget passes and exposes the recording."""
+        with query_budget(2) as recorder:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        assert recorder.count == 2
+
+    def test_budget_exceeded(self, db):
+        """Test exceeding the budget fails with the statements listed."""
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            with query_budget(1):
+                db.execute(text("SELECT 1"))
+                db.execute(text("SELECT 2"))
+        assert "2 > 1" in str(excinfo.value)
+        assert "SELECT 2" in str(excinfo.value)
+
+    def test_repeated_shape_flagged(self, db):
+        """Test the same statement run in a loop is reported as an N+1."""
+        with pytest.raises(QueryBudgetExceeded, match="repeated 3 times"):
+            with query_budget(10, max_repeats=1):
+                for i in range(3):
+                    db.execute(text("SELECT id FROM users WHERE id = :id"), {"id": i})
+
+    def test_records_other_threads(self):
+        """Test statements run by other threads (the app under TestClient) are counted."""
+        import threading
+
+        def work():
+            session = TestSessionLocal()
+            session.execute(text("SELECT 1"))
+            session.close()
+
+        with record_queries() as recorder:
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        assert recorder.count == 1
+
+
+@pytest.mark.integration
+class TestQueryInspectionMiddleware:
+    """Tests for the development N+1 warning."""
+
+    def test_repeated_statements_logged(self, client: TestClient, user_token, test_user, db, caplog):
+        """Test a request that lazy-loads per row is logged as a possible N+1."""
+        from app.models import Order, OrderStatus
+
+        db.add_all([
+            Order(user_id=test_user.id, total_amount=100.0, status=OrderStatus.PENDING)
+            for _ in range(3)
+        ])
+        db.commit()
+
+        inspected = TestClient(QueryInspectionMiddleware(app, max_queries=50, max_repeats=3))
+        with caplog.at_level(logging.WARNING, logger="app.db.query_budget"):
+            response = inspected.get(
+                "/api/v1/orders",
+                headers={"Authorization": f"Bearer {user_token}"},
+            )
+        assert response.status_code == 200
+        assert any("Possible N+1" in record.message for record in caplog.records)
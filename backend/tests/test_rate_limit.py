@@ -0,0 +1,169 @@
+"""
+Tests for auth rate limiting.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import (
+    DatabaseRateLimitStore,
+    MemoryRateLimitStore,
+    RateLimit,
+    rate_limit_purger,
+    rate_limiter,
+    take_token,
+)
+from app.models import RateLimitBucket
+from tests.conftest import TestSessionLocal
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def tight_limits():
+    """Shrink the login/register limits for the duration of a test."""
+    original_limits, original_clock = rate_limiter.limits, rate_limiter.clock
+    clock = FakeClock()
+    rate_limiter.configure({
+        "login": {"ip": "100/minute", "identifier": "3/minute"},
+        "register": {"ip": "2/minute"},
+    })
+    rate_limiter.clock = clock
+    rate_limiter.reset()
+    yield clock
+    rate_limiter.limits, rate_limiter.clock = original_limits, original_clock
+    rate_limiter.reset()
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Tests for the bucket arithmetic and stores."""
+
+    def test_parse(self):
+        """Test '<count>/<period>' parsing."""
+        assert RateLimit.parse("10/minute") == RateLimit(10.0, 10 / 60)
+        with pytest.raises(ValueError):
+            RateLimit.parse("10/fortnight")
+
+    def test_refill(self):
+        """Test an empty bucket refills at the configured rate."""
+        limit = RateLimit.parse("60/minute")
+        allowed, tokens, retry_after = take_token(0.0, 0.0, limit, 0.5)
+        assert not allowed
+        assert retry_after == pytest.approx(0.5)
+        allowed, tokens, _ = take_token(0.0, 0.0, limit, 2.0)
+        assert allowed
+        assert tokens == pytest.approx(1.0)
+
+    def test_memory_store_burst(self):
+        """Test the memory store allows exactly the capacity in a burst."""
+        store = MemoryRateLimitStore()
+        limit = RateLimit.parse("3/minute")
+        results = [store.consume("k", limit, 100.0)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_memory_store_prunes_by_each_buckets_limit(self, monkeypatch):
+        """Test a fast scope crossing the cap drops refilled buckets, not half-drained slow ones."""
+        monkeypatch.setattr(MemoryRateLimitStore, "MAX_KEYS", 4)
+        monkeypatch.setattr(MemoryRateLimitStore, "PRUNE_TO", 4)
+        store = MemoryRateLimitStore()
+        slow, fast = RateLimit.parse("2/hour"), RateLimit.parse("10/second")
+        for key in ("a", "b", "c"):
+            store.consume(key, slow, 100.0)
+        store.consume("f", fast, 100.0)
+        store.consume("g", fast, 110.0)
+
+        assert list(store._buckets) == ["a", "b", "c", "g"]
+        assert store.consume("a", slow, 110.0)[0]
+        assert not store.consume("a", slow, 110.0)[0]
+
+    def test_memory_store_evicts_least_recently_used(self, monkeypatch):
+        """Test the store drops below its cap by evicting the least recently used buckets."""
+        monkeypatch.setattr(MemoryRateLimitStore, "MAX_KEYS", 4)
+        monkeypatch.setattr(MemoryRateLimitStore, "PRUNE_TO", 2)
+        store = MemoryRateLimitStore()
+        slow = RateLimit.parse("2/hour")
+        for key in ("a", "b", "c", "d"):
+            store.consume(key, slow, 100.0)
+        store.consume("a", slow, 101.0)
+        store.consume("e", slow, 102.0)
+
+        assert list(store._buckets) == ["a", "e"]
+
+    def test_database_store_is_shared(self, db):
+        """Test two store instances (workers) draw from the same bucket row."""
+        limit = RateLimit.parse("2/minute")
+        worker_a = DatabaseRateLimitStore(TestSessionLocal)
+        worker_b = DatabaseRateLimitStore(TestSessionLocal)
+        assert worker_a.consume("login:ip:1.2.3.4", limit, 100.0)[0]
+        assert worker_b.consume("login:ip:1.2.3.4", limit, 100.0)[0]
+        allowed, retry_after = worker_a.consume("login:ip:1.2.3.4", limit, 100.0)
+        assert not allowed
+        assert retry_after == pytest.approx(30.0)
+        assert worker_a.purge(older_than=200.0) == 1
+
+    async def test_purger_deletes_idle_buckets(self, db, tight_limits, monkeypatch):
+        """Test the periodic purge drops shared buckets once they have refilled under every limit."""
+        store = DatabaseRateLimitStore(TestSessionLocal)
+        monkeypatch.setattr(rate_limiter, "shared_store", store)
+        store.consume("register:ip:1.2.3.4", RateLimit.parse("2/minute"), tight_limits.now)
+        tight_limits.now += 30
+        store.consume("login:id:a@example.com", RateLimit.parse("3/minute"), tight_limits.now)
+
+        tight_limits.now += 31  # the slowest limit refills in 60s
+        await rate_limit_purger.run_once()
+
+        assert [bucket.key for bucket in db.query(RateLimitBucket).all()] == ["login:id:a@example.com"]
+
+
+@pytest.mark.auth
+@pytest.mark.integration
+class TestAuthThrottling:
+    """Tests for throttling on the auth endpoints."""
+
+    def test_login_throttled_per_identifier(self, client: TestClient, test_user, tight_limits):
+        """Test repeated logins for one email are rejected with Retry-After."""
+        payload = {"email": test_user.email, "password": "wrongpassword"}
+        for _ in range(3):
+            assert client.post("/api/v1/auth/login", json=payload).status_code == 401
+
+        response = client.post("/api/v1/auth/login", json=payload)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) == 20
+
+        # Other identifiers from the same IP are unaffected.
+        other = {"email": "someone@example.com", "password": "wrongpassword"}
+        assert client.post("/api/v1/auth/login", json=other).status_code == 401
+
+    def test_login_allowed_after_refill(self, client: TestClient, test_user, tight_limits):
+        """Test the bucket refills as time passes."""
+        payload = {"email": test_user.email, "password": "testpassword123"}
+        for _ in range(3):
+            client.post("/api/v1/auth/login", json=payload)
+        assert client.post("/api/v1/auth/login", json=payload).status_code == 429
+
+        tight_limits.now += 20
+        assert client.post("/api/v1/auth/login", json=payload).status_code == 200
+
+    def test_register_throttled_per_ip(self, client: TestClient, tight_limits):
+        """Test registration bursts from one IP are throttled before any work."""
+        for i in range(2):
+            response = client.post("/api/v1/auth/register", json={
+                "email": f"new{i}@example.com",
+                "password": "password123",
+                "full_name": "New User",
+            })
+            assert response.status_code == 201
+
+        response = client.post("/api/v1/auth/register", json={
+            "email": "new3@example.com",
+            "password": "password123",
+            "full_name": "New User",
+        })
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
@@ -0,0 +1,175 @@
+"""
+Tests for the pending-payment reconciler.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.core.background import PeriodicTask
+from app.models import JobCheckpoint, Order, OrderItem, OrderStatus, Purchase
+from app.services.checkpoints import acquire_lease
+from app.services.payment import paystack_service
+from app.services.reconciliation import CHECKPOINT, reconcile_pending_payments
+from tests.conftest import TestAsyncSessionLocal
+
+
+@pytest.fixture
+async def paystack():
+    """Paystack stand-in: maps references to transaction data and records calls."""
+    state = {"transactions": {}, "calls": [], "in_flight": 0, "max_in_flight": 0, "fail_on": None}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        reference = request.url.path.rsplit("/", 1)[-1]
+        if reference == state["fail_on"]:
+            raise RuntimeError("worker killed")
+        state["calls"].append(reference)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        data = state["transactions"].get(reference)
+        if data is None:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"status": True, "data": {"reference": reference, **data}})
+
+    await paystack_service.use_transport(httpx.MockTransport(handler))
+    yield state
+    await paystack_service.use_transport(None)
+
+
+def make_order(db, user, content, reference, age, total=1000.0):
+    order = Order(
+        user_id=user.id,
+        total_amount=total,
+        status=OrderStatus.PENDING,
+        payment_reference=reference,
+        created_at=datetime.utcnow() - age,
+    )
+    db.add(order)
+    db.flush()
+    db.add(OrderItem(order_id=order.id, content_id=content.id, quantity=1, price_at_purchase=content.price))
+    db.commit()
+    return order.id
+
+
+def statuses(db, *order_ids):
+    db.expire_all()
+    return [db.get(Order, order_id).status for order_id in order_ids]
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestPaymentReconciler:
+    """Tests for settling pending orders against Paystack."""
+
+    async def test_settles_pending_orders(self, paystack, db, test_user, test_content_public):
+        """Test paid orders are fulfilled, failed and stale ones cancelled, the rest left pending."""
+        hour, day = timedelta(hours=1), timedelta(days=2)
+        paid = make_order(db, test_user, test_content_public, "REF-PAID", hour)
+        failed = make_order(db, test_user, test_content_public, "REF-FAILED", hour)
+        waiting = make_order(db, test_user, test_content_public, "REF-WAITING", hour)
+        abandoned = make_order(db, test_user, test_content_public, "REF-ABANDONED", day)
+        never_paid = make_order(db, test_user, test_content_public, None, day)
+        too_new = make_order(db, test_user, test_content_public, "REF-NEW", timedelta(minutes=1))
+        paystack["transactions"].update({
+            "REF-PAID": {"status": "success", "amount": 100000, "channel": "card"},
+            "REF-FAILED": {"status": "failed"},
+            "REF-WAITING": {"status": "ongoing"},
+            "REF-ABANDONED": {"status": "abandoned"},
+            "REF-NEW": {"status": "success", "amount": 100000},
+        })
+
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal)
+
+        assert stats == {"fulfilled": 1, "cancelled": 1, "pending": 1, "expired": 2}
+        assert statuses(db, paid, failed, waiting, abandoned, never_paid, too_new) == [
+            OrderStatus.COMPLETED, OrderStatus.CANCELLED, OrderStatus.PENDING,
+            OrderStatus.CANCELLED, OrderStatus.CANCELLED, OrderStatus.PENDING,
+        ]
+        assert db.query(Purchase).filter(Purchase.order_id == paid).count() == 1
+        assert db.get(Order, paid).payment_method == "card"
+        assert "REF-NEW" not in paystack["calls"]
+
+    async def test_underpaid_order_cancelled(self, paystack, db, test_user, test_content_public):
+        """Test a successful transaction for the wrong amount does not fulfill the order."""
+        order_id = make_order(db, test_user, test_content_public, "REF-SHORT", timedelta(hours=1))
+        paystack["transactions"]["REF-SHORT"] = {"status": "success", "amount": 100}
+
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal)
+
+        assert stats == {"cancelled": 1}
+        assert statuses(db, order_id) == [OrderStatus.CANCELLED]
+        assert db.query(Purchase).count() == 0
+
+    async def test_unverifiable_orders_left_for_next_pass(self, paystack, db, test_user, test_content_public):
+        """Test a Paystack outage leaves even stale orders pending."""
+        order_id = make_order(db, test_user, test_content_public, "REF-DOWN", timedelta(days=2))
+
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal)
+
+        assert stats == {"unverified": 1}
+        assert statuses(db, order_id) == [OrderStatus.PENDING]
+
+    async def test_bounded_concurrency(self, paystack, db, test_user, test_content_public):
+        """Test no more than ``concurrency`` verify calls are in flight."""
+        for i in range(8):
+            make_order(db, test_user, test_content_public, f"REF-{i}", timedelta(hours=1))
+            paystack["transactions"][f"REF-{i}"] = {"status": "ongoing"}
+
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal, batch_size=8, concurrency=3)
+
+        assert stats == {"pending": 8}
+        assert paystack["max_in_flight"] == 3
+
+    async def test_resumes_from_checkpoint(self, paystack, db, test_user, test_content_public):
+        """Test a pass that dies mid-way resumes after the last committed batch."""
+        order_ids = [
+            make_order(db, test_user, test_content_public, f"REF-{i}", timedelta(hours=1)) for i in range(4)
+        ]
+        for i in range(4):
+            paystack["transactions"][f"REF-{i}"] = {"status": "success", "amount": 100000}
+        paystack["fail_on"] = "REF-2"
+
+        with pytest.raises(RuntimeError):
+            await reconcile_pending_payments(TestAsyncSessionLocal, batch_size=2)
+        assert statuses(db, *order_ids) == [OrderStatus.COMPLETED] * 2 + [OrderStatus.PENDING] * 2
+        checkpoint = db.get(JobCheckpoint, CHECKPOINT)
+        assert checkpoint.position == order_ids[1]
+        assert checkpoint.lease_until is None
+
+        paystack["fail_on"] = None
+        paystack["calls"].clear()
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal, batch_size=2)
+
+        assert stats == {"fulfilled": 2}
+        assert paystack["calls"] == ["REF-2", "REF-3"]
+        db.expire_all()
+        assert db.get(JobCheckpoint, CHECKPOINT).position == 0
+
+    async def test_skips_while_another_worker_holds_lease(self, paystack, db, test_user, test_content_public):
+        """Test only the worker holding the lease reconciles."""
+        order_id = make_order(db, test_user, test_content_public, "REF-PAID", timedelta(hours=1))
+        paystack["transactions"]["REF-PAID"] = {"status": "success", "amount": 100000}
+        assert acquire_lease(db, CHECKPOINT, lease_seconds=600) == 0
+
+        stats = await reconcile_pending_payments(TestAsyncSessionLocal)
+
+        assert stats == {}
+        assert paystack["calls"] == []
+        assert statuses(db, order_id) == [OrderStatus.PENDING]
+
+    async def test_periodic_task_awaits_coroutines(self):
+        """Test the scheduler runs coroutine functions on the event loop."""
+        calls = []
+
+        async def job():
+            calls.append(asyncio.get_running_loop())
+
+        task = PeriodicTask("test-async-job", interval=0.01, func=job, jitter=0)
+        task.start()
+        await asyncio.sleep(0.05)
+        task.stop()
+
+        assert calls and all(loop is asyncio.get_running_loop() for loop in calls)
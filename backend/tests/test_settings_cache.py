@@ -0,0 +1,124 @@
+"""
+Tests for the versioned Admin Settings cache.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes.upload import load_upload_limits
+from app.db.query_budget import record_queries
+from app.models import EmailSettings, PaymentSettings
+from app.services.email import get_email_config
+from app.services.payment import resolve_active_secret_key
+from app.services.settings_cache import PAYMENT, UPLOAD, SettingsCache, settings_cache
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture
+def payment_row(db):
+    db.add(PaymentSettings(active_mode="test", test_secret_key="sk_test_one"))
+    db.commit()
+
+
+@pytest.mark.unit
+class TestSettingsCache:
+    """Tests for cached reads and version-based invalidation."""
+
+    def test_hot_path_reads_from_memory(self, db, payment_row):
+        """Test the secret key is loaded once and then served without queries."""
+        assert resolve_active_secret_key(db) == "sk_test_one"
+        with record_queries() as recorder:
+            for _ in range(10):
+                assert resolve_active_secret_key(db) == "sk_test_one"
+        assert recorder.count == 0
+
+    def test_other_worker_sees_bump_after_poll(self, db, payment_row):
+        """Test a change committed by one worker reaches another at its next poll."""
+        worker = SettingsCache(poll_interval=0)
+        load = lambda session: session.query(PaymentSettings).one().test_secret_key
+        assert worker.get(db, PAYMENT, load) == "sk_test_one"
+
+        other = TestSessionLocal()
+        try:
+            other.query(PaymentSettings).one().test_secret_key = "sk_test_two"
+            settings_cache.bump(other, PAYMENT)
+            other.commit()
+        finally:
+            other.close()
+
+        db.expire_all()
+        assert worker.get(db, PAYMENT, load) == "sk_test_two"
+
+    def test_stale_until_poll_interval(self, db, payment_row):
+        """Test a worker keeps its snapshot between polls (one read per interval)."""
+        worker = SettingsCache(poll_interval=3600)
+        load = lambda session: session.query(PaymentSettings).one().test_secret_key
+        assert worker.get(db, PAYMENT, load) == "sk_test_one"
+
+        db.query(PaymentSettings).one().test_secret_key = "sk_test_two"
+        settings_cache.bump(db, PAYMENT)
+        db.commit()
+
+        assert worker.get(db, PAYMENT, load) == "sk_test_one"
+        worker.invalidate()
+        assert worker.get(db, PAYMENT, load) == "sk_test_two"
+
+    def test_rollback_keeps_snapshot(self, db, payment_row):
+        """Test a bump that is rolled back neither changes the version nor drops the snapshot."""
+        resolve_active_secret_key(db)
+        settings_cache.bump(db, PAYMENT)
+        db.rollback()
+        with record_queries() as recorder:
+            assert resolve_active_secret_key(db) == "sk_test_one"
+        assert recorder.count == 0
+
+
+@pytest.mark.integration
+class TestSettingsInvalidation:
+    """Tests for invalidation from the Admin Settings PUT handlers."""
+
+    def test_payment_put_invalidates(self, client: TestClient, admin_token, db, payment_row):
+        """Test saving payment settings is visible to the next payment call."""
+        assert resolve_active_secret_key(db) == "sk_test_one"
+        response = client.put(
+            "/api/v1/admin/settings/payments",
+            json={"test_secret_key": "sk_test_two"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+
+        db.expire_all()
+        assert resolve_active_secret_key(db) == "sk_test_two"
+
+    def test_email_put_invalidates(self, client: TestClient, admin_token, db):
+        """Test saving SMTP settings replaces the cached email configuration."""
+        db.add(EmailSettings(smtp_host="smtp.old.test", smtp_password="secret", smtp_user="a@cibn.org"))
+        db.commit()
+        assert get_email_config(db).smtp_host == "smtp.old.test"
+
+        response = client.put(
+            "/api/v1/admin/settings/email",
+            json={"smtp_host": "smtp.new.test"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+
+        db.expire_all()
+        config = get_email_config(db)
+        assert config.smtp_host == "smtp.new.test"
+        assert config.from_email == "a@cibn.org"
+
+    def test_upload_put_invalidates(self, client: TestClient, admin_token, db):
+        """Test saving upload limits replaces the cached limits."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert client.get("/api/v1/admin/settings/upload", headers=headers).status_code == 200
+        assert settings_cache.get(db, UPLOAD, load_upload_limits)["image"] == 10485760
+
+        response = client.put(
+            "/api/v1/admin/settings/upload",
+            json={"max_file_size_image": 2048},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+        db.expire_all()
+        assert settings_cache.get(db, UPLOAD, load_upload_limits)["image"] == 2048
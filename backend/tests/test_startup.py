@@ -0,0 +1,127 @@
+"""
+Tests for worker start-up cost: what importing the app loads, and the
+liveness/readiness probes.
+
+The import profile comes from ``python -X importtime`` in a fresh interpreter.
+Run ``pytest tests/test_startup.py -s`` to print the slowest imports.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.core.readiness import Readiness, readiness
+from app.db.migrations import upgrade
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Loaded on first use, never by importing the app
+DEFERRED_MODULES = ("pyodbc", "PIL", "passlib", "alembic")
+# Import budget for app.main, generous enough for a slow CI machine
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "5"))
+
+
+def import_profile(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module ``module`` loads."""
+    env = dict(os.environ, TESTING="true", DATABASE_URL="sqlite:///./test.db")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def slowest(profile: Dict[str, int], count: int = 15) -> List[Tuple[str, int]]:
+    """The slowest top-level packages and app modules."""
+    top = {name: us for name, us in profile.items() if "." not in name or name.startswith("app.")}
+    return sorted(top.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def report(profile: Dict[str, int]) -> str:
+    return "\n".join(f"{us / 1000:9.1f} ms  {name}" for name, us in slowest(profile))
+
+
+@pytest.fixture(scope="module")
+def app_profile():
+    profile = import_profile("app.main")
+    print(f"\nSlowest imports of app.main:\n{report(profile)}")
+    return profile
+
+
+@pytest.mark.integration
+class TestImportTime:
+    """Tests for what importing the app costs."""
+
+    def test_optional_dependencies_deferred(self, app_profile):
+        """Test MSSQL, imaging, password hashing and migrations load on first use only."""
+        loaded = [name for name in DEFERRED_MODULES if name in app_profile]
+
+        assert loaded == [], f"imported by app.main: {loaded}\n{report(app_profile)}"
+
+    def test_import_budget(self, app_profile):
+        """Test importing the app stays within the start-up budget."""
+        seconds = app_profile["app.main"] / 1_000_000
+
+        assert seconds < IMPORT_BUDGET_SECONDS, f"app.main took {seconds:.2f}s\n{report(app_profile)}"
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}")
+    with engine.connect() as connection:
+        upgrade(connection)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.integration
+class TestProbes:
+    """Tests for liveness and readiness."""
+
+    def test_ready_at_head(self, migrated_engine):
+        """Test a reachable database at the head revision is ready."""
+        probe = Readiness(migrated_engine)
+
+        assert probe.check() == (True, "ready")
+        assert probe.check() == (True, "ready")
+
+    def test_not_ready_behind_head(self, tmp_path):
+        """Test an unmigrated database is reported with the fix."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+
+        ready, reason = Readiness(engine).check()
+
+        assert not ready
+        assert "app.cli migrate" in reason
+
+    def test_not_ready_without_database(self, tmp_path):
+        """Test an unreachable database makes the worker unready rather than failing."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}")
+
+        assert Readiness(engine).check() == (False, "Database unavailable (OperationalError)")
+
+    def test_endpoints(self, client: TestClient, monkeypatch, migrated_engine, tmp_path):
+        """Test /health answers regardless of the database and /ready follows it."""
+        monkeypatch.setattr(readiness, "_schema_current", False)
+        monkeypatch.setattr(readiness, "engine", create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}"))
+
+        assert client.get("/health").status_code == 200
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "unavailable"
+
+        monkeypatch.setattr(readiness, "engine", migrated_engine)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
@@ -0,0 +1,120 @@
+"""
+Tests for physical stock reservations.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.background import PeriodicTask
+from app.models import Order, OrderStatus, StockReservation
+from app.services.stock import sweep_reservations
+
+
+def place_order(client: TestClient, token: str, content_id: int, quantity: int):
+    return client.post(
+        "/api/v1/orders",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"items": [{"content_id": content_id, "quantity": quantity}]},
+    )
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestStockReservations:
+    """Tests for holds created at order time and their release."""
+
+    def test_order_reserves_physical_stock(self, client: TestClient, user_token, test_physical_content, db):
+        """Test an order holds its units and the next order sees only the remainder."""
+        content_id = test_physical_content.id  # 10 in stock
+        response = place_order(client, user_token, content_id, 7)
+        assert response.status_code == 201
+
+        reservation = db.query(StockReservation).filter_by(order_id=response.json()["id"]).one()
+        assert reservation.quantity == 7
+        assert reservation.expires_at > datetime.utcnow() + timedelta(minutes=25)
+
+        assert place_order(client, user_token, content_id, 4).status_code == 400
+        assert place_order(client, user_token, content_id, 3).status_code == 201
+
+    def test_expired_hold_frees_stock(self, client: TestClient, user_token, test_physical_content, db):
+        """Test stock held by an abandoned checkout becomes available once the hold expires."""
+        content_id = test_physical_content.id
+        assert place_order(client, user_token, content_id, 10).status_code == 201
+        assert place_order(client, user_token, content_id, 1).status_code == 400
+
+        db.query(StockReservation).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+
+        assert place_order(client, user_token, content_id, 1).status_code == 201
+
+    def test_digital_items_are_not_reserved(self, client: TestClient, user_token, test_content_public, db):
+        """Test only physical items create holds."""
+        assert place_order(client, user_token, test_content_public.id, 1).status_code == 201
+        assert db.query(StockReservation).count() == 0
+
+    @patch('app.services.payment.paystack_service.verify_transaction')
+    def test_payment_releases_hold(self, mock_verify, client: TestClient, user_token, test_physical_content, db):
+        """Test a paid order drops its hold and decrements stock exactly once."""
+        content_id = test_physical_content.id
+        order_id = place_order(client, user_token, content_id, 4).json()["id"]
+        order = db.get(Order, order_id)
+        order.payment_reference = "CIBN-hold-paid"
+        db.commit()
+        mock_verify.return_value = {"status": "success", "channel": "card"}
+
+        response = client.post(
+            "/api/v1/orders/verify-payment/CIBN-hold-paid",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert response.status_code == 200
+        assert db.query(StockReservation).count() == 0
+        db.refresh(test_physical_content)
+        assert test_physical_content.stock_quantity == 6
+        # The remaining 6 are fully available again.
+        assert place_order(client, user_token, content_id, 6).status_code == 201
+
+    def test_sweeper_releases_expired_and_inactive_holds(self, client: TestClient, user_token, test_physical_content, db):
+        """Test the sweeper drops expired holds and holds of cancelled orders only."""
+        content_id = test_physical_content.id
+        ids = [place_order(client, user_token, content_id, 2).json()["id"] for _ in range(3)]
+        expired, cancelled, active = ids
+
+        db.query(StockReservation).filter_by(order_id=expired).update(
+            {"expires_at": datetime.utcnow() - timedelta(minutes=1)}
+        )
+        db.get(Order, cancelled).status = OrderStatus.CANCELLED
+        db.commit()
+
+        assert sweep_reservations(db) == 2
+        assert [r.order_id for r in db.query(StockReservation).all()] == [active]
+
+
+@pytest.mark.unit
+class TestPeriodicTask:
+    """Tests for the in-process periodic job runner."""
+
+    def test_runs_until_stopped(self):
+        """Test the function runs repeatedly in the background and errors do not stop it."""
+        calls = []
+
+        def job():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+
+        async def scenario():
+            task = PeriodicTask("test-job", interval=0.01, func=job, jitter=0)
+            task.start()
+            await asyncio.sleep(0.1)
+            task.stop()
+            count = len(calls)
+            await asyncio.sleep(0.05)
+            return count
+
+        count = asyncio.run(scenario())
+        assert count >= 3
+        assert len(calls) == count
@@ -0,0 +1,302 @@
+"""
+Tests for the user library endpoints (async database session).
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.query_budget import query_budget
+from tests.conftest import TestAsyncSessionLocal
+from app.models import Content, ContentProgress, ContentType, ContentCategory, Purchase
+from app.schemas.content_progress import ProgressHeartbeat
+from app.services.access_counts import AccessCounter, access_counter
+from app.services.entitlements import EntitlementCache, entitlements
+from app.services.progress import progress_buffer
+
+
+@pytest.fixture
+def free_content(db) -> Content:
+    content = Content(
+        title="Free Circular",
+        content_type=ContentType.DOCUMENT,
+        category=ContentCategory.CIBN_PUBLICATION,
+        price=0.0,
+        is_exclusive=False,
+        is_active=True,
+        file_url="/uploads/free-circular.pdf",
+    )
+    db.add(content)
+    db.commit()
+    db.refresh(content)
+    return content
+
+
+@pytest.mark.content
+@pytest.mark.integration
+class TestUserLibrary:
+    """Tests for purchased content, library adds and downloads."""
+
+    def test_purchased_content_lists_owned_items(self, client: TestClient, user_token, test_user, test_content_public, db):
+        """Test purchased content returns only the user's items."""
+        db.add(Purchase(user_id=test_user.id, content_id=test_content_public.id, amount=1000.0))
+        db.commit()
+
+        response = client.get(
+            "/api/v1/content/me/purchased",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data] == [test_content_public.id]
+
+    def test_purchased_content_empty(self, client: TestClient, user_token):
+        """Test a user without purchases gets an empty list."""
+        response = client.get(
+            "/api/v1/content/me/purchased",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_add_free_content_to_library(self, client: TestClient, user_token, test_user, free_content, db):
+        """Test free content can be added once and is then reported as owned."""
+        headers = {"Authorization": f"Bearer {user_token}"}
+        response = client.post(f"/api/v1/content/me/library/{free_content.id}", headers=headers)
+        assert response.status_code == 201
+        assert "successfully" in response.json()["message"]
+
+        response = client.post(f"/api/v1/content/me/library/{free_content.id}", headers=headers)
+        assert "already" in response.json()["message"]
+
+        count = db.query(Purchase).filter(
+            Purchase.user_id == test_user.id,
+            Purchase.content_id == free_content.id,
+        ).count()
+        assert count == 1
+
+    def test_add_paid_content_to_library_rejected(self, client: TestClient, user_token, test_content_public):
+        """Test paid content cannot be added without an order."""
+        response = client.post(
+            f"/api/v1/content/me/library/{test_content_public.id}",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 400
+
+    def test_download_requires_purchase(self, client: TestClient, user_token, test_content_public):
+        """Test downloading unpurchased content is forbidden."""
+        response = client.get(
+            f"/api/v1/content/me/{test_content_public.id}/download",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 403
+
+
+@pytest.fixture
+def library(db, test_user):
+    """Seven purchases a day apart, newest last; odd ones are videos."""
+    start = datetime(2026, 1, 1)
+    items = []
+    for i in range(7):
+        content = Content(
+            title=f"Item {i}",
+            content_type=ContentType.VIDEO if i % 2 else ContentType.DOCUMENT,
+            category=ContentCategory.EXAM_TEXT,
+            price=0,
+        )
+        db.add(content)
+        db.flush()
+        db.add(Purchase(user_id=test_user.id, content_id=content.id, amount=0, purchase_date=start + timedelta(days=i), access_count=i))
+        items.append(content)
+    db.commit()
+    return items
+
+
+@pytest.mark.content
+@pytest.mark.integration
+class TestLibraryPages:
+    """Tests for the joined, keyset-paginated library endpoint."""
+
+    def test_pages_follow_cursor(self, client: TestClient, user_token, library):
+        """Test pages come newest first, one query each, and together list every item once."""
+        headers = {"Authorization": f"Bearer {user_token}"}
+        seen, cursor = [], None
+        while True:
+            with query_budget(2):
+                response = client.get("/api/v1/content/me/library", params={"limit": 3, "cursor": cursor}, headers=headers)
+            assert response.status_code == 200
+            page = response.json()
+            seen += [item["content"]["title"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [f"Item {i}" for i in reversed(range(7))]
+
+    def test_joined_details_and_filters(self, client: TestClient, db, test_user, user_token, library):
+        """Test items carry access counts and stored or buffered progress, and filter by type."""
+        db.add(ContentProgress(user_id=test_user.id, content_id=library[3].id, playback_position=60, progress_percentage=25))
+        db.commit()
+        progress_buffer.record(test_user.id, [ProgressHeartbeat(content_id=library[5].id, playback_position=600, progress_percentage=100, is_completed=True)])
+        try:
+            response = client.get(
+                "/api/v1/content/me/library",
+                params={"content_type": "video"},
+                headers={"Authorization": f"Bearer {user_token}"},
+            )
+        finally:
+            progress_buffer.clear()
+
+        items = {item["content"]["title"]: item for item in response.json()["items"]}
+        assert list(items) == ["Item 5", "Item 3", "Item 1"]
+        assert (items["Item 5"]["progress_percentage"], items["Item 5"]["is_completed"]) == (100, True)
+        assert (items["Item 3"]["progress_percentage"], items["Item 3"]["access_count"]) == (25, 3)
+        assert (items["Item 1"]["progress_percentage"], items["Item 1"]["is_completed"]) == (None, False)
+        assert items["Item 1"]["purchase_date"].startswith("2026-01-02")
+
+    def test_invalid_cursor(self, client: TestClient, user_token):
+        """Test a tampered cursor is a client error."""
+        response = client.get(
+            "/api/v1/content/me/library",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 400
+
+    def test_served_by_user_date_index(self, db, test_user):
+        """Test a library page walks ix_purchases_user_date instead of sorting the user's purchases."""
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM purchases WHERE user_id = :user_id "
+            "ORDER BY purchase_date DESC LIMIT 24"
+        ), {"user_id": test_user.id}).all()
+
+        assert "ix_purchases_user_date" in " ".join(row[-1] for row in plan)
+
+
+@pytest.mark.content
+@pytest.mark.integration
+class TestAccessCounts:
+    """Tests for tallying downloads in memory and adding them to purchases in bulk."""
+
+    def test_downloads_tallied_then_flushed(self, client: TestClient, db, test_user, user_token, test_content_public, tmp_path, monkeypatch):
+        """Test downloads do not write, and a flush adds them to the stored count."""
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        (tmp_path / "public-doc.pdf").write_bytes(b"%PDF-1.4")
+        purchase = Purchase(user_id=test_user.id, content_id=test_content_public.id, amount=1000.0, access_count=2)
+        db.add(purchase)
+        db.commit()
+        access_counter.clear()
+
+        try:
+            for _ in range(3):
+                response = client.get(
+                    f"/api/v1/content/me/{test_content_public.id}/download",
+                    headers={"Authorization": f"Bearer {user_token}"},
+                )
+                assert response.status_code == 200
+            db.refresh(purchase)
+            assert (purchase.access_count, purchase.last_accessed) == (2, None)
+
+            assert access_counter.flush(db) == 1
+        finally:
+            access_counter.clear()
+        db.refresh(purchase)
+        assert purchase.access_count == 5
+        assert purchase.last_accessed is not None
+
+    def test_flush_is_one_batched_update(self, db, test_user, library):
+        """Test increments for many purchases go out in one statement and never move last_accessed back."""
+        purchases = db.query(Purchase).order_by(Purchase.id).all()
+        later = datetime(2030, 1, 1)
+        purchases[0].last_accessed = later
+        db.commit()
+        counter = AccessCounter()
+        for purchase in purchases:
+            for _ in range(purchase.id % 3 + 1):
+                counter.record(purchase.user_id, purchase.content_id)
+
+        with query_budget(1):
+            assert counter.flush(db) == len(purchases)
+        db.expire_all()
+        for i, purchase in enumerate(db.query(Purchase).order_by(Purchase.id)):
+            assert purchase.access_count == i + purchase.id % 3 + 1
+        assert db.get(Purchase, purchases[0].id).last_accessed.replace(tzinfo=None) == later
+
+    def test_failed_flush_keeps_tallies(self, db, test_user, library):
+        """Test tallies from a failed flush are added to those recorded since."""
+        purchase_id, content_id = db.query(Purchase.id, Purchase.content_id).first()
+        counter = AccessCounter()
+        counter.record(test_user.id, content_id)
+
+        with patch.object(db, "execute", side_effect=OperationalError("UPDATE", {}, Exception("connection lost"))):
+            with pytest.raises(OperationalError):
+                counter.flush(db)
+        counter.record(test_user.id, content_id)
+
+        assert counter.flush(db) == 1
+        db.expire_all()
+        assert db.get(Purchase, purchase_id).access_count == 2
+
+
+@pytest.fixture
+def downloadable(db, test_content_public, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    (tmp_path / "public-doc.pdf").write_bytes(b"%PDF-1.4")
+    yield test_content_public
+    access_counter.clear()
+
+
+@pytest.mark.content
+@pytest.mark.integration
+class TestEntitlements:
+    """Tests for answering purchase checks from the in-memory entitlement cache."""
+
+    def test_repeat_downloads_skip_purchase_lookup(self, client: TestClient, db, test_user, user_token, downloadable):
+        """Test only the first download reads the user's purchases."""
+        db.add(Purchase(user_id=test_user.id, content_id=downloadable.id, amount=1000.0))
+        db.commit()
+        url = f"/api/v1/content/me/{downloadable.id}/download"
+        headers = {"Authorization": f"Bearer {user_token}"}
+        assert client.get(url, headers=headers).status_code == 200
+
+        with query_budget(2):  # the user and the content row
+            assert client.get(url, headers=headers).status_code == 200
+
+    def test_purchase_elsewhere_not_refused(self, client: TestClient, db, test_user, user_token, downloadable):
+        """Test a purchase this worker was not told about is found before access is refused."""
+        url = f"/api/v1/content/me/{downloadable.id}/download"
+        headers = {"Authorization": f"Bearer {user_token}"}
+        assert client.get(url, headers=headers).status_code == 403
+
+        db.add(Purchase(user_id=test_user.id, content_id=downloadable.id, amount=1000.0))
+        db.commit()
+        assert client.get(url, headers=headers).status_code == 200
+
+    async def test_invalidated_on_fulfillment_commit(self, db, test_user, library):
+        """Test a committed purchase drops the user's entry, and a rolled back one does not."""
+        cache = EntitlementCache(max_users=10, ttl=300)
+        async with TestAsyncSessionLocal() as session:
+            assert await cache.owns(session, test_user.id, library[0].id)
+
+        cache.invalidate_on_commit(db, test_user.id)
+        db.rollback()
+        assert cache._cached(test_user.id) is not None
+        db.commit()
+        assert cache._cached(test_user.id) is None
+
+    async def test_bounded_and_expiring(self, db, test_user, test_admin, library, monkeypatch):
+        """Test the least recently checked user is evicted and entries expire after the TTL."""
+        cache = EntitlementCache(max_users=1, ttl=300)
+        async with TestAsyncSessionLocal() as session:
+            await cache.owns(session, test_user.id, library[0].id)
+            await cache.owns(session, test_admin.id, library[0].id)
+        assert cache._cached(test_user.id) is None
+        assert cache._cached(test_admin.id) is not None
+
+        cache.ttl = 0
+        assert cache._cached(test_admin.id) is None
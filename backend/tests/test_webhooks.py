@@ -0,0 +1,131 @@
+"""
+Tests for the Paystack webhook inbox and its consumer.
+"""
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.query_budget import query_budget
+from app.models import Order, OrderItem, OrderStatus, Purchase, WebhookEvent, WebhookEventStatus
+from app.services.payment import resolve_active_secret_key
+from app.services.webhooks import process_webhook_events, requeue_dead_events
+
+SECRET = "sk_test_webhook"
+
+
+@pytest.fixture(autouse=True)
+def webhook_secret(monkeypatch):
+    monkeypatch.setattr(settings, "PAYSTACK_SECRET_KEY", SECRET)
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 2)
+
+
+@pytest.fixture
+def pending_order(db, test_user, test_content_public):
+    order = Order(
+        user_id=test_user.id,
+        total_amount=1000.0,
+        status=OrderStatus.PENDING,
+        payment_reference="CIBN-webhook-1",
+    )
+    db.add(order)
+    db.flush()
+    db.add(OrderItem(order_id=order.id, content_id=test_content_public.id, quantity=1, price_at_purchase=1000.0))
+    db.commit()
+    return order.id
+
+
+def deliver(client: TestClient, event: dict, secret: str = SECRET):
+    body = json.dumps(event).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha512).hexdigest()
+    return client.post(
+        "/api/v1/orders/webhook",
+        content=body,
+        headers={"x-paystack-signature": signature, "Content-Type": "application/json"},
+    )
+
+
+def charge_success(reference: str, amount: int = 100000, transaction_id: int = 1) -> dict:
+    return {"event": "charge.success", "data": {"id": transaction_id, "reference": reference, "amount": amount}}
+
+
+@pytest.mark.orders
+@pytest.mark.integration
+class TestWebhookInbox:
+    """Tests for receiving, deduplicating and processing webhook events."""
+
+    def test_ack_stores_event_and_consumer_fulfills(self, client: TestClient, db, pending_order):
+        """Test the webhook is acknowledged before fulfillment, which the consumer then does."""
+        response = deliver(client, charge_success("CIBN-webhook-1"))
+        assert response.status_code == 200
+
+        assert db.get(Order, pending_order).status == OrderStatus.PENDING
+        event = db.query(WebhookEvent).one()
+        assert (event.status, event.event_type, event.reference) == (
+            WebhookEventStatus.PENDING, "charge.success", "CIBN-webhook-1"
+        )
+
+        assert process_webhook_events(db) == {"processed": 1}
+        db.expire_all()
+        assert db.get(Order, pending_order).status == OrderStatus.COMPLETED
+        assert db.query(Purchase).filter(Purchase.order_id == pending_order).count() == 1
+        assert db.get(WebhookEvent, event.id).status == WebhookEventStatus.PROCESSED
+
+    def test_redelivery_is_deduplicated(self, client: TestClient, db, pending_order):
+        """Test Paystack retries of one event are acknowledged but stored and processed once."""
+        for _ in range(3):
+            assert deliver(client, charge_success("CIBN-webhook-1")).status_code == 200
+
+        assert db.query(WebhookEvent).count() == 1
+        assert process_webhook_events(db) == {"processed": 1}
+        assert process_webhook_events(db) == {}
+
+    def test_invalid_signature_rejected(self, client: TestClient, db):
+        """Test an unsigned or mis-signed event is rejected and not stored."""
+        assert deliver(client, charge_success("CIBN-webhook-1"), secret="sk_test_other").status_code == 401
+        assert db.query(WebhookEvent).count() == 0
+
+    def test_ack_is_constant_work(self, client: TestClient, db):
+        """Test acknowledging a webhook costs a single insert."""
+        resolve_active_secret_key(db)  # warm the settings cache
+        with query_budget(1):
+            assert deliver(client, charge_success("CIBN-any")).status_code == 200
+
+    def test_events_processed_in_arrival_order(self, client: TestClient, db):
+        """Test the consumer handles events oldest first and ignores unactionable ones."""
+        deliver(client, charge_success("CIBN-b", transaction_id=2))
+        deliver(client, {"event": "transfer.success", "data": {"id": 3}})
+        deliver(client, charge_success("CIBN-a", transaction_id=1))
+
+        seen = []
+        with patch("app.services.webhooks.order_service.confirm_order_from_webhook",
+                   side_effect=lambda db, reference, amount: seen.append(reference) or False):
+            assert process_webhook_events(db) == {"ignored": 3}
+        assert seen == ["CIBN-b", "CIBN-a"]
+
+    def test_failures_retry_then_dead_letter(self, client: TestClient, db, pending_order):
+        """Test a failing event backs off, is dead-lettered, and can be requeued."""
+        deliver(client, charge_success("CIBN-webhook-1"))
+
+        with patch("app.services.webhooks.order_service.confirm_order_from_webhook",
+                   side_effect=RuntimeError("database unavailable")):
+            assert process_webhook_events(db) == {"retrying": 1}
+            event = db.query(WebhookEvent).one()
+            assert event.next_attempt_at > datetime.utcnow()
+            assert "database unavailable" in event.last_error
+            assert process_webhook_events(db) == {}  # not due yet
+
+            later = datetime.utcnow() + timedelta(hours=2)
+            assert process_webhook_events(db, now=later) == {"dead": 1}
+            db.expire_all()
+            assert db.get(WebhookEvent, event.id).status == WebhookEventStatus.DEAD
+
+        assert requeue_dead_events(db) == 1
+        assert process_webhook_events(db) == {"processed": 1}
+        db.expire_all()
+        assert db.get(Order, pending_order).status == OrderStatus.COMPLETED
@@ -15,7 +15,7 @@ import {
 import { toast } from 'sonner'
 import { useAuth } from '@/contexts/AuthContext'
 import { contentService } from '@/lib/api/content'
-import { progressService, ContentProgress } from '@/lib/api/progress'
+import { progressService, ContentProgress, ContinueWatchingItem } from '@/lib/api/progress'
 import { DocumentViewer } from '@/components/viewers/DocumentViewer'
 import { VideoPlayer } from '@/components/viewers/VideoPlayer'
 import { AudioPlayer } from '@/components/viewers/AudioPlayer'
@@ -27,6 +27,7 @@ export default function MyLibraryPage() {
   const { isAuthenticated, user } = useAuth()
   const [purchasedContent, setPurchasedContent] = useState<any[]>([])
   const [progressData, setProgressData] = useState<ContentProgress[]>([])
+  const [resumeItems, setResumeItems] = useState<ContinueWatchingItem[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [searchQuery, setSearchQuery] = useState('')
   const [selectedType, setSelectedType] = useState('all')
@@ -72,14 +73,19 @@ export default function MyLibraryPage() {
         
         // Fetch progress (optional - may not be available yet)
         try {
-          const progress = await progressService.getAllProgress()
+          const [progress, resume] = await Promise.all([
+            progressService.getAllProgress(),
+            progressService.continueWatching(3),
+          ])
           setProgressData(progress)
+          setResumeItems(resume)
         } catch (progressError: any) {
           // Progress tracking might not be available yet
           if (process.env.NODE_ENV === 'development') {
             console.warn('Progress tracking not available:', progressError.response?.status)
           }
           setProgressData([])
+          setResumeItems([])
         }
       } catch (error) {
         console.error('Error fetching library data:', error)
@@ -170,14 +176,10 @@ export default function MyLibraryPage() {
       }
     })
 
-  // Get content with progress (for Continue Learning section)
-  const contentInProgress = filteredContent.filter(item => {
-    if (item.content_type === 'video' || item.content_type === 'audio') {
-      const progress = getProgress(item.id)
-      return progress > 0 && progress < 95
-    }
-    return false
-  })
+  // Continue Learning: most recently watched unfinished items, ordered by the server
+  const contentInProgress = resumeItems
+    .map(resume => filteredContent.find(item => item.id === resume.content.id))
+    .filter(Boolean)
 
   // Calculate stats
   const stats = {
@@ -185,7 +187,7 @@ export default function MyLibraryPage() {
     documents: purchasedContent.filter(i => i.content_type === 'document').length,
     videos: purchasedContent.filter(i => i.content_type === 'video').length,
     audio: purchasedContent.filter(i => i.content_type === 'audio').length,
-    inProgress: contentInProgress.length
+    inProgress: progressData.filter(p => !p.is_completed && p.progress_percentage > 0).length
   }
 
   if (!isAuthenticated) {
@@ -432,7 +434,7 @@ export default function MyLibraryPage() {
                   Continue Learning
                 </h2>
                 <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
-                  {contentInProgress.slice(0, 3).map((item, index) => (
+                  {contentInProgress.map((item, index) => (
                     <ContentCard key={item.id} item={item} index={index} />
                   ))}
                 </div>
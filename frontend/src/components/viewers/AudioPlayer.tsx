@@ -47,7 +47,7 @@ export function AudioPlayer({
       
       // Debounce: save every 2 seconds
       const timer = setTimeout(() => {
-        progressService.saveProgress({
+        progressService.heartbeat({
           content_id: contentId,
           playback_position: currentTime,
           total_duration: totalDuration,
@@ -109,7 +109,7 @@ export function AudioPlayer({
       const progressPercentage = (currentTime / totalDuration) * 100
       const isCompleted = progressPercentage >= 95
       
-      progressService.saveProgress({
+      progressService.heartbeat({
         content_id: contentId,
         playback_position: currentTime,
         total_duration: totalDuration,
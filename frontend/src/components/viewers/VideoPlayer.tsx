@@ -39,7 +39,7 @@ export function VideoPlayer({ isOpen, onClose, fileUrl, title, contentId, durati
       
       // Debounce: save every 2 seconds
       const timer = setTimeout(() => {
-        progressService.saveProgress({
+        progressService.heartbeat({
           content_id: contentId,
           playback_position: currentTime,
           total_duration: totalDuration,
@@ -101,7 +101,7 @@ export function VideoPlayer({ isOpen, onClose, fileUrl, title, contentId, durati
       const progressPercentage = (currentTime / totalDuration) * 100
       const isCompleted = progressPercentage >= 95
       
-      progressService.saveProgress({
+      progressService.heartbeat({
         content_id: contentId,
         playback_position: currentTime,
         total_duration: totalDuration,
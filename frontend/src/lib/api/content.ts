@@ -34,6 +34,36 @@ export interface ContentListResponse {
   page_size: number
 }
 
+export interface LibraryItem {
+  content: {
+    id: number
+    title: string
+    content_type: ContentType
+    category: ContentCategory
+    author: string | null
+    thumbnail_url: string | null
+    duration: number | null
+  }
+  purchase_id: number
+  purchase_date: string | null
+  access_count: number
+  last_accessed: string | null
+  progress_percentage: number | null
+  is_completed: boolean
+}
+
+export interface LibraryPage {
+  items: LibraryItem[]
+  next_cursor: string | null
+}
+
+export interface LibraryFilters {
+  limit?: number
+  cursor?: string
+  content_type?: ContentType
+  category?: ContentCategory
+}
+
 export interface ContentFilters {
   page?: number
   page_size?: number
@@ -58,6 +88,14 @@ export const contentService = {
     }
   },
 
+  /**
+   * One page of the user's library, newest purchases first; pass next_cursor back for the next page
+   */
+  async getLibraryPage(filters: LibraryFilters = {}): Promise<LibraryPage> {
+    const response = await apiClient.get<LibraryPage>('/content/me/library', { params: filters })
+    return response.data
+  },
+
   /**
    * Directly add free or exclusive content to user's library
    */
@@ -6,7 +6,7 @@
 import apiClient from './client'
 
 export interface ContentProgress {
-  id: number
+  id: number | null
   user_id: number
   content_id: number
   playback_position: number
@@ -18,6 +18,24 @@ export interface ContentProgress {
   updated_at: string
 }
 
+export interface ContentSummary {
+  id: number
+  title: string
+  content_type: string
+  category: string
+  author: string | null
+  thumbnail_url: string | null
+  duration: number | null
+}
+
+export interface ContinueWatchingItem {
+  content: ContentSummary
+  playback_position: number
+  total_duration: number | null
+  progress_percentage: number
+  last_watched: string
+}
+
 export interface ProgressUpdate {
   content_id: number
   playback_position: number
@@ -35,6 +53,14 @@ export const progressService = {
     return response.data
   },
 
+  /**
+   * Most recently watched unfinished items with their content, newest first
+   */
+  async continueWatching(limit = 10): Promise<ContinueWatchingItem[]> {
+    const response = await apiClient.get<ContinueWatchingItem[]>('/progress/continue', { params: { limit } })
+    return response.data
+  },
+
   /**
    * Get progress for specific content
    */
@@ -58,6 +84,13 @@ export const progressService = {
     return response.data
   },
 
+  /**
+   * Record playback state; the lightweight path the media players call while playing
+   */
+  async heartbeat(...updates: ProgressUpdate[]): Promise<void> {
+    await apiClient.post('/progress/heartbeat', { updates })
+  },
+
   /**
    * Update existing progress
    */